@@ -0,0 +1,351 @@
+"""
+fs.aio
+======
+
+An asyncio interface to any FS object.
+
+FS methods block, so calling them from a coroutine would stall the event
+loop. :py:class:`AsyncFS` wraps a filesystem and runs each call on a thread
+pool owned by the wrapper, sized according to whether the filesystem is
+thread-safe::
+
+    from fs.aio import AsyncFS
+    from fs.osfs import OSFS
+
+    async def main():
+        async with AsyncFS(OSFS('.'), timeout=30) as afs:
+            for path in await afs.listdir(files_only=True):
+                info = await afs.getinfo(path)
+            async for path, files in afs.walk(wildcard="*.py"):
+                print(path, files)
+
+Every method accepts a `timeout` (in seconds), which defaults to the timeout
+given to the constructor. If a call times out or the awaiting task is
+cancelled, an :py:class:`asyncio.TimeoutError` or
+:py:class:`asyncio.CancelledError` is raised in the coroutine. The blocking
+call itself can't be interrupted, and carries on in its worker thread.
+Reading and writing files in chunks stops once the current chunk is done.
+A walk that times out may be carried on by iterating it again, which waits
+for the step that timed out to finish rather than starting another one.
+
+"""
+
+__all__ = ['AsyncFS',
+           'AsyncFile']
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import six
+
+#: Number of worker threads used for filesystems that are thread-safe
+DEFAULT_WORKERS = 8
+
+_end = object()
+
+
+def _next(iterator):
+    return next(iterator, _end)
+
+
+class AsyncFS(object):
+    """Wraps an FS object, so that its methods may be awaited.
+
+    :param fs: the filesystem to wrap
+    :param workers: the number of worker threads; defaults to
+        :py:data:`DEFAULT_WORKERS` if the filesystem reports the *thread_safe* meta value,
+        otherwise 1
+    :param timeout: the default timeout for each call, in seconds, or None for no timeout
+    :param chunk_size: number of bytes read or written in each call when streaming file contents
+
+    """
+
+    def __init__(self, fs, workers=None, timeout=None, chunk_size=1024 * 64):
+        self.fs = fs
+        if workers is None:
+            workers = DEFAULT_WORKERS if fs.getmeta('thread_safe', False) else 1
+        self.workers = workers
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def __repr__(self):
+        return "<AsyncFS: %r>" % (self.fs,)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _call(self, func, *args, **kwargs):
+        """Runs func(*args, **kwargs) on the executor. A `timeout` keyword
+        argument is consumed here rather than passed to `func`."""
+        timeout = kwargs.pop('timeout', None)
+        if timeout is None:
+            timeout = self.timeout
+        loop = asyncio.get_running_loop()
+        call = loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        if timeout is None:
+            return await call
+        return await asyncio.wait_for(call, timeout)
+
+    async def close(self, timeout=None):
+        """Closes the wrapped filesystem and shuts down the worker threads."""
+        try:
+            await self._call(self.fs.close, timeout=timeout)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def open(self, path, mode='r', timeout=None, **kwargs):
+        """Opens a file, and returns an :py:class:`AsyncFile`. See :py:meth:`~fs.base.FS.open`."""
+        f = await self._call(self.fs.open, path, mode, timeout=timeout, **kwargs)
+        return AsyncFile(self, f)
+
+    async def getcontents(self, path, mode='rb', encoding=None, errors=None, newline=None, timeout=None):
+        """Returns the contents of a file. The file is read in chunks of `chunk_size`,
+        and `timeout` applies to each chunk."""
+        f = await self.open(path, mode, encoding=encoding, errors=errors, newline=newline, timeout=timeout)
+        async with f:
+            chunks = []
+            async for chunk in f.chunks(timeout=timeout):
+                chunks.append(chunk)
+        if 'b' in mode:
+            return six.b('').join(chunks)
+        return ''.join(chunks)
+
+    async def setcontents(self, path, data=b'', encoding=None, errors=None, timeout=None):
+        """Creates a new file from a string, or from a file-like object which is read
+        in chunks. Returns the number of bytes (or characters) written."""
+        if hasattr(data, 'read'):
+            chunk = await self._call(data.read, self.chunk_size, timeout=timeout)
+        else:
+            chunk = data
+        if isinstance(chunk, six.text_type):
+            f = await self.open(path, 'wt', encoding=encoding, errors=errors, timeout=timeout)
+        else:
+            f = await self.open(path, 'wb', timeout=timeout)
+        written = 0
+        async with f:
+            if hasattr(data, 'read'):
+                while chunk:
+                    await f.write(chunk, timeout=timeout)
+                    written += len(chunk)
+                    chunk = await self._call(data.read, self.chunk_size, timeout=timeout)
+            else:
+                for offset in range(0, len(data), self.chunk_size):
+                    chunk = data[offset:offset + self.chunk_size]
+                    await f.write(chunk, timeout=timeout)
+                    written += len(chunk)
+        return written
+
+    def _iterate(self, iterator, timeout):
+        if timeout is None:
+            timeout = self.timeout
+        return _AsyncIterator(self, iterator, timeout)
+
+    def walk(self, path="/", wildcard=None, dir_wildcard=None, search="breadth", ignore_errors=False, timeout=None):
+        """An async generator version of :py:meth:`~fs.base.FS.walk`.
+        The `timeout` applies to each directory listing."""
+        return self._iterate(self.fs.walk(path,
+                                          wildcard=wildcard,
+                                          dir_wildcard=dir_wildcard,
+                                          search=search,
+                                          ignore_errors=ignore_errors), timeout)
+
+    def walkfiles(self, path="/", wildcard=None, dir_wildcard=None, search="breadth", ignore_errors=False, timeout=None):
+        """An async generator version of :py:meth:`~fs.base.FS.walkfiles`."""
+        return self._iterate(self.fs.walkfiles(path,
+                                               wildcard=wildcard,
+                                               dir_wildcard=dir_wildcard,
+                                               search=search,
+                                               ignore_errors=ignore_errors), timeout)
+
+    def walkinfo(self, path="/", wildcard=None, dir_wildcard=None, search="breadth", ignore_errors=False, timeout=None):
+        """An async generator version of :py:meth:`~fs.base.FS.walkinfo`."""
+        return self._iterate(self.fs.walkinfo(path,
+                                              wildcard=wildcard,
+                                              dir_wildcard=dir_wildcard,
+                                              search=search,
+                                              ignore_errors=ignore_errors), timeout)
+
+    async def listdir(self, path="./", timeout=None, **kwargs):
+        """See :py:meth:`~fs.base.FS.listdir`."""
+        return await self._call(self.fs.listdir, path, timeout=timeout, **kwargs)
+
+    async def listdirinfo(self, path="./", timeout=None, **kwargs):
+        """See :py:meth:`~fs.base.FS.listdirinfo`."""
+        return await self._call(self.fs.listdirinfo, path, timeout=timeout, **kwargs)
+
+    async def getinfo(self, path, timeout=None):
+        """See :py:meth:`~fs.base.FS.getinfo`."""
+        return await self._call(self.fs.getinfo, path, timeout=timeout)
+
+    async def getinfo_many(self, paths, timeout=None):
+        """See :py:meth:`~fs.base.FS.getinfo_many`."""
+        return await self._call(self.fs.getinfo_many, paths, timeout=timeout)
+
+    async def getsize(self, path, timeout=None):
+        """See :py:meth:`~fs.base.FS.getsize`."""
+        return await self._call(self.fs.getsize, path, timeout=timeout)
+
+    async def exists(self, path, timeout=None):
+        """See :py:meth:`~fs.base.FS.exists`."""
+        return await self._call(self.fs.exists, path, timeout=timeout)
+
+    async def isdir(self, path, timeout=None):
+        """See :py:meth:`~fs.base.FS.isdir`."""
+        return await self._call(self.fs.isdir, path, timeout=timeout)
+
+    async def isfile(self, path, timeout=None):
+        """See :py:meth:`~fs.base.FS.isfile`."""
+        return await self._call(self.fs.isfile, path, timeout=timeout)
+
+    async def makedir(self, path, recursive=False, allow_recreate=False, timeout=None):
+        """See :py:meth:`~fs.base.FS.makedir`."""
+        return await self._call(self.fs.makedir, path,
+                                recursive=recursive,
+                                allow_recreate=allow_recreate,
+                                timeout=timeout)
+
+    async def remove(self, path, timeout=None):
+        """See :py:meth:`~fs.base.FS.remove`."""
+        return await self._call(self.fs.remove, path, timeout=timeout)
+
+    async def removedir(self, path, recursive=False, force=False, timeout=None):
+        """See :py:meth:`~fs.base.FS.removedir`."""
+        return await self._call(self.fs.removedir, path,
+                                recursive=recursive,
+                                force=force,
+                                timeout=timeout)
+
+    async def rename(self, src, dst, timeout=None):
+        """See :py:meth:`~fs.base.FS.rename`."""
+        return await self._call(self.fs.rename, src, dst, timeout=timeout)
+
+    async def copy(self, src, dst, overwrite=False, timeout=None):
+        """See :py:meth:`~fs.base.FS.copy`."""
+        return await self._call(self.fs.copy, src, dst, overwrite=overwrite, timeout=timeout)
+
+    async def move(self, src, dst, overwrite=False, timeout=None):
+        """See :py:meth:`~fs.base.FS.move`."""
+        return await self._call(self.fs.move, src, dst, overwrite=overwrite, timeout=timeout)
+
+
+class _AsyncIterator(object):
+    """Steps through a blocking iterator on the worker threads of an
+    :py:class:`AsyncFS`.
+
+    A step that times out (or is cancelled) carries on in its worker thread,
+    and the next step waits for it, so the iterator is never called while
+    it's still running.
+
+    """
+
+    def __init__(self, afs, iterator, timeout):
+        self._afs = afs
+        self._iterator = iterator
+        self._timeout = timeout
+        self._step = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        step = self._step
+        if step is None:
+            loop = asyncio.get_running_loop()
+            step = self._step = loop.run_in_executor(self._afs._executor, _next, self._iterator)
+        try:
+            if self._timeout is None:
+                item = await asyncio.shield(step)
+            else:
+                item = await asyncio.wait_for(asyncio.shield(step), self._timeout)
+        except BaseException:
+            #  Unless the step failed, the next call returns its result
+            if step.done() and (step.cancelled() or step.exception() is not None):
+                self._step = None
+            raise
+        self._step = None
+        if item is _end:
+            raise StopAsyncIteration
+        return item
+
+    async def aclose(self):
+        """Closes the iterator, once a step that timed out has finished."""
+        step, self._step = self._step, None
+        if step is not None:
+            await asyncio.wait([step])
+            #  Its result isn't wanted, and an error in it isn't reported
+            if not step.cancelled():
+                step.exception()
+        close = getattr(self._iterator, 'close', None)
+        if close is not None:
+            await self._afs._call(close)
+
+
+class AsyncFile(object):
+    """A file opened with :py:meth:`AsyncFS.open`, with awaitable methods.
+
+    Use as an async context manager to close the file::
+
+        async with await afs.open("foo.txt", "rb") as f:
+            async for chunk in f.chunks():
+                ...
+
+    """
+
+    def __init__(self, afs, f):
+        self._afs = afs
+        self.file = f
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _call(self, func, *args, **kwargs):
+        return self._afs._call(func, *args, **kwargs)
+
+    async def read(self, size=-1, timeout=None):
+        """Reads up to `size` bytes, or the rest of the file if `size` is negative."""
+        return await self._call(self.file.read, size, timeout=timeout)
+
+    async def chunks(self, chunk_size=None, timeout=None):
+        """An async generator that reads the rest of the file in chunks."""
+        if chunk_size is None:
+            chunk_size = self._afs.chunk_size
+        while True:
+            chunk = await self._call(self.file.read, chunk_size, timeout=timeout)
+            if not chunk:
+                break
+            yield chunk
+
+    async def readline(self, timeout=None):
+        return await self._call(self.file.readline, timeout=timeout)
+
+    async def write(self, data, timeout=None):
+        return await self._call(self.file.write, data, timeout=timeout)
+
+    async def seek(self, offset, whence=0, timeout=None):
+        return await self._call(self.file.seek, offset, whence, timeout=timeout)
+
+    async def tell(self, timeout=None):
+        return await self._call(self.file.tell, timeout=timeout)
+
+    async def truncate(self, size=None, timeout=None):
+        if size is None:
+            return await self._call(self.file.truncate, timeout=timeout)
+        return await self._call(self.file.truncate, size, timeout=timeout)
+
+    async def flush(self, timeout=None):
+        return await self._call(self.file.flush, timeout=timeout)
+
+    async def close(self, timeout=None):
+        return await self._call(self.file.close, timeout=timeout)
+
+    @property
+    def closed(self):
+        return self.file.closed
@@ -15,9 +15,11 @@ For more information regarding implementing a working PyFilesystem interface, se
 
 
 __all__ = ['DummyLock',
+           'ReadWriteLock',
            'silence_fserrors',
            'NullFile',
            'synchronize',
+           'synchronize_read',
            'FS',
            'flags_to_mode',
            'NoDefaultMeta']
@@ -25,10 +27,11 @@ __all__ = ['DummyLock',
 import os
 import os.path
 import shutil
-import fnmatch
 import datetime
 import time
+import zlib
 import errno
+import hashlib
 try:
     import threading
 except ImportError:
@@ -37,6 +40,8 @@ except ImportError:
 from fs.path import *
 from fs.errors import *
 from fs.local_functools import wraps
+from fs import iotools
+from fs.glob import compile_wildcard, iglob as _iglob
 
 import six
 from six import b
@@ -137,6 +142,129 @@ class NullFile(object):
         pass
 
 
+_get_ident = threading.get_ident
+
+
+class _ReadDepth(threading.local):
+    depth = 0
+
+
+class ReadWriteLock(object):
+    """A reentrant lock that may be held shared by any number of readers,
+    or exclusively by a single writer.
+
+    :py:meth:`acquire` and :py:meth:`release` (and the context manager
+    protocol) take the lock exclusively, so this can be used wherever a
+    ``threading.RLock`` is expected; :py:meth:`acquire_read` and
+    :py:meth:`release_read` take it shared. A thread holding the lock
+    exclusively may also acquire it for reading. A thread holding the lock
+    for reading may acquire it exclusively once the other readers have
+    released it; if two readers attempt that at once, the second raises
+    ``RuntimeError`` rather than deadlock. Waiting writers take priority
+    over new readers.
+
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._cond = threading.Condition(self._mutex)
+        #  Each thread's read depth is kept in a thread local, so that nested
+        #  reads don't need the mutex.
+        self._local = _ReadDepth()
+        self._readers = 0
+        self._writer = None
+        self._write_count = 0
+        self._writers_waiting = 0
+        self._upgrading = None
+
+    def acquire_read(self, blocking=True):
+        """Acquires the lock for reading."""
+        local = self._local
+        depth = local.depth
+        if depth:
+            local.depth = depth + 1
+            return True
+        if self._writer == _get_ident():
+            self._write_count += 1
+            return True
+        with self._mutex:
+            while self._writer is not None or self._writers_waiting:
+                if not blocking:
+                    return False
+                self._cond.wait()
+            self._readers += 1
+        local.depth = 1
+        return True
+
+    def release_read(self):
+        """Releases the lock, after :py:meth:`acquire_read`."""
+        local = self._local
+        depth = local.depth
+        if depth > 1:
+            local.depth = depth - 1
+            return
+        if not depth:
+            if self._writer == _get_ident():
+                with self._mutex:
+                    self._release_write()
+                return
+            raise RuntimeError("cannot release un-acquired lock")
+        local.depth = 0
+        with self._mutex:
+            self._readers -= 1
+            #  Only writers wait for readers
+            if self._writers_waiting and self._readers <= 1:
+                self._cond.notify_all()
+
+    def acquire(self, blocking=True):
+        """Acquires the lock exclusively."""
+        me = _get_ident()
+        if self._writer == me:
+            self._write_count += 1
+            return True
+        upgrading = self._local.depth > 0
+        with self._mutex:
+            if upgrading:
+                if self._upgrading is not None:
+                    raise RuntimeError("cannot acquire lock for writing while another reader is waiting to")
+                self._upgrading = me
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or \
+                        self._readers > (1 if upgrading else 0) or \
+                        (not upgrading and self._upgrading is not None):
+                    if not blocking:
+                        return False
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+                if upgrading:
+                    self._upgrading = None
+            self._writer = me
+            self._write_count = 1
+            return True
+
+    def release(self):
+        """Releases the lock, after :py:meth:`acquire`."""
+        with self._mutex:
+            if self._writer != _get_ident():
+                raise RuntimeError("cannot release un-acquired lock")
+            self._release_write()
+
+    def _release_write(self):
+        self._write_count -= 1
+        if not self._write_count:
+            self._writer = None
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
 def synchronize(func):
     """Decorator to synchronize a method on self._lock."""
     @wraps(func)
@@ -149,6 +277,85 @@ def synchronize(func):
     return acquire_lock
 
 
+def synchronize_read(func):
+    """Decorator to synchronize a read-only method on self._lock.
+
+    If the lock is a :py:class:`ReadWriteLock` it is held shared, so the
+    method may run at the same time as other read-only methods. With any
+    other lock this is the same as :py:func:`synchronize`.
+
+    """
+    @wraps(func)
+    def acquire_lock(self, *args, **kwargs):
+        lock = self._lock
+        acquire_read = getattr(lock, 'acquire_read', None)
+        if acquire_read is None:
+            lock.acquire()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                lock.release()
+        acquire_read()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            lock.release_read()
+    return acquire_lock
+
+
+def _coalesce_ranges(ranges):
+    """Merges (offset, length) ranges that overlap or are adjacent.
+
+    Returns a list of (offset, length, members) tuples, sorted by offset, where
+    members is a list of the (index, offset, length) of each range in the span.
+    Empty ranges are left out.
+
+    """
+    spans = []
+    span_offset = span_end = None
+    members = None
+    for index, (offset, length) in sorted(enumerate(ranges), key=lambda r: r[1][0]):
+        if offset < 0 or length < 0:
+            raise ValueError("offset and length must not be negative")
+        if not length:
+            continue
+        if members is not None and offset <= span_end:
+            span_end = max(span_end, offset + length)
+        else:
+            if members is not None:
+                spans.append((span_offset, span_end - span_offset, members))
+            span_offset, span_end, members = offset, offset + length, []
+        members.append((index, offset, length))
+    if members is not None:
+        spans.append((span_offset, span_end - span_offset, members))
+    return spans
+
+
+class _CRC32(object):
+    """A CRC-32 checksum with the interface of a :py:mod:`hashlib` hash."""
+
+    name = 'crc32'
+
+    def __init__(self):
+        self.crc = 0
+
+    def update(self, data):
+        self.crc = zlib.crc32(data, self.crc)
+
+    def hexdigest(self):
+        return '%08x' % (self.crc & 0xffffffff)
+
+
+def _make_hasher(algorithm):
+    """Gets a new hash object for an algorithm accepted by :py:meth:`FS.gethash`."""
+    if algorithm == 'crc32':
+        return _CRC32()
+    try:
+        return hashlib.new(algorithm)
+    except (ValueError, TypeError):
+        raise ValueError("unsupported hash algorithm: %r" % (algorithm,))
+
+
 class FS(object):
     """The base class for Filesystem abstraction objects.
     An instance of a class derived from FS is an abstraction on some kind of filesystem, such as the OS filesystem or a zip file.
@@ -157,6 +364,12 @@ class FS(object):
 
     _meta = {}
 
+    #: The type of lock used by :py:func:`synchronize`, when thread
+    #: synchronization is enabled. Filesystems that mark their read-only
+    #: methods with :py:func:`synchronize_read` may set this to
+    #: :py:class:`ReadWriteLock`, so that those methods run concurrently.
+    _lock_class = staticmethod(threading.RLock)
+
     def __init__(self, thread_synchronize=True):
         """The base class for Filesystem objects.
 
@@ -169,7 +382,7 @@ class FS(object):
         super(FS, self).__init__()
         self.thread_synchronize = thread_synchronize
         if thread_synchronize:
-            self._lock = threading.RLock()
+            self._lock = self._lock_class()
         else:
             self._lock = DummyLock()
 
@@ -215,9 +428,11 @@ class FS(object):
         #  type of lock that should be there.  None == no lock,
         #  True == a proper lock, False == a dummy lock.
         state = self.__dict__.copy()
+        #  Executors can't be pickled either; the default will be used.
+        state.pop("_executor", None)
         lock = state.get("_lock", None)
         if lock is not None:
-            if isinstance(lock, threading._RLock):
+            if not isinstance(lock, DummyLock):
                 state["_lock"] = True
             else:
                 state["_lock"] = False
@@ -228,7 +443,7 @@ class FS(object):
         lock = state.get("_lock")
         if lock is not None:
             if lock:
-                self._lock = threading.RLock()
+                self._lock = self._lock_class()
             else:
                 self._lock = DummyLock()
 
@@ -560,9 +775,7 @@ class FS(object):
             raise ValueError("dirs_only and files_only can not both be True")
 
         if wildcard is not None:
-            if not callable(wildcard):
-                wildcard_re = re.compile(fnmatch.translate(wildcard))
-                wildcard = lambda fn: bool(wildcard_re.match(fn))
+            wildcard = compile_wildcard(wildcard)
             entries = [p for p in entries if wildcard(p)]
 
         if dirs_only:
@@ -623,6 +836,58 @@ class FS(object):
                                      dirs_only,
                                      files_only))
 
+    def _listdir_partition(self, path):
+        """Lists a directory once and splits its entries in to directories and files.
+
+        This is the primitive used by :py:meth:`~fs.base.FS.walk`, so that each
+        directory in a tree is listed a single time. The default implementation
+        calls :py:meth:`~fs.base.FS.listdir` and classifies each entry with
+        :py:meth:`~fs.base.FS.isdir`; implementations that can determine the type
+        of an entry from the listing itself should override this method.
+
+        :param path: path of a directory
+        :returns: a tuple of two lists, the names of sub-directories and the names of files
+        :rtype: tuple
+
+        :raises `fs.errors.ResourceNotFoundError`: if the path is not found
+        :raises `fs.errors.ResourceInvalidError`: if the path exists, but is not a directory
+
+        """
+        dirs = []
+        files = []
+        isdir = self.isdir
+        for name in self.listdir(path):
+            if isdir(pathcombine(path, name)):
+                dirs.append(name)
+            else:
+                files.append(name)
+        return dirs, files
+
+    def _listdirinfo_partition(self, path):
+        """Like :py:meth:`~fs.base.FS._listdir_partition`, but each entry is a tuple of name and info dict.
+
+        This is the primitive used by :py:meth:`~fs.base.FS.walkinfo`. The default
+        implementation calls :py:meth:`~fs.base.FS.listdirinfo` and classifies each
+        entry by the ``st_mode`` in its info, if present.
+
+        :param path: path of a directory
+        :returns: a tuple of two lists of (name, info) tuples, for sub-directories and files
+        :rtype: tuple
+
+        :raises `fs.errors.ResourceNotFoundError`: if the path is not found
+        :raises `fs.errors.ResourceInvalidError`: if the path exists, but is not a directory
+
+        """
+        from fs.utils import isdir
+        dirs = []
+        files = []
+        for name, info in self.listdirinfo(path):
+            if isdir(self, pathcombine(path, name), info):
+                dirs.append((name, info))
+            else:
+                files.append((name, info))
+        return dirs, files
+
     def makedir(self, path, recursive=False, allow_recreate=False):
         """Make a directory on the filesystem.
 
@@ -728,6 +993,9 @@ class FS(object):
          * "accessed_time" - A datetime object containing the time the resource was last accessed
          * "modified_time" - A datetime object containing the time the resource was modified
 
+        The info may be a dict, or a dict-like :py:class:`fs.info.Info` object
+        which computes values as they are looked up.
+
         :param path: a path to retrieve information for
         :type path: string
 
@@ -756,6 +1024,79 @@ class FS(object):
         info = self.getinfo(path)
         return dict((k, info[k]) for k in keys if k in info)
 
+    def getinfo_many(self, paths):
+        """Retrieves the info dicts for a number of paths at once.
+
+        The default implementation groups the paths by their parent directory,
+        and where several paths share a parent (and the filesystem provides its
+        own :py:meth:`~fs.base.FS.listdirinfo`) satisfies them all from a single
+        directory listing. Other paths are looked up with :py:meth:`~fs.base.FS.getinfo`.
+        Implementations that can query many paths in one request should override this method.
+
+        :param paths: an iterable of paths
+        :returns: a dictionary that maps each path to its info dict, or to None if the path does not exist
+        :rtype: dict
+
+        """
+        results = {}
+        by_parent = {}
+        for path in paths:
+            if path in results:
+                continue
+            results[path] = None
+            parent, name = pathsplit(abspath(normpath(path)))
+            by_parent.setdefault(parent, []).append((path, name))
+
+        batch_listing = type(self).listdirinfo is not FS.listdirinfo
+        for parent, entries in by_parent.items():
+            if batch_listing and len(entries) > 1:
+                try:
+                    listing = dict(self.listdirinfo(parent))
+                except (ResourceNotFoundError, ParentDirectoryMissingError, ResourceInvalidError):
+                    listing = {}
+                for path, name in entries:
+                    if name:
+                        results[path] = listing.get(name)
+                        continue
+                    results[path] = self._getinfo_or_none(path)
+            else:
+                for path, name in entries:
+                    results[path] = self._getinfo_or_none(path)
+        return results
+
+    def _getinfo_or_none(self, path):
+        """Returns the info dict for a path, or None if it does not exist."""
+        try:
+            return self.getinfo(path)
+        except (ResourceNotFoundError, ParentDirectoryMissingError, ResourceInvalidError):
+            return None
+
+    def exists_many(self, paths):
+        """Check if a number of paths reference valid resources.
+
+        :param paths: an iterable of paths
+        :returns: a dictionary that maps each path to True if it exists, otherwise False
+        :rtype: dict
+
+        """
+        return dict((path, info is not None)
+                    for path, info in self.getinfo_many(paths).items())
+
+    def isdir_many(self, paths):
+        """Check if a number of paths reference directories.
+
+        Paths are classified by the ``st_mode`` in their info dict, where
+        available, otherwise :py:meth:`~fs.base.FS.isdir` is called.
+
+        :param paths: an iterable of paths
+        :returns: a dictionary that maps each path to True if it is a directory, otherwise False
+        :rtype: dict
+
+        """
+        from fs.utils import isdir
+        return dict((path, info is not None and isdir(self, path, info))
+                    for path, info in self.getinfo_many(paths).items())
+
     def desc(self, path):
         """Returns short descriptive text regarding a path. Intended mainly as
         a debugging aid.
@@ -795,6 +1136,69 @@ class FS(object):
             if f is not None:
                 f.close()
 
+    def getrange(self, path, offset, length=None):
+        """Reads a range of bytes from a file.
+
+        The default implementation opens the file, seeks to `offset` and reads.
+        Implementations that can fetch part of a file without opening (or
+        downloading) all of it should override this method.
+
+        :param path: a path of a file to read
+        :param offset: the offset of the first byte to read
+        :param length: the maximum number of bytes to read, or None to read to the end of the file
+        :returns: the bytes read, which may be fewer than `length` if the end of the file is reached
+        :rtype: bytes
+
+        :raises `fs.errors.ResourceNotFoundError`: if the path does not exist
+        :raises `fs.errors.ResourceInvalidError`: if the path is a directory
+        :raises ValueError: if `offset` or `length` is negative
+
+        """
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        if length == 0:
+            return b('')
+        with self.open(path, 'rb') as f:
+            f.seek(offset)
+            if length is None:
+                return f.read()
+            return f.read(length)
+
+    def getranges(self, path, ranges):
+        """Reads several ranges of bytes from a file.
+
+        Ranges that overlap or are adjacent are coalesced, so that each
+        contiguous run of bytes is read once. If the filesystem implements
+        :py:meth:`~fs.base.FS.getrange`, it is called for each run; otherwise
+        the file is opened once and every run is read from it.
+
+        :param path: a path of a file to read
+        :param ranges: an iterable of (offset, length) tuples
+        :returns: a list of the bytes read for each range, in the order given
+        :rtype: list
+
+        """
+        ranges = list(ranges)
+        results = [b('')] * len(ranges)
+        spans = _coalesce_ranges(ranges)
+        if not spans:
+            return results
+
+        if type(self).getrange is FS.getrange:
+            with self.open(path, 'rb') as f:
+                span_data = []
+                for offset, length, _members in spans:
+                    f.seek(offset)
+                    span_data.append(f.read(length))
+        else:
+            span_data = [self.getrange(path, offset, length) for offset, length, _members in spans]
+
+        for (span_offset, _span_length, members), data in zip(spans, span_data):
+            for index, offset, length in members:
+                start = offset - span_offset
+                results[index] = data[start:start + length]
+        return results
+
     def _setcontents(self,
                      path,
                      data,
@@ -804,10 +1208,15 @@ class FS(object):
                      progress_callback=None,
                      finished_callback=None):
         """Does the work of setcontents. Factored out, so that `setcontents_async` can use it"""
+        #  Without progress to report, binary files may be copied by the kernel
+        copy_data = progress_callback is None
         if progress_callback is None:
             progress_callback = lambda bytes_written: None
         if finished_callback is None:
             finished_callback = lambda: None
+        if isinstance(data, memoryview):
+            #  Written as is, but counted in bytes
+            data = iotools.byte_view(data)
 
         if not data:
             progress_callback(0)
@@ -827,11 +1236,18 @@ class FS(object):
                 f = self.open(path, 'wb')
             write = f.write
             try:
-                while chunk:
+                if copy_data and not isinstance(chunk, six.text_type):
                     write(chunk)
-                    bytes_written += len(chunk)
+                    bytes_written = len(chunk)
+                    if chunk:
+                        bytes_written += iotools.copy_file_data(data, f, chunk_size)
                     progress_callback(bytes_written)
-                    chunk = read(chunk_size)
+                else:
+                    while chunk:
+                        write(chunk)
+                        bytes_written += len(chunk)
+                        progress_callback(bytes_written)
+                        chunk = read(chunk_size)
             finally:
                 f.close()
         else:
@@ -852,7 +1268,8 @@ class FS(object):
         """A convenience method to create a new file from a string or file-like object
 
         :param path: a path of the file to create
-        :param data: a string or bytes object containing the contents for the new file
+        :param data: a string, a bytes-like object (such as a bytearray or memoryview,
+            which is written without being copied), or a file-like object containing the contents for the new file
         :param encoding: if `data` is a file open in text mode, or a text string, then use this `encoding` to write to the destination file
         :param errors: if `data` is a file open in text mode or a text string, then use `errors` when opening the destination file
         :param chunk_size: Number of bytes to read in a chunk, if the implementation has to resort to a read / copy loop
@@ -871,8 +1288,11 @@ class FS(object):
                           error_callback=None):
         """Create a new file from a string or file-like object asynchronously
 
-        This method returns a ``threading.Event`` object. Call the ``wait`` method on the event object
-        to block until all data has been written, or simply ignore it.
+        The file is written on the filesystem's executor (see :py:meth:`~fs.base.FS.setexecutor`).
+        This method returns a :py:class:`~fs.executor.FSFuture`, whose result is the number
+        of bytes written. Call the ``result`` method to block until the data has been written
+        (and re-raise any error), or simply ignore it. If `data` is a file-like object, it must
+        remain open until the future has completed.
 
         :param path: a path of the file to create
         :param data: a string or a file-like object containing the contents for the new file
@@ -884,30 +1304,80 @@ class FS(object):
         :param finished_callback: A function that is called when all data has been written
         :param error_callback: A function that is called with an exception
             object if any error occurs during the copy process.
-        :returns: An event object that is set when the copy is complete, call
-            the `wait` method of this object to block until the data is written
+        :returns: a future that completes when the data has been written
 
         """
 
-        finished_event = threading.Event()
-
         def do_setcontents():
             try:
-                self._setcontents(path,
-                                  data,
-                                  encoding=encoding,
-                                  errors=errors,
-                                  chunk_size=1024 * 64,
-                                  progress_callback=progress_callback,
-                                  finished_callback=finished_callback)
+                return self._setcontents(path,
+                                         data,
+                                         encoding=encoding,
+                                         errors=errors,
+                                         chunk_size=chunk_size,
+                                         progress_callback=progress_callback,
+                                         finished_callback=finished_callback)
             except Exception as e:
                 if error_callback is not None:
                     error_callback(e)
-            finally:
-                finished_event.set()
+                raise
 
-        threading.Thread(target=do_setcontents).start()
-        return finished_event
+        return self._get_executor().submit(do_setcontents)
+
+    def getcontents_async(self, path, mode='rb', encoding=None, errors=None, newline=None):
+        """Reads the contents of a file asynchronously.
+
+        :param path: A path of file to read
+        :param mode: Mode to open file with (should be 'rb' for binary or 't' for text)
+        :param encoding: Encoding to use when reading contents in text mode
+        :param errors: Unicode errors parameter if text mode is use
+        :param newline: Newlines parameter for text mode decoding
+        :returns: a :py:class:`~fs.executor.FSFuture` whose result is the file contents
+
+        """
+        return self._get_executor().submit(self.getcontents,
+                                           path,
+                                           mode=mode,
+                                           encoding=encoding,
+                                           errors=errors,
+                                           newline=newline)
+
+    def copy_async(self, src, dst, overwrite=False, chunk_size=1024 * 64):
+        """Copies a file from src to dst asynchronously. See :py:meth:`~fs.base.FS.copy`.
+
+        :param src: the source path
+        :param dst: the destination path
+        :param overwrite: if True, then an existing file at the destination may be overwritten
+        :param chunk_size: size of chunks to use if a simple copy is required
+        :returns: a :py:class:`~fs.executor.FSFuture` that completes when the file has been copied
+
+        """
+        return self._get_executor().submit(self.copy, src, dst, overwrite=overwrite, chunk_size=chunk_size)
+
+    def remove_async(self, path):
+        """Removes a file asynchronously. See :py:meth:`~fs.base.FS.remove`.
+
+        :param path: the path of the file to remove
+        :returns: a :py:class:`~fs.executor.FSFuture` that completes when the file has been removed
+
+        """
+        return self._get_executor().submit(self.remove, path)
+
+    def setexecutor(self, executor):
+        """Sets the executor used by the asynchronous methods of this filesystem.
+
+        :param executor: a :py:class:`~fs.executor.BoundedExecutor` (or any object with a
+            compatible ``submit`` method), or None to use the shared default executor
+
+        """
+        self._executor = executor
+
+    def _get_executor(self):
+        executor = getattr(self, '_executor', None)
+        if executor is None:
+            from fs.executor import get_default_executor
+            executor = get_default_executor()
+        return executor
 
     def createfile(self, path, wipe=False):
         """Creates an empty file if it doesn't exist
@@ -972,67 +1442,76 @@ class FS(object):
 
         """
 
+        wildcard = compile_wildcard(wildcard)
+
+        for current_path, _dirnames, filenames in self._walk(path, dir_wildcard, search, ignore_errors):
+            yield (current_path, [name for name in filenames if wildcard(name)])
+
+    def _walk(self, path, dir_wildcard=None, search="breadth", ignore_errors=False, info=False):
+        """The directory walking engine used by :py:meth:`~fs.base.FS.walk` and :py:meth:`~fs.base.FS.walkinfo`.
+
+        Each directory is listed exactly once, with :py:meth:`~fs.base.FS._listdir_partition`
+        (or :py:meth:`~fs.base.FS._listdirinfo_partition` if `info` is True). Yields a tuple of
+        the path of each directory, the entries of the sub-directories that will be walked and
+        the entries of its files. An entry is a name, or a tuple of name and info dict if `info`
+        is True.
+
+        """
         path = normpath(path)
 
         if not self.exists(path):
             raise ResourceNotFoundError(path)
 
-        def listdir(path, *args, **kwargs):
+        if info:
+            partition = self._listdirinfo_partition
+            entry_name = lambda entry: entry[0]
+        else:
+            partition = self._listdir_partition
+            entry_name = lambda entry: entry
+
+        def listdir_partition(path):
             if ignore_errors:
                 try:
-                    return self.listdir(path, *args, **kwargs)
+                    return partition(path)
                 except:
-                    return []
+                    return [], []
             else:
-                return self.listdir(path, *args, **kwargs)
-
-        if wildcard is None:
-            wildcard = lambda f: True
-        elif not callable(wildcard):
-            wildcard_re = re.compile(fnmatch.translate(wildcard))
-            wildcard = lambda fn: bool(wildcard_re.match(fn))
+                return partition(path)
 
-        if dir_wildcard is None:
-            dir_wildcard = lambda f: True
-        elif not callable(dir_wildcard):
-            dir_wildcard_re = re.compile(fnmatch.translate(dir_wildcard))
-            dir_wildcard = lambda fn: bool(dir_wildcard_re.match(fn))
+        dir_wildcard = compile_wildcard(dir_wildcard)
 
         if search == "breadth":
             dirs = [path]
             dirs_append = dirs.append
             dirs_pop = dirs.pop
-            isdir = self.isdir
             while dirs:
                 current_path = dirs_pop()
-                paths = []
-                paths_append = paths.append
                 try:
-                    for filename in listdir(current_path, dirs_only=True):
-                        path = pathcombine(current_path, filename)
-                        if dir_wildcard(path):
-                            dirs_append(path)
-                    for filename in listdir(current_path, files_only=True):
-                        path = pathcombine(current_path, filename)
-                        if wildcard(filename):
-                            paths_append(filename)
+                    dir_entries, file_entries = listdir_partition(current_path)
                 except ResourceNotFoundError:
                     # Could happen if another thread / process deletes something whilst we are walking
-                    pass
-
-                yield (current_path, paths)
+                    dir_entries, file_entries = [], []
+                walk_entries = []
+                for entry in dir_entries:
+                    path = pathcombine(current_path, entry_name(entry))
+                    if dir_wildcard(path):
+                        dirs_append(path)
+                        walk_entries.append(entry)
+                yield (current_path, walk_entries, file_entries)
 
         elif search == "depth":
 
             def recurse(recurse_path):
                 try:
-                    for path in listdir(recurse_path, wildcard=dir_wildcard, full=True, dirs_only=True):
-                        for p in recurse(path):
-                            yield p
+                    dir_entries, file_entries = listdir_partition(recurse_path)
                 except ResourceNotFoundError:
                     # Could happen if another thread / process deletes something whilst we are walking
-                    pass
-                yield (recurse_path, listdir(recurse_path, wildcard=wildcard, files_only=True))
+                    dir_entries, file_entries = [], []
+                walk_entries = [entry for entry in dir_entries if dir_wildcard(entry_name(entry))]
+                for entry in walk_entries:
+                    for p in recurse(pathcombine(recurse_path, entry_name(entry))):
+                        yield p
+                yield (recurse_path, walk_entries, file_entries)
 
             for p in recurse(path):
                 yield p
@@ -1094,6 +1573,109 @@ class FS(object):
         for p, _files in self.walk(path, dir_wildcard=wildcard, search=search, ignore_errors=ignore_errors):
             yield p
 
+    def walkinfo(self,
+                 path="/",
+                 wildcard=None,
+                 dir_wildcard=None,
+                 search="breadth",
+                 ignore_errors=False):
+        """Like the 'walk' method, but yields a tuple of the path and info dict
+        of each directory and file beneath `path`.
+
+        Info is retrieved with the directory listing (see :py:meth:`~fs.base.FS.listdirinfo`),
+        which is generally much faster than calling :py:meth:`~fs.base.FS.getinfo`
+        on each path, particularly for network based filesystems.
+
+        :param path: root path to start walking
+        :type path: string
+        :param wildcard: if given, only return files that match this wildcard
+        :type wildcard: A string containing a wildcard (e.g. `*.txt`) or a callable that takes the file path and returns a boolean
+        :param dir_wildcard: if given, only walk directories that match the wildcard
+        :type dir_wildcard: A string containing a wildcard (e.g. `*.txt`) or a callable that takes the directory name and returns a boolean
+        :param search: a string identifying the method used to walk the directories. There are two such methods:
+
+             * ``"breadth"`` yields paths in the top directories first
+             * ``"depth"`` yields the deepest paths first
+
+        :param ignore_errors: ignore any errors reading the directory
+        :type ignore_errors: bool
+
+        :rtype: iterator of (path, info)
+
+        """
+        wildcard = compile_wildcard(wildcard)
+
+        for current_path, dir_entries, file_entries in self._walk(path, dir_wildcard, search, ignore_errors, info=True):
+            for name, info in dir_entries:
+                yield (pathcombine(current_path, name), info)
+            for name, info in file_entries:
+                if wildcard(name):
+                    yield (pathcombine(current_path, name), info)
+
+    def walkfilesinfo(self,
+                      path="/",
+                      wildcard=None,
+                      dir_wildcard=None,
+                      search="breadth",
+                      ignore_errors=False):
+        """Like the 'walkfiles' method, but yields a tuple of the file path and its info dict.
+
+        :param path: root path to start walking
+        :type path: string
+        :param wildcard: if given, only return files that match this wildcard
+        :type wildcard: A string containing a wildcard (e.g. `*.txt`) or a callable that takes the file path and returns a boolean
+        :param dir_wildcard: if given, only walk directories that match the wildcard
+        :type dir_wildcard: A string containing a wildcard (e.g. `*.txt`) or a callable that takes the directory name and returns a boolean
+        :param search: a string identifying the method used to walk the directories. There are two such methods:
+
+             * ``"breadth"`` yields paths in the top directories first
+             * ``"depth"`` yields the deepest paths first
+
+        :param ignore_errors: ignore any errors reading the directory
+        :type ignore_errors: bool
+
+        :rtype: iterator of (file path, info)
+
+        """
+        wildcard = compile_wildcard(wildcard)
+
+        for current_path, _dir_entries, file_entries in self._walk(path, dir_wildcard, search, ignore_errors, info=True):
+            for name, info in file_entries:
+                if wildcard(name):
+                    yield (pathcombine(current_path, name), info)
+
+    def glob(self, pattern):
+        """Gets the paths that match a glob pattern, such as ``'src/**/*.py'``.
+
+        See :py:mod:`fs.glob` for the pattern syntax. Only the directories
+        that could contain a match are listed.
+
+        :param pattern: a glob pattern
+        :type pattern: string
+
+        :returns: a list of the absolute paths of the files and directories that
+            match the pattern, in no particular order
+        :rtype: list
+
+        """
+        return list(self.iglob(pattern))
+
+    def iglob(self, pattern):
+        """Generator version of :py:meth:`~fs.base.FS.glob`.
+
+        The default implementation lists directories with
+        :py:meth:`~fs.base.FS._listdir_partition`. Implementations that can
+        match paths without listing each directory (e.g. in an index of paths)
+        may override this method; see :py:func:`fs.glob.compile_glob`.
+
+        :param pattern: a glob pattern
+        :type pattern: string
+
+        :rtype: iterator of paths
+
+        """
+        return _iglob(self, pattern)
+
     def getsize(self, path):
         """Returns the size (in bytes) of a resource.
 
@@ -1110,6 +1692,32 @@ class FS(object):
             raise OperationFailedError("get size of resource", path)
         return size
 
+    def gethash(self, path, algorithm='md5', chunk_size=1024 * 64):
+        """Gets a hash of the contents of a file.
+
+        The default implementation reads the file a chunk at a time.
+        Implementations that can get a hash without reading the file (e.g.
+        from a checksum stored along with it) should override this method,
+        and fall back to the default for algorithms they don't support.
+
+        :param path: a path of a file
+        :param algorithm: ``'crc32'``, or the name of a hash algorithm supported
+            by :py:mod:`hashlib`, such as ``'md5'``, ``'sha1'`` or ``'sha256'``
+        :param chunk_size: the size of chunks to read the file in
+        :returns: the hash, as a string of lower case hex digits
+        :rtype: string
+
+        :raises ValueError: if the algorithm isn't supported
+        :raises `fs.errors.ResourceNotFoundError`: if the path does not exist
+        :raises `fs.errors.ResourceInvalidError`: if the path is a directory
+
+        """
+        hasher = _make_hasher(algorithm)
+        with self.open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b('')):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
     def copy(self, src, dst, overwrite=False, chunk_size=1024 * 64):
         """Copies a file from src to dst.
 
@@ -1154,8 +1762,13 @@ class FS(object):
     @classmethod
     @convert_os_errors
     def _shutil_copyfile(cls, src_syspath, dst_syspath):
+        #  Like shutil.copyfile, but the data is copied by the kernel where possible
+        if os.path.exists(dst_syspath) and os.path.samefile(src_syspath, dst_syspath):
+            raise shutil.SameFileError("{0!r} and {1!r} are the same file".format(src_syspath, dst_syspath))
         try:
-            shutil.copyfile(src_syspath, dst_syspath)
+            with open(src_syspath, 'rb') as src_file:
+                with open(dst_syspath, 'wb') as dst_file:
+                    iotools.copy_file_data(src_file, dst_file)
         except IOError as e:
             #  shutil reports ENOENT when a parent directory is missing
             if getattr(e, "errno", None) == errno.ENOENT:
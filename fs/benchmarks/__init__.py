@@ -0,0 +1,16 @@
+"""
+fs.benchmarks
+=============
+
+Benchmarks for PyFilesystem. Each module in this package may be run as a
+script, e.g.::
+
+    python -m fs.benchmarks.copyfile --size 512
+
+:py:mod:`fs.benchmarks.suite` runs a standard set of workloads against every
+filesystem implementation, and compares the timings with a stored baseline::
+
+    python -m fs.benchmarks.suite --output baseline.json
+    python -m fs.benchmarks.suite --baseline baseline.json
+
+"""
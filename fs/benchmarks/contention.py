@@ -0,0 +1,140 @@
+"""
+fs.benchmarks.contention
+========================
+
+Measures read throughput as the number of reader threads grows, with the
+filesystem's lock as a plain ``threading.RLock`` (every synchronized method
+is exclusive) and as a :py:class:`fs.base.ReadWriteLock` (read-only methods
+are shared).
+
+The ``zip`` workload reads deflated files from a ZipFS; decompression and
+file reads release the GIL, so shared reads can run in parallel. The
+``memory`` workload calls getinfo / listdir / getcontents on a MemoryFS,
+which is mostly pure Python, so it only scales where the interpreter runs
+threads in parallel.
+
+Run with::
+
+    python -m fs.benchmarks.contention --fs zip --threads 1 2 4 8 16 32
+
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+
+from fs.base import ReadWriteLock
+from fs.memoryfs import MemoryFS
+from fs.tempfs import TempFS
+from fs.zipfs import ZipFS
+
+
+def make_memory_fs(files, size):
+    mem_fs = MemoryFS()
+    mem_fs.makedir("data")
+    for i in range(files):
+        mem_fs.setcontents("data/%04d.bin" % i, os.urandom(size))
+    return mem_fs, None
+
+
+def make_zip_fs(files, size):
+    temp_fs = TempFS()
+    zip_path = temp_fs.getsyspath("bench.zip")
+    with ZipFS(zip_path, "w") as zip_fs:
+        zip_fs.makedir("data")
+        for i in range(files):
+            #  Compressible, but not trivially so
+            data = os.urandom(size // 4) * 4
+            zip_fs.setcontents("data/%04d.bin" % i, data)
+    return ZipFS(zip_path, "r"), temp_fs
+
+
+def read_ops(fs, workload):
+    names = fs.listdir("data")
+    paths = ["data/" + name for name in names]
+    if workload == "memory":
+        def op(rnd):
+            path = rnd.choice(paths)
+            fs.getinfo(path)
+            fs.listdir("data")
+            fs.getcontents(path)
+    else:
+        def op(rnd):
+            fs.getcontents(rnd.choice(paths))
+    return op
+
+
+def set_lock(fs, lock_class):
+    fs._lock = lock_class()
+    path_fs = getattr(fs, "_path_fs", None)
+    if path_fs is not None:
+        path_fs._lock = lock_class()
+
+
+def measure(op, threads, duration):
+    """Runs `op` in `threads` threads for `duration` seconds, and returns operations per second."""
+    counts = [0] * threads
+    start_event = threading.Event()
+    stop_event = threading.Event()
+
+    def worker(index):
+        rnd = random.Random(index)
+        start_event.wait()
+        count = 0
+        while not stop_event.is_set():
+            op(rnd)
+            count += 1
+        counts[index] = count
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    start = time.time()
+    start_event.set()
+    time.sleep(duration)
+    stop_event.set()
+    for thread in workers:
+        thread.join()
+    return sum(counts) / (time.time() - start)
+
+
+def run(workload="zip", thread_counts=(1, 2, 4, 8, 16, 32), duration=1.0, files=64, size=256 * 1024, out=sys.stdout):
+    """Runs the benchmark, and returns a dict that maps the lock name on to a
+    list of (threads, operations per second)."""
+    if workload == "memory":
+        fs, temp_fs = make_memory_fs(files, size)
+    else:
+        fs, temp_fs = make_zip_fs(files, size)
+    results = {}
+    try:
+        op = read_ops(fs, workload)
+        locks = [("RLock", threading.RLock), ("ReadWriteLock", ReadWriteLock)]
+        out.write("%-8s %16s %16s %8s\n" % ("threads", "RLock ops/s", "RWLock ops/s", "ratio"))
+        for name, lock_class in locks:
+            set_lock(fs, lock_class)
+            results[name] = [(threads, measure(op, threads, duration)) for threads in thread_counts]
+        for (threads, exclusive), (_threads, shared) in zip(results["RLock"], results["ReadWriteLock"]):
+            out.write("%-8d %16.1f %16.1f %7.2fx\n" % (threads, exclusive, shared, shared / exclusive))
+    finally:
+        fs.close()
+        if temp_fs is not None:
+            temp_fs.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark concurrent reads with exclusive and shared locks")
+    parser.add_argument("--fs", choices=["zip", "memory"], default="zip", help="the workload to run")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="numbers of reader threads")
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds to run for each thread count")
+    parser.add_argument("--files", type=int, default=64, help="number of files to read from")
+    parser.add_argument("--size", type=int, default=256, help="file size in KiB")
+    args = parser.parse_args(argv)
+    run(args.fs, args.threads, args.duration, args.files, args.size * 1024)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+fs.benchmarks.copyfile
+======================
+
+Compares copying a large file a chunk at a time in Python, with the kernel
+copy (``copy_file_range`` / ``sendfile``) used by :py:meth:`fs.base.FS.copy`
+and :py:func:`fs.utils.copyfile`.
+
+Run with::
+
+    python -m fs.benchmarks.copyfile --size 1024 --repeat 3
+
+"""
+
+import sys
+import time
+import argparse
+
+from fs.tempfs import TempFS
+from fs import utils
+
+
+def python_copy(src_fs, src_path, dst_fs, dst_path, chunk_size=64 * 1024):
+    """Copies a file through user space, as was done before kernel copies were used."""
+    with src_fs.open(src_path, 'rb') as src:
+        with dst_fs.open(dst_path, 'wb') as dst:
+            read = src.read
+            write = dst.write
+            chunk = read(chunk_size)
+            while chunk:
+                write(chunk)
+                chunk = read(chunk_size)
+
+
+def make_file(fs, path, size):
+    block = b'\xa5' * (1024 * 1024)
+    with fs.open(path, 'wb') as f:
+        for _ in range(size):
+            f.write(block)
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        times.append(time.time() - start)
+    return min(times)
+
+
+def run(size=256, repeat=3, out=sys.stdout):
+    """Runs the benchmark with a file of `size` MiB, and returns a dict of the best
+    times (in seconds) for each method."""
+    results = {}
+    with TempFS() as src_fs:
+        with TempFS() as dst_fs:
+            make_file(src_fs, "src", size)
+            methods = [
+                ("python loop", lambda: python_copy(src_fs, "src", dst_fs, "dst")),
+                ("FS.copy", lambda: src_fs.copy("src", "copy", overwrite=True)),
+                ("utils.copyfile", lambda: utils.copyfile(src_fs, "src", dst_fs, "dst")),
+                ("copyfile_non_atomic", lambda: utils.copyfile_non_atomic(src_fs, "src", dst_fs, "dst")),
+            ]
+            for name, func in methods:
+                results[name] = seconds = best_time(func, repeat)
+                out.write("%-20s %8.3fs %10.1f MiB/s\n" % (name, seconds, size / seconds))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark large file copies")
+    parser.add_argument("--size", type=int, default=256, help="file size in MiB")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per method")
+    args = parser.parse_args(argv)
+    run(args.size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+fs.benchmarks.importtime
+========================
+
+Measures how long it takes to import modules, in a fresh interpreter with
+``python -X importtime``. Command line tools pay this cost on every run.
+
+Run with::
+
+    python -m fs.benchmarks.importtime fs.opener fs.osfs --repeat 5
+
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+
+#: The modules that are timed by default
+MODULES = ["fs", "fs.opener", "fs.osfs", "fs.commands.fsls"]
+
+
+def import_profile(module):
+    """Imports a module in a new interpreter, and returns a dict that maps the
+    name of each module imported on to its cumulative import time in seconds."""
+    #  The interpreter finds modules where this one does, from any directory
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(os.path.abspath(path) for path in sys.path))
+    process = subprocess.Popen([sys.executable, "-X", "importtime", "-c", "import " + module],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               universal_newlines=True, env=env)
+    _stdout, stderr = process.communicate()
+    if process.returncode:
+        raise ImportError("unable to import %s:\n%s" % (module, stderr))
+    profile = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            cumulative = int(fields[1])
+        except (IndexError, ValueError):
+            #  The header line
+            continue
+        profile[fields[2].strip()] = cumulative / 1000000.0
+    return profile
+
+
+def run(modules=MODULES, repeat=3, out=sys.stdout):
+    """Times importing each module `repeat` times, and returns a dict that maps
+    each module on to a dict with the best time in `seconds`, and the `fs`
+    modules it imported in `imports`."""
+    results = {}
+    for module in modules:
+        times = []
+        for _ in range(repeat):
+            profile = import_profile(module)
+            times.append(profile[module])
+        results[module] = {"seconds": min(times),
+                           "imports": sorted(name for name in profile
+                                             if name == "fs" or name.startswith("fs."))}
+        if out is not None:
+            out.write("%-20s %8.1fms %4d fs modules\n"
+                      % (module, min(times) * 1000, len(results[module]["imports"])))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark module import times")
+    parser.add_argument("modules", nargs="*", default=MODULES, help="modules to import")
+    parser.add_argument("--repeat", type=int, default=3, help="number of imports per module")
+    args = parser.parse_args(argv)
+    run(args.modules, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+fs.benchmarks.memory
+====================
+
+Measures the memory used by each entry of a :py:class:`~fs.memoryfs.MemoryFS`,
+by building a tree of small files and directories with :py:mod:`tracemalloc`
+tracing allocations.
+
+Run with::
+
+    python -m fs.benchmarks.memory --files 100000 --size 16
+
+"""
+
+import sys
+import argparse
+import tracemalloc
+
+
+def measure(files=10000, size=0, files_per_dir=100, fs_factory=None):
+    """Builds a MemoryFS with `files` files of `size` bytes, in directories of
+    `files_per_dir` files, and returns a dict with the number of `entries`
+    (files and directories), the `bytes` allocated and the `bytes_per_entry`.
+
+    :param fs_factory: a callable that creates the filesystem, defaults to
+        :py:class:`~fs.memoryfs.MemoryFS`
+
+    """
+    if fs_factory is None:
+        from fs.memoryfs import MemoryFS
+        fs_factory = MemoryFS
+    contents = b"x" * size
+    dirs = (files + files_per_dir - 1) // files_per_dir
+    names = ["%06d.txt" % index for index in range(files_per_dir)]
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        fs = fs_factory()
+        remaining = files
+        for dir_index in range(dirs):
+            dir_path = "dir%06d" % dir_index
+            fs.makedir(dir_path)
+            for name in names[:remaining]:
+                fs.setcontents(dir_path + "/" + name, contents)
+            remaining -= files_per_dir
+        used = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    entries = files + dirs
+    return {"entries": entries,
+            "bytes": used,
+            "bytes_per_entry": float(used) / entries}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MemoryFS memory use per entry")
+    parser.add_argument("--files", type=int, default=10000, help="number of files")
+    parser.add_argument("--size", type=int, default=0, help="size of each file in bytes")
+    parser.add_argument("--files-per-dir", type=int, default=100, help="number of files in each directory")
+    args = parser.parse_args(argv)
+    result = measure(args.files, args.size, args.files_per_dir)
+    sys.stdout.write("%d entries, %.1f bytes per entry (%d bytes)\n"
+                     % (result["entries"], result["bytes_per_entry"], result["bytes"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+fs.benchmarks.metrics
+=====================
+
+Measures the per-call overhead of :py:class:`fs.wrapfs.metricsfs.MetricsFS`,
+by timing small operations on a MemoryFS directly, through a plain WrapFS,
+and through a MetricsFS.
+
+Run with::
+
+    python -m fs.benchmarks.metrics --calls 100000
+
+"""
+
+import sys
+import argparse
+from time import perf_counter
+
+from fs.memoryfs import MemoryFS
+from fs.wrapfs import WrapFS
+from fs.wrapfs.metricsfs import MetricsFS
+
+
+def measure(func, calls):
+    """Calls `func` `calls` times, and returns the mean time per call in seconds."""
+    start = perf_counter()
+    for _ in range(calls):
+        func()
+    return (perf_counter() - start) / calls
+
+
+def run(calls=100000, out=sys.stdout):
+    """Runs the benchmark, and returns a dict that maps the operation name on
+    to a dict of the mean time per call for each wrapper."""
+    mem_fs = MemoryFS()
+    mem_fs.makedir("data")
+    mem_fs.setcontents("data/file.txt", b"x" * 1024)
+    filesystems = [("MemoryFS", mem_fs), ("WrapFS", WrapFS(mem_fs)), ("MetricsFS", MetricsFS(mem_fs))]
+    results = {}
+    out.write("%-12s %12s %12s %12s %10s\n" % ("operation", "MemoryFS us", "WrapFS us", "MetricsFS us", "overhead"))
+    for op in ("getinfo", "exists", "getcontents"):
+        results[op] = timings = {}
+        for name, fs in filesystems:
+            method = getattr(fs, op)
+            timings[name] = measure(lambda: method("data/file.txt"), calls)
+        out.write("%-12s %12.2f %12.2f %12.2f %9.2fus\n" % (op,
+                  timings["MemoryFS"] * 1e6, timings["WrapFS"] * 1e6, timings["MetricsFS"] * 1e6,
+                  (timings["MetricsFS"] - timings["WrapFS"]) * 1e6))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the overhead of MetricsFS")
+    parser.add_argument("--calls", type=int, default=100000, help="calls to make to each operation")
+    args = parser.parse_args(argv)
+    run(args.calls)
+
+
+if __name__ == "__main__":
+    main()
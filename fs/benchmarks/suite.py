@@ -0,0 +1,627 @@
+"""
+fs.benchmarks.suite
+===================
+
+Runs a standard set of workloads against each filesystem implementation, and
+writes the timings as JSON so that they may be compared with a stored
+baseline.
+
+The workloads are:
+
+``small_write`` / ``small_read``
+    Create, then read, many small files with setcontents / getcontents
+
+``large_write`` / ``large_read``
+    Write, then read, a large file sequentially in 64K chunks
+
+``walk``
+    Walk a directory tree
+
+``listdirinfo``
+    List a large directory along with the info for each entry
+
+``copydir`` / ``movedir``
+    Copy, then move, a directory tree
+
+``find_duplicates``
+    Find the duplicate files in a directory with :py:func:`fs.utils.find_duplicates`
+
+The time taken to import the modules in :py:data:`fs.benchmarks.importtime.MODULES`
+is recorded as the workloads of the ``imports`` backend.
+
+The network filesystems are benchmarked against servers from :py:mod:`fs.expose`
+running in a background thread on the loopback interface. Backends that need
+a module which isn't installed are skipped, as are workloads that write to a
+read-only backend. Workloads that fail, or that don't do all of their work
+(such as walking a tree that the backend can't list), are recorded as errors
+rather than timed.
+
+Run with::
+
+    python -m fs.benchmarks.suite --scale quick --output results.json
+    python -m fs.benchmarks.suite --scale quick --baseline results.json
+
+When a baseline is given, the suite exits with a non-zero status if any
+workload is slower than the baseline by more than the threshold. The
+baseline in :py:data:`BASELINE` was run at the quick scale, and is compared
+with by the ``bench`` tox environment.
+
+"""
+
+import os
+import sys
+import json
+import shutil
+import platform
+import tempfile
+import argparse
+import threading
+import socketserver
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+
+from fs.errors import FSError
+from fs.path import pathjoin
+from fs.benchmarks import importtime
+
+
+#: The scales that the workloads may be run at
+SCALES = {
+    "quick": dict(small_files=50, small_size=1024, large_size=1024 * 1024,
+                  tree_depth=2, tree_fanout=3, tree_files=3, dir_files=100, repeat=3),
+    "standard": dict(small_files=500, small_size=4096, large_size=16 * 1024 * 1024,
+                     tree_depth=3, tree_fanout=4, tree_files=5, dir_files=1000, repeat=3),
+}
+
+CHUNK_SIZE = 64 * 1024
+
+#: The stored baseline, run at the quick scale
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+#  Backends
+#
+#  Each backend is a context manager that yields a tuple of (fs, setup_fs).
+#  The workload runs against `fs`; its data is prepared through `setup_fs`,
+#  which is the same FS unless `fs` can't be written to (or is a client of
+#  `setup_fs`).
+
+
+@contextmanager
+def _closing(fs, setup_fs=None):
+    try:
+        yield fs, setup_fs or fs
+    finally:
+        fs.close()
+        if setup_fs is not None:
+            setup_fs.close()
+
+
+@contextmanager
+def _serve(server):
+    """Runs a socketserver in a background thread."""
+    #  RPCFSServer overrides serve_forever with a loop that shutdown() can't stop
+    thread = threading.Thread(target=socketserver.BaseServer.serve_forever, args=(server, 0.05))
+    thread.daemon = True
+    thread.start()
+    try:
+        yield server.server_address
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def memory_backend():
+    from fs.memoryfs import MemoryFS
+    return _closing(MemoryFS())
+
+
+@contextmanager
+def osfs_backend():
+    from fs.osfs import OSFS
+    temp_dir = tempfile.mkdtemp("fsbench")
+    try:
+        with _closing(OSFS(temp_dir)) as fs_pair:
+            yield fs_pair
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def tempfs_backend():
+    from fs.tempfs import TempFS
+    return _closing(TempFS())
+
+
+@contextmanager
+def zipfs_backend():
+    from fs.tempfs import TempFS
+    from fs.zipfs import ZipFS
+    temp_fs = TempFS()
+    zip_path = temp_fs.getsyspath("bench.zip")
+    ZipFS(zip_path, "w").close()
+    with _closing(ZipFS(zip_path, "a"), temp_fs) as (zip_fs, _temp_fs):
+        yield zip_fs, zip_fs
+
+
+@contextmanager
+def sqlitefs_backend():
+    from fs.contrib.sqlitefs import SqliteFS
+    from fs.tempfs import TempFS
+    temp_fs = TempFS()
+    with _closing(SqliteFS(temp_fs.getsyspath("bench.db")), temp_fs) as (sqlite_fs, _temp_fs):
+        yield sqlite_fs, sqlite_fs
+
+
+def mountfs_backend():
+    from fs.memoryfs import MemoryFS
+    from fs.mountfs import MountFS
+    mount_fs = MountFS()
+    mount_fs.mountdir("/", MemoryFS())
+    return _closing(mount_fs)
+
+
+def multifs_backend():
+    from fs.memoryfs import MemoryFS
+    from fs.multifs import MultiFS
+    multi_fs = MultiFS()
+    multi_fs.addfs("empty", MemoryFS())
+    multi_fs.addfs("data", MemoryFS(), write=True)
+    return _closing(multi_fs)
+
+
+def cachefs_backend():
+    from fs.remote import CacheFS
+    from fs.tempfs import TempFS
+    return _closing(CacheFS(TempFS()))
+
+
+def wrapfs_backend():
+    from fs.memoryfs import MemoryFS
+    from fs.wrapfs import WrapFS
+    return _closing(WrapFS(MemoryFS()))
+
+
+def limitsizefs_backend():
+    from fs.memoryfs import MemoryFS
+    from fs.wrapfs.limitsizefs import LimitSizeFS
+    return _closing(LimitSizeFS(MemoryFS(), 1024 * 1024 * 1024))
+
+
+def readonlyfs_backend():
+    from fs.memoryfs import MemoryFS
+    from fs.wrapfs.readonlyfs import ReadOnlyFS
+    mem_fs = MemoryFS()
+    return _closing(ReadOnlyFS(mem_fs), mem_fs)
+
+
+def metricsfs_backend():
+    from fs.memoryfs import MemoryFS
+    from fs.wrapfs.metricsfs import MetricsFS
+    return _closing(MetricsFS(MemoryFS()))
+
+
+@contextmanager
+def rpcfs_backend():
+    from fs.expose.xmlrpc import RPCFSServer
+    from fs.rpcfs import RPCFS
+    from fs.tempfs import TempFS
+    temp_fs = TempFS()
+    with _serve(RPCFSServer(temp_fs, ("127.0.0.1", 0), logRequests=False)) as (host, port):
+        with _closing(RPCFS("http://%s:%d" % (host, port)), temp_fs) as fs_pair:
+            yield fs_pair
+
+
+@contextmanager
+def httpfs_backend():
+    from fs.expose.http import FSHTTPRequestHandler
+    from fs.httpfs import HTTPFS
+    from fs.tempfs import TempFS
+    temp_fs = TempFS()
+
+    class QuietHandler(FSHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    def handler(request, client_address, server):
+        return QuietHandler(temp_fs, request, client_address, server)
+
+    #  Each workload's data is written to the served TempFS before it's timed.
+    #  HTTPFS can't list directories, so the workloads that list them don't
+    #  do their work, and are recorded as errors.
+    with _serve(socketserver.TCPServer(("127.0.0.1", 0), handler)) as (host, port):
+        with _closing(HTTPFS("http://%s:%d/" % (host, port)), temp_fs) as fs_pair:
+            yield fs_pair
+
+
+@contextmanager
+def ftpfs_backend():
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.handlers import FTPHandler
+    from pyftpdlib.servers import FTPServer
+    from fs.ftpfs import FTPFS
+    from fs.tempfs import TempFS
+    temp_fs = TempFS()
+    authorizer = DummyAuthorizer()
+    authorizer.add_user("bench", "bench", temp_fs.getsyspath("/"), perm="elradfmwM")
+
+    class Handler(FTPHandler):
+        pass
+    Handler.authorizer = authorizer
+    server = FTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"timeout": 0.05})
+    thread.daemon = True
+    thread.start()
+    try:
+        host, port = server.address[:2]
+        with _closing(FTPFS(host, "bench", "bench", port=port), temp_fs) as fs_pair:
+            yield fs_pair
+    finally:
+        server.close_all()
+
+
+@contextmanager
+def sftpfs_backend():
+    from fs.expose.sftp import BaseSFTPServer
+    from fs.sftpfs import SFTPFS
+    from fs.tempfs import TempFS
+    temp_fs = TempFS()
+    with _serve(BaseSFTPServer(("127.0.0.1", 0), temp_fs)) as address:
+        with _closing(SFTPFS(address, no_auth=True), temp_fs) as fs_pair:
+            yield fs_pair
+
+
+#: The backends, in the order they are run
+BACKENDS = [
+    ("memoryfs", memory_backend),
+    ("osfs", osfs_backend),
+    ("tempfs", tempfs_backend),
+    ("zipfs", zipfs_backend),
+    ("sqlitefs", sqlitefs_backend),
+    ("mountfs", mountfs_backend),
+    ("multifs", multifs_backend),
+    ("cachefs", cachefs_backend),
+    ("wrapfs", wrapfs_backend),
+    ("limitsizefs", limitsizefs_backend),
+    ("readonlyfs", readonlyfs_backend),
+    ("metricsfs", metricsfs_backend),
+    ("rpcfs", rpcfs_backend),
+    ("httpfs", httpfs_backend),
+    ("ftpfs", ftpfs_backend),
+    ("sftpfs", sftpfs_backend),
+]
+
+
+#  Workloads
+#
+#  Each workload is a tuple of (name, prepare, run, check, writes).
+#  `prepare` (which may be None) creates the data in `path` through the setup
+#  FS, and `run` is the part that is timed; both are called with
+#  (fs, path, scale). `check` is then called with the setup FS, the path, the
+#  scale and what `run` returned, and raises WorkloadNotDone if the workload
+#  didn't do all of its work. Workloads that write to `fs` are skipped on
+#  read-only filesystems.
+
+
+class WorkloadNotDone(Exception):
+    """Raised when a workload didn't do all of its work, so its time
+    doesn't measure anything."""
+
+
+def _expect(verb, done, expected, unit):
+    if done != expected:
+        raise WorkloadNotDone("%s %d of %d %s" % (verb, done, expected, unit))
+
+
+def _make_files(fs, path, count, size):
+    data = b"\x5a" * size
+    for i in range(count):
+        fs.setcontents(pathjoin(path, "%05d.dat" % i), data)
+
+
+def _make_tree(fs, path, scale, depth=None):
+    if depth is None:
+        depth = scale["tree_depth"]
+    fs.makedir(path, recursive=True, allow_recreate=True)
+    _make_files(fs, path, scale["tree_files"], scale["small_size"])
+    if depth:
+        for i in range(scale["tree_fanout"]):
+            _make_tree(fs, pathjoin(path, "dir%02d" % i), scale, depth - 1)
+
+
+def _tree_files(scale):
+    """The number of files in a tree made by _make_tree."""
+    return scale["tree_files"] * sum(scale["tree_fanout"] ** depth
+                                     for depth in range(scale["tree_depth"] + 1))
+
+
+def prepare_small(fs, path, scale):
+    _make_files(fs, path, scale["small_files"], scale["small_size"])
+
+
+def run_small_write(fs, path, scale):
+    prepare_small(fs, path, scale)
+
+
+def check_small_write(fs, path, scale, result):
+    _expect("wrote", len(fs.listdir(path, files_only=True)), scale["small_files"], "files")
+
+
+def run_small_read(fs, path, scale):
+    read = 0
+    for i in range(scale["small_files"]):
+        read += len(fs.getcontents(pathjoin(path, "%05d.dat" % i)))
+    return read
+
+
+def check_small_read(fs, path, scale, result):
+    _expect("read", result, scale["small_files"] * scale["small_size"], "bytes")
+
+
+def run_large_write(fs, path, scale):
+    chunk = b"\xa5" * CHUNK_SIZE
+    remaining = scale["large_size"]
+    with fs.open(pathjoin(path, "large.dat"), "wb") as f:
+        while remaining > 0:
+            f.write(chunk[:remaining])
+            remaining -= CHUNK_SIZE
+
+
+def check_large_write(fs, path, scale, result):
+    _expect("wrote", fs.getsize(pathjoin(path, "large.dat")), scale["large_size"], "bytes")
+
+
+def run_large_read(fs, path, scale):
+    read = 0
+    with fs.open(pathjoin(path, "large.dat"), "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            read += len(chunk)
+    return read
+
+
+def check_large_read(fs, path, scale, result):
+    _expect("read", result, scale["large_size"], "bytes")
+
+
+def prepare_tree(fs, path, scale):
+    _make_tree(fs, pathjoin(path, "src"), scale)
+
+
+def run_walk(fs, path, scale):
+    walked = 0
+    for _dirpath, files in fs.walk(pathjoin(path, "src")):
+        walked += len(files)
+    return walked
+
+
+def check_walk(fs, path, scale, result):
+    _expect("walked", result, _tree_files(scale), "files")
+
+
+def prepare_listdirinfo(fs, path, scale):
+    _make_files(fs, path, scale["dir_files"], 16)
+
+
+def run_listdirinfo(fs, path, scale):
+    return len(fs.listdirinfo(path))
+
+
+def check_listdirinfo(fs, path, scale, result):
+    _expect("listed", result, scale["dir_files"], "files")
+
+
+def run_copydir(fs, path, scale):
+    fs.copydir(pathjoin(path, "src"), pathjoin(path, "dst"))
+
+
+def run_movedir(fs, path, scale):
+    fs.movedir(pathjoin(path, "src"), pathjoin(path, "dst"))
+
+
+def check_copydir(fs, path, scale, result):
+    _expect("copied", len(list(fs.walkfiles(pathjoin(path, "dst")))), _tree_files(scale), "files")
+
+
+def _duplicate_values(scale):
+    #  One file in four has the same contents as another
+    count = scale["dir_files"]
+    return [i % (count * 3 // 4 or 1) for i in range(count)]
+
+
+def prepare_duplicates(fs, path, scale):
+    size = scale["small_size"]
+    for i, value in enumerate(_duplicate_values(scale)):
+        fs.setcontents(pathjoin(path, "%05d.dat" % i), (b"%08d" % value) * (size // 8))
+
+
+def run_find_duplicates(fs, path, scale):
+    from fs.utils import find_duplicates
+    found = 0
+    for paths in find_duplicates(fs, fs.walkfiles(path)):
+        found += len(paths)
+    return found
+
+
+def check_find_duplicates(fs, path, scale, result):
+    values = _duplicate_values(scale)
+    _expect("found", result, sum(count for count in Counter(values).values() if count > 1),
+            "duplicate files")
+
+
+#: The workloads, in the order they are run
+WORKLOADS = [
+    ("small_write", None, run_small_write, check_small_write, True),
+    ("small_read", prepare_small, run_small_read, check_small_read, False),
+    ("large_write", None, run_large_write, check_large_write, True),
+    ("large_read", run_large_write, run_large_read, check_large_read, False),
+    ("walk", prepare_tree, run_walk, check_walk, False),
+    ("listdirinfo", prepare_listdirinfo, run_listdirinfo, check_listdirinfo, False),
+    ("copydir", prepare_tree, run_copydir, check_copydir, True),
+    ("movedir", prepare_tree, run_movedir, check_copydir, True),
+    ("find_duplicates", prepare_duplicates, run_find_duplicates, check_find_duplicates, False),
+]
+
+
+def run_workload(fs, setup_fs, name, prepare, run, check, scale):
+    """Runs a workload `scale['repeat']` times, and returns a dict with the
+    best time in `seconds` and all the times in `times`.
+
+    :raises WorkloadNotDone: if the workload didn't do all of its work
+
+    """
+    times = []
+    for repeat in range(scale["repeat"]):
+        path = "bench-%s-%d" % (name, repeat)
+        setup_fs.makedir(path, allow_recreate=True)
+        try:
+            if prepare is not None:
+                prepare(setup_fs, path, scale)
+            start = perf_counter()
+            result = run(fs, path, scale)
+            times.append(perf_counter() - start)
+            check(setup_fs, path, scale, result)
+        finally:
+            try:
+                setup_fs.removedir(path, force=True)
+            except FSError:
+                pass
+    return {"seconds": min(times), "times": times}
+
+
+def run_suite(backends=None, workloads=None, scale="quick", out=sys.stdout):
+    """Runs the workloads against the backends, and returns the results as a
+    dict that may be serialized as JSON.
+
+    :param backends: names of the backends to run, or None for all of them
+    :param workloads: names of the workloads to run, or None for all of them
+    :param scale: the name of a scale in :py:data:`SCALES`
+    :param out: a file to write progress to, or None
+
+    """
+    scale_settings = SCALES[scale]
+    results = {}
+    for backend_name, backend in BACKENDS:
+        if backends is not None and backend_name not in backends:
+            continue
+        backend_results = results[backend_name] = {}
+        try:
+            with backend() as (fs, setup_fs):
+                read_only = fs.getmeta("read_only", False)
+                for name, prepare, run, check, writes in WORKLOADS:
+                    if workloads is not None and name not in workloads:
+                        continue
+                    if writes and read_only:
+                        result = {"skipped": "read-only filesystem"}
+                    else:
+                        try:
+                            result = run_workload(fs, setup_fs, name, prepare, run, check, scale_settings)
+                        except (FSError, WorkloadNotDone) as e:
+                            result = {"error": "%s: %s" % (e.__class__.__name__, e)}
+                    backend_results[name] = result
+                    if out is not None:
+                        if "seconds" in result:
+                            out.write("%-12s %-16s %10.4fs\n" % (backend_name, name, result["seconds"]))
+                        elif "skipped" in result:
+                            out.write("%-12s %-16s skipped (%s)\n" % (backend_name, name, result["skipped"]))
+                        else:
+                            out.write("%-12s %-16s %s\n" % (backend_name, name, result["error"]))
+        except ImportError as e:
+            backend_results.clear()
+            backend_results["skipped"] = str(e)
+            if out is not None:
+                out.write("%-12s skipped (%s)\n" % (backend_name, e))
+    if backends is None or "imports" in backends:
+        modules = [module for module in importtime.MODULES if workloads is None or module in workloads]
+        #  Import times are noisy, so always take the best of a few runs
+        try:
+            import_results = importtime.run(modules, max(3, scale_settings["repeat"]), out=None)
+        except ImportError as e:
+            results["imports"] = {"skipped": str(e)}
+            if out is not None:
+                out.write("%-12s skipped (%s)\n" % ("imports", e))
+        else:
+            results["imports"] = import_results
+            if out is not None:
+                for module in modules:
+                    out.write("%-12s %-16s %10.4fs\n" % ("imports", module, import_results[module]["seconds"]))
+    return {
+        "format": 1,
+        "scale": scale,
+        "scale_settings": scale_settings,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(results, baseline, threshold=0.25, min_delta=0.001):
+    """Compares results with a baseline.
+
+    :param results: results returned by :py:func:`run_suite`
+    :param baseline: results from a previous run
+    :param threshold: the fraction a workload may slow down by before it is
+        considered a regression
+    :param min_delta: time differences (in seconds) smaller than this are
+        considered noise
+    :returns: a list of (backend, workload, baseline seconds, seconds) for
+        each regression
+
+    """
+    if results.get("scale_settings") != baseline.get("scale_settings"):
+        raise ValueError("the baseline was run at a different scale")
+    regressions = []
+    for backend_name, workload_results in sorted(results["results"].items()):
+        baseline_results = baseline["results"].get(backend_name, {})
+        for name, result in sorted(workload_results.items()):
+            baseline_result = baseline_results.get(name)
+            if not isinstance(baseline_result, dict) or "seconds" not in baseline_result:
+                continue
+            if not isinstance(result, dict) or "seconds" not in result:
+                #  A workload that worked in the baseline, and now fails
+                regressions.append((backend_name, name, baseline_result["seconds"], None))
+                continue
+            before = baseline_result["seconds"]
+            after = result["seconds"]
+            if after > before * (1 + threshold) and after - before > min_delta:
+                regressions.append((backend_name, name, before, after))
+    return regressions
+
+
+def main(argv=None):
+    backend_names = [name for name, _backend in BACKENDS] + ["imports"]
+    workload_names = [workload[0] for workload in WORKLOADS] + importtime.MODULES
+    parser = argparse.ArgumentParser(description="Benchmark filesystem implementations")
+    parser.add_argument("--backends", nargs="+", choices=backend_names, help="backends to run (default all)")
+    parser.add_argument("--workloads", nargs="+", choices=workload_names, help="workloads to run (default all)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="standard", help="size of the workloads")
+    parser.add_argument("--output", help="file to write the results to, as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare with; exits with status 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="slow down (as a fraction) that counts as a regression")
+    parser.add_argument("--min-delta", type=float, default=0.001, help="slow down (in seconds) that is considered noise")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.backends, args.workloads, args.scale)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        for backend_name, name, before, after in regressions:
+            if after is None:
+                sys.stderr.write("REGRESSION %s %s: now fails (was %.4fs)\n" % (backend_name, name, before))
+            else:
+                sys.stderr.write("REGRESSION %s %s: %.4fs -> %.4fs (%+.0f%%)\n"
+                                 % (backend_name, name, before, after, (after / before - 1) * 100))
+        if regressions:
+            sys.stderr.write("%d regression(s) against %s\n" % (len(regressions), args.baseline))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -276,7 +276,7 @@ class Command(object):
 
         opener_table = []
 
-        for fs_opener in opener.openers.values():
+        for fs_opener in opener.list_openers():
             names = fs_opener.names
             desc = getattr(fs_opener, 'desc', '')
             opener_table.append((names, desc))
@@ -398,6 +398,35 @@ class DAVFS(FS):
         #  This will take care of closing the socket when it's done.
         return RemoteFileBuffer(self,path,mode,contents)
 
+    def getrange(self,path,offset,length=None):
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        if length == 0:
+            return b("")
+        if length is None:
+            byte_range = "bytes=%d-" % (offset,)
+        else:
+            byte_range = "bytes=%d-%d" % (offset,offset+length-1,)
+        response = self._request(path,"GET",headers={"Range":byte_range})
+        try:
+            if response.status == 404:
+                raise ResourceNotFoundError(path)
+            if response.status in (401,403):
+                raise PermissionDeniedError("getrange")
+            if response.status == 416:
+                #  The range starts beyond the end of the file
+                return b("")
+            if response.status == 206:
+                return response.read()
+            if response.status != 200:
+                raise_generic_error(response,"getrange",path)
+            if self.isdir(path):
+                raise ResourceInvalidError(path)
+            #  The server ignored the Range header
+            return iotools.read_range(response,offset,length)
+        finally:
+            response.close()
+
     def exists(self,path):
         pf = propfind(prop="<prop xmlns='DAV:'><resourcetype /></prop>")
         response = self._request(path,"PROPFIND",pf.render(),{"Depth":"0"})
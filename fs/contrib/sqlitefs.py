@@ -16,6 +16,7 @@ from fs.path import frombase, basename,pathjoin
 from fs.base import *
 from fs.errors import *
 from fs import _thread_synchronize_default
+from fs.glob import compile_glob
 import apsw
 
 def fetchone(cursor):
@@ -29,6 +30,14 @@ def fetchone(cursor):
         pass
     return(row)
 
+def _like_prefix(prefix):
+    """Gets a LIKE pattern (escaped with a backslash) that matches strings
+    starting with prefix."""
+    prefix = prefix.rstrip('/')
+    for c in '\\%_':
+        prefix = prefix.replace(c, '\\' + c)
+    return prefix + '%'
+
 def remove_end_slash(dirname):
     if dirname.endswith('/'):
         return dirname[:-1]
@@ -556,6 +565,37 @@ class SqliteFS(FS):
         return(pathlist)
 
 
+    def iglob(self, pattern):
+        # Paths are matched against the results of a query, rather than
+        # listing each directory in turn
+        glob = compile_glob(pattern)
+        if glob.is_literal:
+            return super(SqliteFS, self).iglob(pattern)
+        return iter(self._glob_paths(glob))
+
+    @synchronize
+    def _glob_paths(self, glob):
+        self._initdb()
+        # Directories and files are fetched with a single query; the name is
+        # NULL for directories
+        query = "SELECT fullpath, NULL FROM FsDirMetaData where fullpath LIKE ? ESCAPE '\\'"
+        args = (_like_prefix(glob.prefix),)
+        if not glob.dirs_only:
+            query += " UNION ALL SELECT FsDirMetaData.fullpath, FsFileMetaData.name \
+                FROM FsFileMetaData, FsDirMetaData where FsFileMetaData.parent=FsDirMetaData.ROWID \
+                    and FsDirMetaData.fullpath LIKE ? ESCAPE '\\'"
+            args += (_like_prefix(glob.base),)
+        self._querycur.execute(query, args)
+        paths = []
+        for fullpath, name in self._querycur:
+            if name is not None:
+                fullpath = pathjoin(fullpath, name)
+            elif fullpath == '/':
+                continue
+            if glob.match(fullpath):
+                paths.append(fullpath)
+        return paths
+
     @synchronize
     def makedir(self, path, recursive=False, allow_recreate=False):
         self._initdb()
@@ -653,6 +693,33 @@ class SqliteFS(FS):
             info= self._get_file_info(path)
         return(info)
 
+    @synchronize
+    def getrange(self, path, offset, length=None):
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        self._initdb()
+        path = normpath(path)
+        dir_id = self._get_dir_id(dirname(path))
+        file_id = None
+        if dir_id is not None:
+            file_id = self._get_file_id(dir_id, basename(path))
+        if file_id is None:
+            if self._isdir(path):
+                raise ResourceInvalidError(path)
+            raise ResourceNotFoundError(path)
+        content_id = self._get_file_contentid(file_id)
+        #  substr() slices the blob in the database, so only the range is read
+        if length is None:
+            self._querycur.execute("SELECT substr(contents, ?) FROM FsFileTable where rowid=?",
+                                   (offset + 1, content_id))
+        else:
+            self._querycur.execute("SELECT substr(contents, ?, ?) FROM FsFileTable where rowid=?",
+                                   (offset + 1, length, content_id))
+        row = fetchone(self._querycur)
+        if row is None or row[0] is None:
+            return b''
+        return bytes(row[0])
+
 #import msvcrt # built-in module
 #
 #def kbfunc():
@@ -161,7 +161,7 @@ class _TahoeLAFS(FS):
             handler = NullFile()
         else:
             self._log(DEBUG, 'Opening existing file %s for reading' % path)
-            handler = self.getrange(path,0)
+            handler = self._getrange_stream(path, 0)
 
         return RemoteFileBuffer(self, path, mode, handler,
                     write_on_flush=False)
@@ -356,10 +356,21 @@ class _TahoeLAFS(FS):
         return "%s/uri/%s%s" % (webapi, self.dircap, path)
 
     @_fix_path
-    def getrange(self, path, offset, length=None):
+    def _getrange_stream(self, path, offset, length=None):
         return self.connection.get('/uri/%s%s' % (self.dircap, path),
                     offset=offset, length=length)
 
+    def getrange(self, path, offset, length=None):
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        if length == 0:
+            return b('')
+        f = self._getrange_stream(path, offset, length)
+        try:
+            return f.read()
+        finally:
+            f.close()
+
     @_fix_path
     def setcontents(self, path, file, chunk_size=64*1024):
         self._log(INFO, 'Uploading file %s' % path)
@@ -91,12 +91,14 @@ class Connection:
 
         headers = {}
         headers.update(self.headers)
-        if offset:
+        if offset or length:
+            offset = int(offset or 0)
             if length:
+                #  The end of an HTTP byte range is inclusive
                 headers['Range'] = 'bytes=%d-%d' % \
-                                    (int(offset), int(offset+length))
+                                    (offset, offset + int(length) - 1)
             else:
-                headers['Range'] = 'bytes=%d-' % int(offset)
+                headers['Range'] = 'bytes=%d-' % offset
 
         req = Request(''.join([self.webapi, path]), headers=headers)
         return self._urlopen(req)
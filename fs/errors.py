@@ -39,7 +39,6 @@ __all__ = ['FSError',
 
 import sys
 import errno
-import six
 
 from fs.path import *
 from fs.local_functools import wraps
@@ -66,7 +65,7 @@ class FSError(Exception):
     def __unicode__(self):
         keys = {}
         for k,v in self.__dict__.items():
-            if isinstance(v, six.binary_type):
+            if isinstance(v, bytes):
                 v = v.decode(sys.getfilesystemencoding(), 'replace')
             keys[k] = v
         return str(self.msg, encoding=sys.getfilesystemencoding(), errors='replace') % keys
@@ -0,0 +1,138 @@
+"""
+fs.executor
+===========
+
+A bounded executor for asynchronous filesystem operations.
+
+Methods such as :py:meth:`~fs.base.FS.setcontents_async` run on an executor
+rather than starting a thread per call. The executor has a fixed number of
+worker threads and a limit on the number of operations waiting for a
+worker; once that limit is reached, submitting another operation blocks
+until one completes. This keeps the number of threads (and connections) in
+check when many transfers are in flight.
+
+All filesystems share a default executor, unless one is set with
+:py:meth:`~fs.base.FS.setexecutor`. The size of the default executor can
+be changed with :py:func:`set_default_executor`::
+
+    from fs import executor
+    executor.set_default_executor(max_workers=16, max_queued=256)
+
+"""
+
+__all__ = ['FSFuture',
+           'BoundedExecutor',
+           'get_default_executor',
+           'set_default_executor']
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class FSFuture(Future):
+    """A :py:class:`concurrent.futures.Future` for an asynchronous filesystem operation.
+
+    For compatibility with code written when the async methods returned a
+    ``threading.Event``, this also supports ``wait`` and ``is_set``.
+
+    """
+
+    def wait(self, timeout=None):
+        """Blocks until the operation has finished.
+
+        :param timeout: maximum number of seconds to wait, or None to wait indefinitely
+        :returns: True if the operation has finished, otherwise False
+
+        """
+        try:
+            self.exception(timeout)
+        except Exception:
+            pass
+        return self.done()
+
+    def is_set(self):
+        """Returns True if the operation has finished."""
+        return self.done()
+
+
+class BoundedExecutor(object):
+    """Runs callables on a fixed pool of threads, with a bounded queue.
+
+    :param max_workers: the number of worker threads
+    :param max_queued: the number of operations that may wait for a worker,
+        before :py:meth:`submit` blocks
+
+    """
+
+    def __init__(self, max_workers=8, max_queued=64):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queued < 0:
+            raise ValueError("max_queued must not be negative")
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def submit(self, func, *args, **kwargs):
+        """Schedules ``func(*args, **kwargs)`` to be run, and returns an :py:class:`FSFuture`.
+
+        Blocks if there are already `max_workers` + `max_queued` operations pending.
+
+        """
+        self._slots.acquire()
+        future = FSFuture()
+
+        def run():
+            try:
+                if not future.set_running_or_notify_cancel():
+                    return
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            finally:
+                self._slots.release()
+
+        try:
+            self._executor.submit(run)
+        except:
+            self._slots.release()
+            raise
+        return future
+
+    def shutdown(self, wait=True):
+        """Stops accepting operations, and optionally waits for the pending operations to finish."""
+        self._executor.shutdown(wait=wait)
+
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def get_default_executor():
+    """Returns the executor shared by filesystems that don't have their own."""
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = BoundedExecutor()
+        return _default_executor
+
+
+def set_default_executor(max_workers=8, max_queued=64):
+    """Replaces the shared executor with one of the given size.
+
+    Operations already submitted to the previous executor will still complete.
+
+    :param max_workers: the number of worker threads
+    :param max_queued: the number of operations that may wait for a worker
+
+    """
+    global _default_executor
+    with _default_executor_lock:
+        previous = _default_executor
+        _default_executor = BoundedExecutor(max_workers=max_workers, max_queued=max_queued)
+    if previous is not None:
+        previous.shutdown(wait=False)
@@ -5,8 +5,8 @@ import socketserver
 from fs.path import pathjoin, dirname
 from fs.errors import FSError
 from time import mktime
-from io import StringIO
-import cgi
+from io import StringIO, BytesIO
+import html
 import urllib.request, urllib.parse, urllib.error
 import posixpath
 import time
@@ -98,7 +98,7 @@ class FSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         paths = [p+'/' for p in sorted(dir_paths, key=lambda p:p.lower())] + sorted(file_paths, key=lambda p:p.lower())
         #list.sort(key=lambda a: a.lower())
         f = StringIO()
-        displaypath = cgi.escape(urllib.parse.unquote(self.path))
+        displaypath = html.escape(urllib.parse.unquote(self.path))
         f.write('<!DOCTYPE html PUBLIC "-//W3C//DTD HTML 3.2 Final//EN">')
         f.write("<html>\n<title>Directory listing for %s</title>\n" % displaypath)
         f.write("<body>\n<h2>Directory listing for %s</h2>\n" % displaypath)
@@ -110,15 +110,14 @@ class FSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
 
         for path in paths:
             f.write('<li><a href="%s">%s</a>\n'
-                    % (urllib.parse.quote(path), cgi.escape(path)))
+                    % (urllib.parse.quote(path), html.escape(path)))
         f.write("</ul>\n<hr>\n</body>\n</html>\n")
-        length = f.tell()
-        f.seek(0)
+        data = f.getvalue().encode('utf-8')
         self.send_response(200)
-        self.send_header("Content-type", "text/html")
-        self.send_header("Content-Length", str(length))
+        self.send_header("Content-type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
         self.end_headers()
-        return f
+        return BytesIO(data)
 
     def translate_path(self, path):
         # abandon query parameters
@@ -148,6 +148,26 @@ class FileLikeBase(object):
         """
         raise NotReadableError("Object not readable")
 
+    def _readinto(self,buffer):
+        """Read bytes from the file-like object directly into <buffer>.
+
+        <buffer> is a writable memoryview of bytes.  This method should read
+        up to len(buffer) bytes into it, and return the number of bytes
+        read, or zero if no data is available (e.g. at EOF).
+
+        Subclasses that can fill a buffer without first reading into a
+        string should implement this method.  The default implementation
+        reads with _read() and copies the data into the buffer.
+        """
+        data = self._read(len(buffer))
+        if not data:
+            return 0
+        size = min(len(data),len(buffer))
+        buffer[:size] = memoryview(data)[:size]
+        if len(data) > size:
+            self._rbuffer = data[size:]
+        return size
+
     def _write(self,string,flushing=False):
         """Write the given string to the file-like object.
 
@@ -479,6 +499,58 @@ class FileLikeBase(object):
             output = data
         return output
 
+    def readinto(self,buffer):
+        """Read bytes into a pre-allocated, writable buffer.
+
+        Returns the number of bytes read, which is zero at EOF.  Where the
+        file supports it, data is read straight into the buffer rather
+        than into a temporary string.
+        """
+        if self.closed:
+            raise IOError("File has been closed")
+        self._assert_mode("r-")
+        return self._do_readinto(buffer,True)
+
+    def readinto1(self,buffer):
+        """Read bytes into a pre-allocated, writable buffer, making at
+        most one call to read from the underlying file."""
+        if self.closed:
+            raise IOError("File has been closed")
+        self._assert_mode("r-")
+        return self._do_readinto(buffer,False)
+
+    def _do_readinto(self,buffer,fill):
+        """Private method to read into a buffer.
+
+        If 'fill' is true, reading continues until the buffer is full or
+        EOF is reached; otherwise the data already buffered is returned,
+        or that from a single call to _readinto().
+        """
+        view = memoryview(buffer)
+        if view.format != "B" or view.ndim != 1:
+            view = view.cast("B")
+        size = len(view)
+        # Let _do_read() deal with pending writes and simulated seeks
+        if self._wbuffer is not None or self._sbuffer or self._soffset:
+            self._do_read(0)
+        pos = 0
+        if self._rbuffer:
+            pos = min(size,len(self._rbuffer))
+            view[:pos] = self._rbuffer[:pos]
+            self._rbuffer = self._rbuffer[pos:]
+            if not fill:
+                return pos
+        elif self._rbuffer is None:
+            self._rbuffer = b("")
+        while pos < size:
+            bytes_read = self._readinto(view[pos:])
+            if not bytes_read:
+                break
+            pos += bytes_read
+            if not fill:
+                break
+        return pos
+
     def _do_read_rest(self):
         """Private method to read the file through to EOF."""
         data = self._do_read(self._bufsize)
@@ -661,6 +733,14 @@ class FileWrapper(FileLikeBase):
             return None
         return data
 
+    def _readinto(self,buffer):
+        #  Read directly into the buffer, unless a subclass has customised
+        #  _read() to alter the data.
+        readinto = getattr(self.wrapped_file,"readinto",None)
+        if readinto is None or type(self)._read is not FileWrapper._read:
+            return super(FileWrapper,self)._readinto(buffer)
+        return readinto(buffer) or 0
+
     def _write(self,string,flushing=False):
         self.wrapped_file.write(string)
 
@@ -695,6 +775,13 @@ class StringIO(FileWrapper):
     def getvalue(self):
         return self.wrapped_file.getvalue()
 
+    def getbuffer(self):
+        """Get a memoryview of the contents, without copying them.
+
+        The file can't be resized until the view has been released.
+        """
+        return self.wrapped_file.getbuffer()
+
     def _truncate(self,size):
         pos = self.wrapped_file.tell()
         self.wrapped_file.truncate(size)
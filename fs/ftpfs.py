@@ -1187,6 +1187,45 @@ class FTPFS(FS):
             return data
         return iotools.decode_binary(data, encoding=encoding, errors=errors)
 
+    @ftperrors
+    def getrange(self, path, offset, length=None):
+        path = normpath(path)
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        if self.isdir(path):
+            raise ResourceInvalidError(path)
+        if not self.isfile(path):
+            raise ResourceNotFoundError(path)
+        if length == 0:
+            return b('')
+        #  Start the transfer at the offset with REST, on a connection of
+        #  its own, so it can be dropped once we have enough data
+        ftp = self._open_ftp()
+        try:
+            ftp.voidcmd('TYPE I')
+            conn = ftp.transfercmd('RETR ' + path, offset or None)
+            try:
+                chunks = []
+                remaining = length
+                while remaining is None or remaining > 0:
+                    read_size = _FTPFile.blocksize
+                    if remaining is not None:
+                        read_size = min(remaining, read_size)
+                    data = conn.recv(read_size)
+                    if not data:
+                        break
+                    chunks.append(data)
+                    if remaining is not None:
+                        remaining -= len(data)
+            finally:
+                conn.close()
+        finally:
+            try:
+                ftp.close()
+            except Exception:
+                pass
+        return b('').join(chunks)
+
     @ftperrors
     def exists(self, path):
         path = normpath(path)
@@ -1254,6 +1293,39 @@ class FTPFS(FS):
                                           dirs_only=dirs_only,
                                           files_only=files_only)]
 
+    @ftperrors
+    def _listdir_partition(self, path):
+        path = normpath(path)
+        if not self.exists(path):
+            raise ResourceNotFoundError(path)
+        if not self.isdir(path):
+            raise ResourceInvalidError(path)
+        dirs = []
+        files = []
+        for name, info in self._readdir(path).items():
+            if info['try_cwd']:
+                dirs.append(name)
+            else:
+                files.append(name)
+        return dirs, files
+
+    @ftperrors
+    def _listdirinfo_partition(self, path):
+        path = normpath(path)
+        if not self.exists(path):
+            raise ResourceNotFoundError(path)
+        if not self.isdir(path):
+            raise ResourceInvalidError(path)
+        _dirlist_info = self._dirlist_info
+        dirs = []
+        files = []
+        for name, info in self._readdir(path).items():
+            if info['try_cwd']:
+                dirs.append((name, _dirlist_info(info)))
+            else:
+                files.append((name, _dirlist_info(info)))
+        return dirs, files
+
     @ftperrors
     def makedir(self, path, recursive=False, allow_recreate=False):
         path = normpath(path)
@@ -1351,7 +1423,38 @@ class FTPFS(FS):
         dirlist, fname = self._check_path(path)
         if not fname:
             return {}
-        info = dirlist[fname].copy()
+        return self._dirlist_info(dirlist[fname])
+
+    @ftperrors
+    def getinfo_many(self, paths):
+        results = {}
+        by_parent = {}
+        for path in paths:
+            base, fname = pathsplit(abspath(normpath(path)))
+            by_parent.setdefault(base, []).append((path, fname))
+        # One LIST per parent directory, rather than one per path
+        for base, entries in by_parent.items():
+            try:
+                dirlist = self._readdir(base)
+            except error_perm:
+                dirlist = {}
+            for path, fname in entries:
+                if not fname:
+                    results[path] = {}
+                elif fname in dirlist:
+                    results[path] = self._dirlist_info(dirlist[fname])
+                else:
+                    results[path] = None
+        return results
+
+    def isdir_many(self, paths):
+        return dict((path, info is not None and (not info or bool(info['try_cwd'])))
+                    for path, info in self.getinfo_many(paths).items())
+
+    @classmethod
+    def _dirlist_info(cls, dirlist_info):
+        """Build an info dict from an entry in a directory listing."""
+        info = dirlist_info.copy()
         info['modified_time'] = datetime.datetime.fromtimestamp(info['mtime'])
         info['created_time'] = info['modified_time']
         return info
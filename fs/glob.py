@@ -0,0 +1,399 @@
+"""
+fs.glob
+=======
+
+Glob pattern matching.
+
+A glob pattern is a path in which each component may contain wildcards::
+
+    >>> fs.glob('src/**/test_*.py')
+    ['/src/tests/test_base.py', '/src/fs/tests/test_path.py']
+    >>> fs.glob('photos/20[0-9][0-9]/*.{jpg,png}')
+    ['/photos/2014/beach.jpg', '/photos/2015/cat.png']
+
+The following are supported:
+
+ * ``*`` matches any number of characters within a path component
+ * ``?`` matches any single character within a path component
+ * ``[seq]`` matches any character in seq, and ``[!seq]`` any character not
+   in seq
+ * ``{a,b,c}`` matches any of the comma separated alternatives, which may
+   themselves contain wildcards (or slashes)
+ * ``**`` as a whole path component matches any number of directories,
+   including none. At the end of a pattern it matches everything below
+   the directory.
+
+A pattern that ends with a slash only matches directories. Unlike the
+shell, wildcards match names that start with a dot.
+
+Matching paths are found by listing only the directories that could contain
+a match: leading components without wildcards are followed directly, and only
+directories that match a component are descended in to. Filesystems that can
+search for paths more efficiently (in an index, or with a single request)
+override :py:meth:`~fs.base.FS.iglob`, using :py:func:`compile_glob` to get
+the pattern's literal prefix and a compiled regular expression.
+
+"""
+
+__all__ = ['Glob',
+           'compile_glob',
+           'compile_wildcard',
+           'iglob']
+
+import re
+import fnmatch
+from functools import lru_cache
+
+from fs.path import pathcombine
+from fs.errors import ResourceNotFoundError, ResourceInvalidError, ParentDirectoryMissingError
+
+
+#  Kinds of path component
+LITERAL = 0
+PATTERN = 1
+RECURSIVE = 2
+
+_special_re = re.compile(r'[*?\[{]')
+
+
+def _find_brace_end(pattern, start):
+    """Gets the index of the brace that closes the one at `start`, or None."""
+    depth = 0
+    for index in range(start, len(pattern)):
+        c = pattern[index]
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if not depth:
+                return index
+    return None
+
+
+def _split_alternatives(text):
+    """Splits the contents of a brace set on its top level commas."""
+    alternatives = []
+    depth = 0
+    start = 0
+    for index, c in enumerate(text):
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+        elif c == ',' and not depth:
+            alternatives.append(text[start:index])
+            start = index + 1
+    alternatives.append(text[start:])
+    return alternatives
+
+
+def _expand_braces(pattern):
+    """Expands every brace set in a pattern, giving a list of patterns."""
+    start = pattern.find('{')
+    while start != -1:
+        end = _find_brace_end(pattern, start)
+        if end is None:
+            break
+        prefix, suffix = pattern[:start], pattern[end + 1:]
+        expanded = []
+        for alternative in _split_alternatives(pattern[start + 1:end]):
+            expanded.extend(_expand_braces(prefix + alternative + suffix))
+        return expanded
+    return [pattern]
+
+
+def _translate(pattern):
+    """Translates a glob pattern for a single path component in to a regular
+    expression (without anchors)."""
+    i, n = 0, len(pattern)
+    res = []
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == '*':
+            res.append('[^/]*')
+        elif c == '?':
+            res.append('[^/]')
+        elif c == '[':
+            j = i
+            if j < n and pattern[j] == '!':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                res.append('\\[')
+            else:
+                stuff = pattern[i:j].replace('\\', '\\\\')
+                i = j + 1
+                if stuff[0] == '!':
+                    stuff = '^/' + stuff[1:]
+                elif stuff[0] == '^':
+                    stuff = '\\' + stuff
+                res.append('[%s]' % stuff)
+        elif c == '{':
+            j = _find_brace_end(pattern, i - 1)
+            if j is None:
+                res.append('\\{')
+            else:
+                alternatives = _split_alternatives(pattern[i:j])
+                res.append('(?:%s)' % '|'.join(_translate(alternative) for alternative in alternatives))
+                i = j + 1
+        else:
+            res.append(re.escape(c))
+    return ''.join(res)
+
+
+class Glob(object):
+    """A compiled glob pattern, for a single pattern without brace sets that
+    span path components (see :py:func:`compile_glob`).
+
+    :param pattern: a glob pattern
+
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        #: True if the pattern only matches directories
+        self.dirs_only = pattern.endswith('/') and bool(pattern.strip('/'))
+        self.segments = []
+        regex = []
+        raw_segments = []
+        for segment in pattern.split('/'):
+            if segment in ('', '.'):
+                continue
+            if segment == '**':
+                #  Consecutive '**' components match the same paths as one
+                if self.segments and self.segments[-1][0] == RECURSIVE:
+                    continue
+                self.segments.append((RECURSIVE, None))
+                regex.append(None)
+                raw_segments.append(segment)
+            elif _special_re.search(segment) is None:
+                self.segments.append((LITERAL, segment))
+                regex.append('/' + re.escape(segment))
+                raw_segments.append(segment)
+            else:
+                segment_regex = _translate(segment)
+                self.segments.append((PATTERN, re.compile(segment_regex + '$').match))
+                regex.append('/' + segment_regex)
+                raw_segments.append(segment)
+
+        #  The components after '**' follow any number of directories, or
+        #  anything at all at the end of the pattern
+        for index, part in enumerate(regex):
+            if part is None:
+                regex[index] = '(?:/[^/]+)*' if index < len(regex) - 1 else '/.+'
+
+        #: The index of the first component that isn't a literal name
+        self.start = 0
+        while self.start < len(self.segments) and self.segments[self.start][0] == LITERAL:
+            self.start += 1
+        #: The directory that contains every match (the leading literal components)
+        self.base = '/' + '/'.join(name for _kind, name in self.segments[:self.start])
+        #: True if the pattern matches paths at any depth (it contains ``**``)
+        self.recursive = any(kind == RECURSIVE for kind, _value in self.segments)
+        #: True if the pattern has no wildcards
+        self.is_literal = self.start == len(self.segments)
+
+        prefix = self.base
+        if not self.is_literal:
+            if prefix != '/':
+                prefix += '/'
+            if self.segments[self.start][0] == PATTERN:
+                segment = raw_segments[self.start]
+                prefix += segment[:_special_re.search(segment).start()]
+        #: The literal start of every path that matches
+        self.prefix = prefix
+
+        self._regex = re.compile('^%s$' % (''.join(regex) or '/'))
+
+    def __repr__(self):
+        return "<Glob %r>" % (self.pattern,)
+
+    def match(self, path):
+        """Checks if an absolute path matches the pattern (directories must be
+        checked separately if :py:attr:`dirs_only` is True)."""
+        return self._regex.match(path) is not None
+
+
+class _GlobSet(object):
+    """Several compiled patterns, from the expansion of brace sets that span
+    path components."""
+
+    def __init__(self, pattern, patterns):
+        self.pattern = pattern
+        self.globs = [Glob(expanded) for expanded in patterns]
+        self.dirs_only = all(glob.dirs_only for glob in self.globs)
+        self.recursive = any(glob.recursive for glob in self.globs)
+        self.is_literal = False
+        self.prefix = _common_prefix([glob.prefix for glob in self.globs])
+        self.base = self.prefix[:self.prefix.rfind('/')] or '/'
+
+    def __repr__(self):
+        return "<Glob %r>" % (self.pattern,)
+
+    def match(self, path):
+        return any(glob.match(path) for glob in self.globs)
+
+
+def _common_prefix(strings):
+    prefix = strings[0]
+    for string in strings[1:]:
+        while not string.startswith(prefix):
+            prefix = prefix[:-1]
+    return prefix
+
+
+@lru_cache(maxsize=512)
+def compile_glob(pattern):
+    """Compiles a glob pattern. Compiled patterns are cached.
+
+    The returned object has the following attributes:
+
+     * ``match(path)`` checks if an absolute path matches the pattern
+     * ``prefix`` is the literal start of every path that matches (e.g.
+       ``'/photos/IMG_'`` for ``'photos/IMG_*.jpg'``)
+     * ``base`` is the directory that contains every match
+     * ``recursive`` is True if matches may be at any depth
+     * ``dirs_only`` is True if only directories match
+     * ``is_literal`` is True if the pattern has no wildcards
+
+    :param pattern: a glob pattern
+
+    """
+    patterns = [pattern]
+    if '{' in pattern:
+        for start in [m.start() for m in re.finditer(r'\{', pattern)]:
+            end = _find_brace_end(pattern, start)
+            if end is not None and '/' in pattern[start:end]:
+                patterns = _expand_braces(pattern)
+                break
+    if len(patterns) > 1:
+        return _GlobSet(pattern, patterns)
+    return Glob(pattern)
+
+
+@lru_cache(maxsize=512)
+def _wildcard_match(wildcard):
+    return re.compile(fnmatch.translate(wildcard)).match
+
+
+def compile_wildcard(wildcard):
+    """Gets a function that checks if a name matches a wildcard, as given to
+    :py:meth:`~fs.base.FS.listdir` or :py:meth:`~fs.base.FS.walk`. Compiled
+    wildcards are cached.
+
+    :param wildcard: an :py:mod:`fnmatch` style wildcard, a callable that
+        takes a name and returns a boolean, or None to match every name
+
+    """
+    if wildcard is None:
+        return lambda name: True
+    if callable(wildcard):
+        return wildcard
+    match = _wildcard_match(wildcard)
+    return lambda name: match(name) is not None
+
+
+def iglob(fs, pattern):
+    """Yields the paths in a filesystem that match a glob pattern, listing only
+    the directories that could contain a match.
+
+    This is the default implementation of :py:meth:`fs.base.FS.iglob`.
+
+    :param fs: a filesystem
+    :param pattern: a glob pattern
+
+    """
+    glob = compile_glob(pattern)
+    if isinstance(glob, _GlobSet):
+        seen = set()
+        for sub_glob in glob.globs:
+            for path in _iglob(fs, sub_glob):
+                if path not in seen:
+                    seen.add(path)
+                    yield path
+    else:
+        for path in _iglob(fs, glob):
+            yield path
+
+
+def _iglob(fs, glob):
+    segments = glob.segments
+    dirs_only = glob.dirs_only
+    if glob.is_literal:
+        path = glob.base
+        if fs.isdir(path) or (not dirs_only and fs.exists(path)):
+            yield path
+        return
+
+    last_index = len(segments) - 1
+    stack = [(glob.base, glob.start)]
+    #  Paths can be reached through more than one '**'
+    seen = set() if sum(kind == RECURSIVE for kind, _value in segments) > 1 else None
+
+    def expand(path, index, dirs, files):
+        """Yields the matches in a directory listing, and pushes the
+        directories to look in next."""
+        kind, value = segments[index]
+        last = index == last_index
+        if kind == RECURSIVE:
+            for name in reversed(dirs):
+                stack.append((pathcombine(path, name), index))
+            if last:
+                for name in dirs:
+                    yield pathcombine(path, name)
+                if not dirs_only:
+                    for name in files:
+                        yield pathcombine(path, name)
+            else:
+                #  Matching no directories
+                for match in expand(path, index + 1, dirs, files):
+                    yield match
+        elif kind == LITERAL:
+            if value in dirs:
+                if last:
+                    yield pathcombine(path, value)
+                else:
+                    stack.append((pathcombine(path, value), index + 1))
+            elif last and not dirs_only and value in files:
+                yield pathcombine(path, value)
+        else:
+            for name in reversed(dirs):
+                if value(name):
+                    if not last:
+                        stack.append((pathcombine(path, name), index + 1))
+            if last:
+                for name in dirs:
+                    if value(name):
+                        yield pathcombine(path, name)
+                if not dirs_only:
+                    for name in files:
+                        if value(name):
+                            yield pathcombine(path, name)
+
+    while stack:
+        path, index = stack.pop()
+        if seen is not None:
+            if (path, index) in seen:
+                continue
+            seen.add((path, index))
+        kind, value = segments[index]
+        if kind == LITERAL and index < last_index:
+            #  No need to list a directory to follow a literal name
+            stack.append((pathcombine(path, value), index + 1))
+            continue
+        try:
+            dirs, files = fs._listdir_partition(path)
+        except (ResourceNotFoundError, ResourceInvalidError, ParentDirectoryMissingError):
+            continue
+        if seen is None:
+            for match in expand(path, index, dirs, files):
+                yield match
+        else:
+            for match in expand(path, index, dirs, files):
+                if match not in seen:
+                    seen.add(match)
+                    yield match
@@ -10,8 +10,8 @@ from fs.path import normpath
 from fs.errors import ResourceNotFoundError, UnsupportedError
 from fs.filelike import FileWrapper
 from fs import iotools
-from urllib.request import urlopen
-from urllib.error import URLError
+from urllib.request import urlopen, Request
+from urllib.error import URLError, HTTPError
 from datetime import datetime
 
 
@@ -34,6 +34,7 @@ class HTTPFS(FS):
         :param url: The base URL
 
         """
+        super(HTTPFS, self).__init__()
         self.root_url = url
 
     def _make_url(self, path):
@@ -57,6 +58,33 @@ class HTTPFS(FS):
 
         return FileWrapper(f)
 
+    def getrange(self, path, offset, length=None):
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        if length == 0:
+            return b''
+        if length is None:
+            byte_range = 'bytes=%d-' % (offset,)
+        else:
+            byte_range = 'bytes=%d-%d' % (offset, offset + length - 1)
+        url = self._make_url(path)
+        try:
+            f = urlopen(Request(url, headers={'Range': byte_range}))
+        except HTTPError as e:
+            if e.code == 416:
+                #  The range starts beyond the end of the file
+                return b''
+            raise ResourceNotFoundError(path, details=e)
+        except (URLError, OSError) as e:
+            raise ResourceNotFoundError(path, details=e)
+        try:
+            if f.getcode() == 206:
+                return f.read()
+            #  The server ignored the Range header
+            return iotools.read_range(f, offset, length)
+        finally:
+            f.close()
+
     def exists(self, path):
         return self.isfile(path)
 
@@ -0,0 +1,158 @@
+"""
+fs.info
+=======
+
+Compact, lazily evaluated info mappings.
+
+:py:meth:`~fs.base.FS.getinfo` returns a mapping of info keys on to values.
+Building a dict for every path is wasteful when most callers want one or two
+values (typically ``size`` or ``st_mode``), particularly when walking large
+trees, so filesystems may return an :py:class:`Info` object instead. An Info
+keeps a reference to the raw object the filesystem got the information from
+(a stat result, for instance) and computes each value when it is first
+looked up; values that are expensive to compute, such as datetimes, are
+stored once computed.
+
+Info objects behave like dicts (``info['size']``, ``info.get('st_mode')``,
+``'modified_time' in info``, iteration, comparison with dicts) and may be
+modified. Use ``dict(info)`` where a real dict is required, e.g. to
+serialize the info as JSON.
+
+"""
+
+__all__ = ['Info',
+           'StatInfo']
+
+import os
+import datetime
+from collections.abc import MutableMapping
+from operator import attrgetter
+
+
+class _Missing(object):
+    """Marks a key that has been deleted."""
+    def __reduce__(self):
+        return '_MISSING'
+
+_MISSING = _Missing()
+
+
+class Info(MutableMapping):
+    """A lazily evaluated info mapping.
+
+    Subclasses set :py:attr:`_getters` to a dict that maps each info key on
+    to a function that computes its value from the raw object, and may
+    override :py:meth:`_has` if not all of those keys are available for
+    every raw object.
+
+    :param raw: the object the info values are computed from
+    :param values: a dict of additional values
+
+    """
+
+    __slots__ = ('_raw', '_values')
+
+    #: Maps info keys on to functions that compute the value from the raw object
+    _getters = {}
+    #: Keys whose values are stored, rather than computed on each lookup
+    _cached = frozenset()
+
+    def __init__(self, raw=None, values=None):
+        self._raw = raw
+        self._values = values
+
+    def _has(self, key):
+        """Checks if a computed key is available for the raw object."""
+        return key in self._getters
+
+    def __getitem__(self, key):
+        values = self._values
+        if values is not None and key in values:
+            value = values[key]
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if not self._has(key):
+            raise KeyError(key)
+        value = self._getters[key](self._raw)
+        if key in self._cached:
+            if values is None:
+                values = self._values = {}
+            values[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        if self._values is None:
+            self._values = {}
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self[key] = _MISSING
+
+    def __contains__(self, key):
+        values = self._values
+        if values is not None and key in values:
+            return values[key] is not _MISSING
+        return self._has(key)
+
+    def __iter__(self):
+        values = self._values or {}
+        for key in self._getters:
+            if key not in values and self._has(key):
+                yield key
+        for key, value in list(values.items()):
+            if value is not _MISSING:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _key in self)
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, dict(self))
+
+    def __reduce__(self):
+        return (self.__class__, (self._raw, self._values))
+
+    def copy(self):
+        """Gets the info as a dict."""
+        return dict(self)
+
+
+def _timestamp_getter(name):
+    fromtimestamp = datetime.datetime.fromtimestamp
+    get_timestamp = attrgetter(name)
+    return lambda stats: fromtimestamp(get_timestamp(stats))
+
+
+class StatInfo(Info):
+    """Info computed from a stat result.
+
+    The info has a key for each of the ``st_*`` fields in
+    :py:attr:`_stat_fields`, along with ``size``, ``created_time``,
+    ``accessed_time`` and ``modified_time``. The time keys are omitted if the
+    stat result has no timestamp for them.
+
+    """
+
+    __slots__ = ()
+
+    #: The stat fields included in the info
+    _stat_fields = frozenset(name for name in dir(os.stat_result) if name.startswith('st_'))
+
+    _getters = dict((name, attrgetter(name)) for name in sorted(_stat_fields))
+    _getters['size'] = attrgetter('st_size')
+    _time_fields = {'created_time': 'st_ctime',
+                    'accessed_time': 'st_atime',
+                    'modified_time': 'st_mtime'}
+    for _key, _name in _time_fields.items():
+        _getters[_key] = _timestamp_getter(_name)
+    del _key, _name
+    _cached = frozenset(_time_fields)
+
+    def _has(self, key):
+        if key in self._stat_fields or key == 'size':
+            return True
+        name = self._time_fields.get(key)
+        return name is not None and getattr(self._raw, name, None) is not None
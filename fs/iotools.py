@@ -4,35 +4,48 @@
 from fs import SEEK_SET, SEEK_CUR, SEEK_END
 
 import io
+import os
+import sys
+import errno
 from functools import wraps
 
 import six
 
 
-class RawWrapper(object):
-    """Convert a Python 2 style file-like object in to a IO object"""
+class RawWrapper(io.RawIOBase):
+    """Convert a Python 2 style file-like object in to a IO object.
+
+    The wrapper is a raw stream, so a :py:class:`io.BufferedReader` (or
+    writer) on top of it reads directly into its own buffer with
+    :py:meth:`readinto`, if the wrapped file supports that.
+    """
     def __init__(self, f, mode=None, name=None):
+        super(RawWrapper, self).__init__()
         self._f = f
         self.is_io = isinstance(f, io.IOBase)
         if mode is None and hasattr(f, 'mode'):
             mode = f.mode
         self.mode = mode
         self.name = name
-        self.closed = False
-        super(RawWrapper, self).__init__()
 
     def __repr__(self):
         return "<IO wrapper for {0}>".format(self._f)
 
     def close(self):
-        self._f.close()
-        self.closed = True
+        if not self.closed:
+            try:
+                super(RawWrapper, self).close()
+            finally:
+                self._f.close()
 
     def fileno(self):
         return self._f.fileno()
 
     def flush(self):
-        return self._f.flush()
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        if hasattr(self._f, 'flush'):
+            return self._f.flush()
 
     def isatty(self):
         return self._f.isatty()
@@ -43,12 +56,14 @@ class RawWrapper(object):
     def readable(self):
         if hasattr(self._f, 'readable'):
             return self._f.readable()
-        return 'r' in self.mode
+        mode = self.mode or ''
+        return 'r' in mode or '+' in mode
 
     def writable(self):
-        if hasattr(self._f, 'writeable'):
-            return self._fs.writeable()
-        return 'w' in self.mode
+        if hasattr(self._f, 'writable'):
+            return self._f.writable()
+        mode = self.mode or ''
+        return 'w' in mode or 'a' in mode or '+' in mode
 
     def seekable(self):
         if hasattr(self._f, 'seekable'):
@@ -70,15 +85,17 @@ class RawWrapper(object):
         if self.is_io:
             return self._f.write(data)
         self._f.write(data)
+        if isinstance(data, memoryview):
+            return data.nbytes
         return len(data)
 
     def read(self, n=-1):
-        if n == -1:
+        if n is None or n < 0:
             return self.readall()
         return self._f.read(n)
 
     def read1(self, n=-1):
-        if self.is_io:
+        if hasattr(self._f, 'read1'):
             return self._f.read1(n)
         return self.read(n)
 
@@ -86,13 +103,19 @@ class RawWrapper(object):
         return self._f.read()
 
     def readinto(self, b):
-        if self.is_io:
+        if hasattr(self._f, 'readinto'):
             return self._f.readinto(b)
-        data = self._f.read(len(b))
+        view = byte_view(b)
+        data = self._f.read(len(view))
         bytes_read = len(data)
-        b[:len(data)] = data
+        view[:bytes_read] = data
         return bytes_read
 
+    def readinto1(self, b):
+        if hasattr(self._f, 'readinto1'):
+            return self._f.readinto1(b)
+        return self.readinto(b)
+
     def readline(self, limit=-1):
         return self._f.readline(limit)
 
@@ -112,6 +135,70 @@ class RawWrapper(object):
         return iter(self._f)
 
 
+class MemoryViewIO(io.RawIOBase):
+    """A read-only, seekable binary stream over a bytes-like object.
+
+    Unlike :py:class:`io.BytesIO`, the data isn't copied when the stream is
+    created; each read copies just the bytes requested.
+    """
+    mode = 'rb'
+
+    def __init__(self, data):
+        super(MemoryViewIO, self).__init__()
+        self._view = byte_view(data)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        view = byte_view(b)
+        chunk = self._view[self._pos:self._pos + len(view)]
+        bytes_read = len(chunk)
+        view[:bytes_read] = chunk
+        self._pos += bytes_read
+        return bytes_read
+
+    def readall(self):
+        data = self._view[self._pos:].tobytes()
+        self._pos += len(data)
+        return data
+
+    def seek(self, offset, whence=SEEK_SET):
+        if whence == SEEK_CUR:
+            offset += self._pos
+        elif whence == SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError("negative seek position %r" % offset)
+        self._pos = offset
+        return offset
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            super(MemoryViewIO, self).close()
+            self._view.release()
+
+
+def byte_view(data):
+    """Get a flat memoryview of the bytes in a bytes-like object, so that its
+    length is the size in bytes. The data is only copied if it isn't contiguous."""
+    view = memoryview(data)
+    if not view.c_contiguous:
+        return memoryview(view.tobytes())
+    if view.ndim == 1 and view.format == 'B':
+        return view
+    return view.cast('B')
+
+
 def filelike_to_stream(f):
     @wraps(f)
     def wrapper(self, path, mode='rt', buffering=-1, encoding=None, errors=None, newline=None, line_buffering=False, **kwargs):
@@ -178,13 +265,18 @@ def make_bytes_io(data, encoding=None, errors=None):
     if hasattr(data, 'mode') and 'b' in data.mode:
         # It's already a binary file
         return data
+    if isinstance(data, six.binary_type):
+        return io.BytesIO(data)
+    if isinstance(data, (bytearray, memoryview)):
+        # Read from the caller's buffer rather than a copy of it
+        return MemoryViewIO(data)
     if not isinstance(data, str):
         # It's a file, but we don't know if its binary
         # TODO: Is there a better way than reading the entire file?
         data = data.read() or b''
     if isinstance(data, six.text_type):
         # If its text, encoding in to bytes
-        data = data.encode(encoding=encoding, errors=errors)
+        data = data.encode(encoding or 'utf-8', errors or 'strict')
     return io.BytesIO(data)
 
 
@@ -211,6 +303,126 @@ def copy_file_to_fs(f, fs, path, encoding=None, errors=None, progress_callback=N
     return bytes_written
 
 
+#: Errors from copy_file_range / sendfile that mean the files aren't supported, rather than a real failure
+_KERNEL_COPY_UNSUPPORTED = frozenset(getattr(errno, name) for name in
+                                     ('ENOSYS', 'EXDEV', 'EINVAL', 'EBADF', 'ENOTSOCK', 'EOPNOTSUPP', 'ENOTSUP')
+                                     if hasattr(errno, name))
+
+#: Bytes to request from the kernel in each copy_file_range / sendfile call
+_KERNEL_COPY_SIZE = 1024 * 1024 * 1024
+
+
+def _kernel_fileno(f):
+    """Returns the file descriptor of a plain OS file or socket stream, or None."""
+    if not isinstance(f, (io.FileIO, io.BufferedReader, io.BufferedWriter, io.BufferedRandom)):
+        return None
+    try:
+        return f.fileno()
+    except (io.UnsupportedOperation, ValueError, OSError):
+        return None
+
+
+def _seekable_position(f):
+    """Returns the position of a stream, or None if it can't seek (a pipe or a
+    socket, for instance)."""
+    try:
+        if not f.seekable():
+            return None
+        return f.tell()
+    except (io.UnsupportedOperation, ValueError, OSError):
+        return None
+
+
+def _kernel_copy(src_fd, dst_fd, offset):
+    """Copies from `src_fd` (starting at `offset`) to the current position of `dst_fd`
+    without passing the data through user space. Returns a tuple of the number of
+    bytes copied and a flag that is True if the end of the source was reached."""
+    copied = 0
+    copy_functions = []
+    if hasattr(os, 'copy_file_range'):
+        copy_functions.append(lambda count: os.copy_file_range(src_fd, dst_fd, count, offset + copied))
+    if hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+        copy_functions.append(lambda count: os.sendfile(dst_fd, src_fd, offset + copied, count))
+    for copy in copy_functions:
+        first = True
+        try:
+            while True:
+                count = copy(_KERNEL_COPY_SIZE)
+                if not count:
+                    #  Some special files report nothing to copy on the first call,
+                    #  so that isn't taken as the end of the file.
+                    if first:
+                        break
+                    return copied, True
+                first = False
+                copied += count
+        except OSError as e:
+            if e.errno not in _KERNEL_COPY_UNSUPPORTED:
+                raise
+    return copied, False
+
+
+def copy_file_data(src_file, dst_file, chunk_size=64 * 1024):
+    """Copies the remainder of a binary file to another binary file, and returns
+    the number of bytes copied.
+
+    If both files are OS files (or sockets), and the source can seek, the data is
+    copied in the kernel with ``os.copy_file_range`` or ``os.sendfile`` where
+    available, which avoids copying through user space (and may share blocks on
+    filesystems that support reflinks). Otherwise the data is copied a chunk at
+    a time.
+
+    """
+    copied = 0
+    src_fd = _kernel_fileno(src_file)
+    dst_fd = _kernel_fileno(dst_file) if src_fd is not None else None
+    offset = _seekable_position(src_file) if dst_fd is not None else None
+    if offset is not None:
+        dst_file.flush()
+        copied, finished = _kernel_copy(src_fd, dst_fd, offset)
+        if copied:
+            #  The file objects don't know their descriptors have moved on
+            src_file.seek(offset + copied)
+            try:
+                dst_file.seek(os.lseek(dst_fd, 0, SEEK_CUR))
+            except (io.UnsupportedOperation, OSError):
+                pass
+        if finished:
+            return copied
+
+    read = src_file.read
+    write = dst_file.write
+    chunk = read(chunk_size)
+    while chunk:
+        write(chunk)
+        copied += len(chunk)
+        chunk = read(chunk_size)
+    return copied
+
+
+def read_range(f, offset, length=None, chunk_size=64 * 1024):
+    """Reads `length` bytes (or the rest of the stream, if `length` is None)
+    from `offset` in a stream positioned at its start, discarding the bytes
+    before `offset`. Use this for streams that can't seek, such as the body
+    of a HTTP response."""
+    remaining = offset
+    while remaining > 0:
+        skipped = len(f.read(min(chunk_size, remaining)))
+        if not skipped:
+            return b''
+        remaining -= skipped
+    if length is None:
+        return f.read()
+    chunks = []
+    while length > 0:
+        chunk = f.read(length)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        length -= len(chunk)
+    return b''.join(chunks)
+
+
 def line_iterator(f, size=None):
     """A not terribly efficient char by char line iterator"""
     read = f.read
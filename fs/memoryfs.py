@@ -5,26 +5,78 @@ fs.memoryfs
 
 A Filesystem that exists in memory only. Which makes them extremely fast, but non-permanent.
 
-If you open a file from a `memoryfs` you will get back a StringIO object from the standard library.
-
+The contents of each file are kept in a bytearray. Files opened from a
+`memoryfs` read and write that bytearray directly.
+
+To keep the memory used by large trees down, the entries use ``__slots__``,
+their timestamps are stored as floats, and the lock, extended attributes and
+list of open files of an entry are only created when they're needed.
+
+Copying files and directories within a MemoryFS doesn't copy the contents of
+files. The copies share a bytearray with the original until one of them is
+written to, at which point that file gets a private copy of its contents.
+
+:py:meth:`MemoryFS.snapshot` returns a read-only view of the filesystem at a
+point in time, :py:meth:`MemoryFS.fork` an independent writable copy, and
+:py:meth:`MemoryFS.restore` returns the filesystem to a snapshot. These share
+the directory tree rather than copying it, so they take the same time
+regardless of the size of the filesystem; afterwards, an entry is copied
+(along with the directories that contain it) when it's first modified::
+
+    fixture = MemoryFS()
+    build_fixture(fixture)
+    snapshot = fixture.snapshot()
+    for test in tests:
+        test(snapshot.fork())
+
+A MemoryFS created with `max_memory` keeps the contents of files in memory
+up to that number of bytes. Beyond that, the contents of the least recently
+used files are moved to a :py:class:`~fs.tempfs.TempFS` (or the `spill_fs`
+given), and read back when the files are next used. The directory tree and
+file info stay in memory, so listing directories and getting info doesn't
+read anything back. Contents shared between copies of a file aren't counted
+or moved. The ``memoryfs.*`` meta values report the limit, the eviction
+policy, and the bytes in memory and on disk::
+
+    mem_fs = MemoryFS(max_memory=64 * 1024 * 1024)
+    mem_fs.getmeta('memoryfs.spilled_bytes')
+
+Methods that only read don't take the filesystem's lock. Methods that change
+a single directory (making a directory, opening, writing or removing a file,
+setting times and extended attributes) hold the lock shared and the lock of
+the directory, so changes to different directories don't wait for each other.
+Reading and writing open files only takes the lock of the file. The lock is
+held exclusively by methods that span directories (rename, copy, move,
+copydir, movedir and removedir), and while entries shared with a snapshot or
+fork are copied.
 
 """
 
 import datetime
 import stat
-from fs.path import iteratepath, pathsplit, normpath
+import time
+from fs.path import iteratepath, pathsplit, pathjoin, normpath
 from fs.base import *
 from fs.errors import *
 from fs import _thread_synchronize_default
-from fs.filelike import StringIO
+from fs.info import Info
+from fs.wrapfs.readonlyfs import ReadOnlyFS
 from fs import iotools
-from os import SEEK_END
+from os import SEEK_SET, SEEK_CUR, SEEK_END
+from operator import itemgetter
+from collections import OrderedDict
+import itertools
 import threading
+import weakref
 
 import six
 from six import b
 
 
+#  Guards the creation of the per-file locks, and the entries that share contents
+_entry_lock_guard = threading.Lock()
+
+
 def _check_mode(mode, mode_chars):
     for c in mode_chars:
         if c not in mode:
@@ -32,47 +84,211 @@ def _check_mode(mode, mode_chars):
     return True
 
 
-class MemoryFile(object):
+def _timestamp(dt):
+    """Converts a datetime in to a timestamp, as stored by a DirEntry."""
+    return time.mktime(dt.timetuple()) + dt.microsecond / 1000000.0
+
+
+def _copy_bytes(data, start, end):
+    """Copies a range of a bytearray in to a bytes object, with a single copy."""
+    with memoryview(data) as view, view[start:end] as chunk:
+        return chunk.tobytes()
+
+
+class _SpilledData(object):
+    """The contents of a file that have been moved out of memory by a
+    :py:class:`_SpillStore`. The length is the size of the contents."""
+
+    __slots__ = ('store', 'name', 'size')
+
+    def __init__(self, store, name, size):
+        self.store = store
+        self.name = name
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __del__(self):
+        try:
+            self.discard()
+        except Exception:
+            pass
+
+    def read(self):
+        """Reads the contents back from disk."""
+        return self.store.spill_fs.getcontents(self.name, 'rb')
+
+    def load(self):
+        """Reads the contents back in to a bytearray, and removes them from disk."""
+        data = bytearray(self.read())
+        self.discard()
+        return data
+
+    def discard(self):
+        """Removes the contents from disk."""
+        if self.name is not None:
+            self.store.discard(self.name, self.size)
+            self.name = None
+
+
+class _SpillStore(object):
+    """Keeps the size of the file contents held in memory by a
+    :py:class:`MemoryFS` (and its forks) under a limit, by moving the least
+    recently used to files on disk.
+
+    Contents shared by copies of a file aren't counted, and aren't spilled.
 
-    def seek_and_lock(f):
-        def deco(self, *args, **kwargs):
+    :param max_memory: the maximum number of bytes of file contents to hold in memory
+    :param spill_fs: the filesystem to write spilled contents to, or None for a TempFS
+
+    """
+
+    def __init__(self, max_memory, spill_fs=None):
+        self.max_memory = max_memory
+        self._spill_fs = spill_fs
+        self._close_spill_fs = spill_fs is None
+        self._lock = threading.RLock()
+        #  Maps the ids of entries on to a weak reference and the size in memory
+        self._lru = OrderedDict()
+        self._names = itertools.count()
+        self.resident_bytes = 0
+        self.spilled_bytes = 0
+        self.spilled_files = 0
+        self.users = 1
+
+    @property
+    def spill_fs(self):
+        with self._lock:
+            if self._spill_fs is None:
+                from fs.tempfs import TempFS
+                self._spill_fs = TempFS("MemoryFS")
+            return self._spill_fs
+
+    def touch(self, dir_entry):
+        """Records an access to a file, and the size of its contents in memory
+        (called holding the entry's lock, if it has one)."""
+        data = dir_entry.data
+        if isinstance(data, bytearray) and dir_entry.shared is None:
+            size = len(data)
+        else:
+            size = 0
+        key = id(dir_entry)
+        with self._lock:
+            item = self._lru.pop(key, None)
+            if item is not None:
+                ref = item[0]
+                self.resident_bytes -= item[1]
+            elif size:
+                ref = weakref.ref(dir_entry, lambda ref, key=key: self._forget(key, ref))
+            if size:
+                self._lru[key] = (ref, size)
+                self.resident_bytes += size
+
+    def _forget(self, key, ref):
+        with self._lock:
+            item = self._lru.get(key)
+            if item is not None and item[0] is ref:
+                del self._lru[key]
+                self.resident_bytes -= item[1]
+
+    def evict(self):
+        """Spills the least recently used contents to disk until the memory
+        used is under the limit. Files that another thread is using are skipped."""
+        with self._lock:
+            attempts = len(self._lru)
+        while attempts and self.resident_bytes > self.max_memory:
+            attempts -= 1
+            with self._lock:
+                if not self._lru:
+                    break
+                key, (ref, size) = self._lru.popitem(last=False)
+                self.resident_bytes -= size
+            dir_entry = ref()
+            if dir_entry is not None and not self._spill(dir_entry):
+                #  In use, so it's now the most recently used
+                with self._lock:
+                    if key not in self._lru:
+                        self._lru[key] = (ref, size)
+                        self.resident_bytes += size
+
+    def _spill(self, dir_entry):
+        """Moves the contents of a file to disk, unless another thread has the
+        file's lock. Returns False if the file is in use."""
+        lock = dir_entry.get_lock()
+        if not lock.acquire(False):
+            return False
+        try:
+            data = dir_entry.data
+            if not isinstance(data, bytearray) or dir_entry.shared is not None:
+                return True
+            name = "%d.bin" % next(self._names)
+            self.spill_fs.setcontents(name, data)
+            dir_entry.data = _SpilledData(self, name, len(data))
+            with self._lock:
+                self.spilled_bytes += len(data)
+                self.spilled_files += 1
+                #  Accessed again before the lock was acquired
+                item = self._lru.pop(id(dir_entry), None)
+                if item is not None:
+                    self.resident_bytes -= item[1]
+            return True
+        finally:
+            lock.release()
+
+    def discard(self, name, size):
+        with self._lock:
+            self.spilled_bytes -= size
+            self.spilled_files -= 1
+            spill_fs = self._spill_fs
+        if spill_fs is not None and not spill_fs.closed:
             try:
-                self._lock.acquire()
-                self.mem_file.seek(self.pos)
-                ret = f(self, *args, **kwargs)
-                self.pos = self.mem_file.tell()
-                return ret
-            finally:
-                self._lock.release()
-        return deco
+                spill_fs.remove(name)
+            except FSError:
+                pass
+
+    def add_user(self):
+        with self._lock:
+            self.users += 1
+
+    def release(self):
+        """Releases a filesystem's use of the store, closing the TempFS when
+        no filesystems use it."""
+        with self._lock:
+            self.users -= 1
+            spill_fs = self._spill_fs if self._close_spill_fs and not self.users else None
+        if spill_fs is not None:
+            spill_fs.close()
+
 
-    def __init__(self, path, memory_fs, mem_file, mode, lock):
+class MemoryFile(object):
+    """A file opened from a :py:class:`MemoryFS`, which reads and writes the
+    contents of its :py:class:`DirEntry` in place.
+
+    """
+
+    __slots__ = ('closed', 'path', 'memory_fs', 'dir_entry', 'mode', 'pos',
+                 '_lock', '_readable', '_writable', '__weakref__')
+
+    def __init__(self, path, memory_fs, dir_entry, mode):
         self.closed = False
         self.path = path
         self.memory_fs = memory_fs
-        self.mem_file = mem_file
+        self.dir_entry = dir_entry
         self.mode = mode
-        self._lock = lock
+        self._lock = dir_entry.get_lock()
+        self._readable = 'r' in mode or '+' in mode
+        self._writable = 'r' not in mode or '+' in mode
 
         self.pos = 0
 
         if _check_mode(mode, 'a'):
-            lock.acquire()
-            try:
-                self.mem_file.seek(0, SEEK_END)
-                self.pos = self.mem_file.tell()
-            finally:
-                lock.release()
+            with self._lock:
+                self.pos = len(dir_entry.data)
 
         elif _check_mode(mode, 'w'):
-            lock.acquire()
-            try:
-                self.mem_file.seek(0)
-                self.mem_file.truncate()
-            finally:
-                lock.release()
-
-        assert self.mem_file is not None, "self.mem_file should have a value"
+            with self._lock:
+                dir_entry.set_data(bytearray())
 
     def __str__(self):
         return "<MemoryFile in %s %s>" % (self.memory_fs, self.path)
@@ -87,78 +303,150 @@ class MemoryFile(object):
         if not self.closed:
             self.close()
 
+    def _check_readable(self):
+        if not self._readable:
+            raise IOError("File not open for reading")
+
+    def _check_writable(self):
+        if not self._writable:
+            raise IOError("File not open for writing")
+
     def flush(self):
         pass
 
     def __iter__(self):
-        if 'r' not in self.mode and '+' not in self.mode:
-            raise IOError("File not open for reading")
-        self.mem_file.seek(self.pos)
-        for line in self.mem_file:
+        self._check_readable()
+        while True:
+            line = self.readline()
+            if not line:
+                break
             yield line
 
-    @seek_and_lock
     def next(self):
-        if 'r' not in self.mode and '+' not in self.mode:
-            raise IOError("File not open for reading")
-        return next(self.mem_file)
-
-    @seek_and_lock
-    def readline(self, *args, **kwargs):
-        if 'r' not in self.mode and '+' not in self.mode:
-            raise IOError("File not open for reading")
-        return self.mem_file.readline(*args, **kwargs)
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+    __next__ = next
+
+    def readline(self, size=-1):
+        self._check_readable()
+        with self._lock:
+            data = self.dir_entry.get_data()
+            pos = self.pos
+            end = data.find(b'\n', pos) + 1 or len(data)
+            if size is not None and size >= 0:
+                end = min(end, pos + size)
+            line = _copy_bytes(data, pos, end)
+            self.pos = pos + len(line)
+            self.memory_fs._accessed(self.dir_entry)
+        return line
 
     def close(self):
-        do_close = False
-        self._lock.acquire()
-        try:
-            do_close = not self.closed and self.mem_file is not None
-            if do_close:
-                self.closed = True
-        finally:
-            self._lock.release()
+        with self._lock:
+            do_close = not self.closed
+            self.closed = True
         if do_close:
-            self.memory_fs._on_close_memory_file(self, self.path)
+            self.memory_fs._on_close_memory_file(self, self.dir_entry)
 
-    @seek_and_lock
     def read(self, size=None):
-        if 'r' not in self.mode and '+' not in self.mode:
-            raise IOError("File not open for reading")
-        if size is None:
-            size = -1
-        return self.mem_file.read(size)
-
-    @seek_and_lock
-    def seek(self, *args, **kwargs):
-        return self.mem_file.seek(*args, **kwargs)
+        self._check_readable()
+        with self._lock:
+            data = self.dir_entry.get_data()
+            pos = self.pos
+            if size is None or size < 0:
+                end = len(data)
+            else:
+                end = pos + size
+            chunk = _copy_bytes(data, pos, end)
+            self.pos = pos + len(chunk)
+            self.memory_fs._accessed(self.dir_entry)
+        return chunk
+
+    def readinto(self, buffer):
+        self._check_readable()
+        view = iotools.byte_view(buffer)
+        with self._lock:
+            data = self.dir_entry.get_data()
+            pos = self.pos
+            with memoryview(data) as source, source[pos:pos + len(view)] as chunk:
+                bytes_read = len(chunk)
+                view[:bytes_read] = chunk
+            self.pos = pos + bytes_read
+            self.memory_fs._accessed(self.dir_entry)
+        return bytes_read
+
+    def seek(self, offset, whence=SEEK_SET):
+        with self._lock:
+            if whence == SEEK_CUR:
+                offset += self.pos
+            elif whence == SEEK_END:
+                offset += len(self.dir_entry.data)
+            elif whence != SEEK_SET:
+                raise ValueError("Invalid value for 'whence': %r" % (whence,))
+            if offset < 0:
+                raise IOError("negative seek position %r" % (offset,))
+            self.pos = offset
+            return offset
 
-    @seek_and_lock
     def tell(self):
         return self.pos
 
-    @seek_and_lock
-    def truncate(self, *args, **kwargs):
-        if 'r' in self.mode and '+' not in self.mode:
-            raise IOError("File not open for writing")
-        return self.mem_file.truncate(*args, **kwargs)
+    def _acquire_for_write(self):
+        """Acquires the file's lock, and returns its entry. If the entry is
+        shared with a snapshot of the filesystem, the file is moved to a copy
+        of it first."""
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        memory_fs = self.memory_fs
+        while True:
+            if self.dir_entry.owner is not memory_fs._generation:
+                memory_fs._own_open_file(self)
+            self._lock.acquire()
+            if self.dir_entry.owner is memory_fs._generation:
+                return self.dir_entry
+            #  A snapshot was taken in the meantime
+            self._lock.release()
+
+    def truncate(self, size=None):
+        self._check_writable()
+        dir_entry = self._acquire_for_write()
+        try:
+            if size is None:
+                size = self.pos
+            data = dir_entry.writable_data()
+            if size < len(data):
+                del data[size:]
+            else:
+                data.extend(bytes(size - len(data)))
+            dir_entry.modified_time = time.time()
+            self.memory_fs._accessed(dir_entry)
+        finally:
+            self._lock.release()
+        self.memory_fs._check_memory()
+        return size
 
-    #@seek_and_lock
     def write(self, data):
-        if 'r' in self.mode and '+' not in self.mode:
-            raise IOError("File not open for writing")
-        self.memory_fs._on_modify_memory_file(self.path)
-        self._lock.acquire()
+        self._check_writable()
+        if isinstance(data, memoryview):
+            data = iotools.byte_view(data)
+        dir_entry = self._acquire_for_write()
         try:
-            self.mem_file.seek(self.pos)
-            self.mem_file.write(data)
-            self.pos = self.mem_file.tell()
+            contents = dir_entry.writable_data()
+            pos = self.pos
+            if pos > len(contents):
+                contents.extend(bytes(pos - len(contents)))
+            contents[pos:pos + len(data)] = data
+            self.pos = pos + len(data)
+            dir_entry.modified_time = time.time()
+            self.memory_fs._accessed(dir_entry)
         finally:
             self._lock.release()
+        self.memory_fs._check_memory()
 
-    @seek_and_lock
-    def writelines(self, *args, **kwargs):
-        return self.mem_file.writelines(*args, **kwargs)
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
 
     def __enter__(self):
         return self
@@ -168,19 +456,85 @@ class MemoryFile(object):
         return False
 
 
+def _time_getter(index):
+    fromtimestamp = datetime.datetime.fromtimestamp
+    return lambda raw: fromtimestamp(raw[index])
+
+
+class DirEntryInfo(Info):
+    """Info for a :py:class:`DirEntry`, from a tuple of (created_time,
+    modified_time, accessed_time, st_mode, size). Directories have no size."""
+
+    __slots__ = ()
+
+    _getters = {'created_time': _time_getter(0),
+                'modified_time': _time_getter(1),
+                'accessed_time': _time_getter(2),
+                'st_mode': itemgetter(3),
+                'size': itemgetter(4)}
+    _cached = frozenset(('created_time', 'modified_time', 'accessed_time'))
+
+    def _has(self, key):
+        if key == 'size':
+            return self._raw[4] is not None
+        return key in self._getters
+
+
+class _Generation(object):
+    """Identifies the entries a :py:class:`MemoryFS` may modify in place."""
+
+    __slots__ = ()
+
+
+class _SharedData(object):
+    """The file entries that share a bytearray, and the spill store that
+    counts the memory used by the files (if any)."""
+
+    __slots__ = ('entries', 'store')
+
+    def __init__(self, store=None):
+        self.entries = weakref.WeakSet()
+        self.store = store
+
+    def leave(self, dir_entry):
+        """Removes an entry (called holding `_entry_lock_guard`). If only one
+        entry is left, it stops sharing the contents and is returned."""
+        self.entries.discard(dir_entry)
+        if len(self.entries) == 1:
+            dir_entry = self.entries.pop()
+            dir_entry.shared = None
+            return dir_entry
+        return None
+
+    def unshared(self, dir_entry):
+        """Records that the contents of an entry returned by :py:meth:`leave`
+        are no longer shared, so they count towards the memory used."""
+        if dir_entry is not None and self.store is not None:
+            self.store.touch(dir_entry)
+
+
 class DirEntry(object):
+    """A file or directory in a :py:class:`MemoryFS`.
 
-    def sync(f):
-        def deco(self, *args, **kwargs):
-            if self.lock is not None:
-                try:
-                    self.lock.acquire()
-                    return f(self, *args, **kwargs)
-                finally:
-                    self.lock.release()
-            else:
-                return f(self, *args, **kwargs)
-        return deco
+    Directories have a dict of entries in `contents`, and files a bytearray
+    in `data`. Times are stored as timestamps.
+
+    The bytearray of a file may be shared with copies of the file, in which
+    case `shared` holds the entries that share it. Code that modifies the
+    contents must get them with :py:meth:`writable_data`, and replace them
+    with :py:meth:`set_data`, holding the entry's lock (if it has one).
+
+    A MemoryFS only modifies the entries whose `owner` is its current
+    generation; other entries may be shared with snapshots and forks.
+
+    The lock of a directory is held while entries are added to or removed
+    from it, or changed in it.
+
+    """
+
+    __slots__ = ('type', 'name', 'contents', 'data', 'shared', 'owner',
+                 'created_time', 'modified_time', 'accessed_time',
+                 'xattrs', 'lock', 'open_files', '__weakref__')
 
     def __init__(self, type, name, contents=None):
 
@@ -192,27 +546,147 @@ class DirEntry(object):
         if contents is None and type == "dir":
             contents = {}
 
-        self.open_files = []
         self.contents = contents
-        self.mem_file = None
-        self.created_time = datetime.datetime.now()
-        self.modified_time = self.created_time
-        self.accessed_time = self.created_time
-
-        self.xattrs = {}
+        self.data = bytearray() if type == "file" else None
+        self.shared = None
+        self.owner = None
+        self.created_time = self.modified_time = self.accessed_time = time.time()
 
+        #  Created on demand
+        self.xattrs = None
         self.lock = None
-        if self.type == 'file':
-            self.mem_file = StringIO()
-            self.lock = threading.RLock()
+        self.open_files = None
+
+    def get_lock(self):
+        """Gets the lock for the file's contents, creating it if necessary."""
+        lock = self.lock
+        if lock is None:
+            with _entry_lock_guard:
+                lock = self.lock
+                if lock is None:
+                    lock = self.lock = threading.RLock()
+        return lock
+
+    def _release_data(self):
+        """Stops sharing the contents (or discards them if they've been
+        spilled to disk). Once the share is released, the last entry that
+        shares the contents may write to them in place, so the entry shouldn't
+        use them afterwards."""
+        if isinstance(self.data, _SpilledData):
+            self.data.discard()
+        shared = self.shared
+        if shared is not None:
+            self.shared = None
+            with _entry_lock_guard:
+                remaining = shared.leave(self)
+            shared.unshared(remaining)
+
+    def _replace_data(self, data, shared):
+        """Replaces the contents, then releases the old contents (so they
+        aren't written to in place while the entry still refers to them)."""
+        old_data = self.data
+        old_shared = self.shared
+        self.data = data
+        self.shared = shared
+        if isinstance(old_data, _SpilledData):
+            old_data.discard()
+        if old_shared is not None and old_shared is not shared:
+            with _entry_lock_guard:
+                remaining = old_shared.leave(self)
+            old_shared.unshared(remaining)
+
+    def get_data(self):
+        """Gets the contents, loading them back in to memory if they've been
+        spilled to disk."""
+        data = self.data
+        if isinstance(data, _SpilledData):
+            self.data = data.load()
+            data.store.touch(self)
+            data = self.data
+        return data
 
-    def get_value(self):
-        self.lock.acquire()
+    def writable_data(self):
+        """Gets the contents to modify in place, copying them first if they're
+        shared with another file."""
+        self.get_data()
+        shared = self.shared
+        if shared is not None:
+            with _entry_lock_guard:
+                #  Copied before the share is released, as the last entry
+                #  that shares the contents may then write to them in place
+                if len(shared.entries) > 1:
+                    self.data = bytearray(self.data)
+                remaining = shared.leave(self)
+            self.shared = None
+            shared.unshared(remaining)
+        return self.data
+
+    def set_data(self, data):
+        """Replaces the contents of the file."""
+        self._replace_data(data, None)
+
+    def share_data(self, dir_entry, store=None):
+        """Makes the file share the contents of another file, until either
+        of them is modified. `store` is the spill store of the filesystem,
+        if it has one."""
+        if dir_entry is self or (self.shared is not None and self.shared is dir_entry.shared):
+            return
+        #  Open files may be modifying either entry's contents in place
+        src_lock = dir_entry.lock
+        if src_lock is None and isinstance(dir_entry.data, _SpilledData):
+            src_lock = dir_entry.get_lock()
+        locks = [lock for lock in (self.lock, src_lock) if lock is not None]
+        for lock in locks:
+            lock.acquire()
         try:
-            return self.mem_file.getvalue()
+            #  Spilled contents can't be shared
+            data = dir_entry.get_data()
+            with _entry_lock_guard:
+                shared = dir_entry.shared
+                if shared is None:
+                    shared = dir_entry.shared = _SharedData(store)
+                    shared.entries.add(dir_entry)
+                shared.entries.add(self)
+            self._replace_data(data, shared)
         finally:
-            self.lock.release()
-    data = property(get_value)
+            for lock in reversed(locks):
+                lock.release()
+
+    def take_data(self, dir_entry):
+        """Replaces the contents of the file with those of another file entry,
+        which is discarded."""
+        data = dir_entry.data
+        shared = dir_entry.shared
+        if shared is not None:
+            with _entry_lock_guard:
+                shared.entries.add(self)
+        self._replace_data(data, shared)
+        dir_entry.data = None
+        dir_entry._release_data()
+
+    def get_value(self):
+        """Get a copy of the file's contents."""
+        data = self.data
+        if isinstance(data, _SpilledData):
+            with self.get_lock():
+                return bytes(self.get_data())
+        return bytes(data)
+
+    def get_size(self):
+        """Get the size of the file, without copying its contents."""
+        return len(self.data)
+
+    def get_xattrs(self):
+        """Gets the dict of extended attributes, creating it if necessary."""
+        if self.xattrs is None:
+            self.xattrs = {}
+        return self.xattrs
+
+    def copy_xattrs(self):
+        """Get a copy of the extended attributes, or None if there are none."""
+        if not self.xattrs:
+            return None
+        return self.xattrs.copy()
 
     def desc_contents(self):
         if self.isfile():
@@ -229,29 +703,43 @@ class DirEntry(object):
     def __str__(self):
         return "%s: %s" % (self.name, self.desc_contents())
 
-    @sync
     def __getstate__(self):
-        state = self.__dict__.copy()
-        state.pop('lock')
-        if self.mem_file is not None:
-            state['mem_file'] = self.data
+        state = dict((name, getattr(self, name))
+                     for name in self.__slots__
+                     if name not in ('lock', 'open_files', 'shared', '__weakref__'))
+        if isinstance(self.data, _SpilledData):
+            state['data'] = bytearray(self.data.read())
         return state
 
     def __setstate__(self, state):
-        self.__dict__.update(state)
-        if self.type == 'file':
-            self.lock = threading.RLock()
-        else:
-            self.lock = None
-        if self.mem_file is not None:
-            data = self.mem_file
-            self.mem_file = StringIO()
-            self.mem_file.write(data)
+        self.lock = None
+        self.open_files = None
+        self.xattrs = None
+        self.shared = None
+        self.owner = None
+        if 'mem_file' in state:
+            #  Pickled before files were stored in a bytearray
+            state = dict(state)
+            data = state.pop('mem_file')
+            state['data'] = bytearray(data) if data is not None else None
+        for name, value in state.items():
+            setattr(self, name, value)
+        if isinstance(self.created_time, datetime.datetime):
+            #  Pickled before timestamps were stored as floats
+            for name in ('created_time', 'modified_time', 'accessed_time'):
+                setattr(self, name, _timestamp(getattr(self, name)))
 
 
 class MemoryFS(FS):
     """An in-memory filesystem.
 
+    :param file_factory: a callable that creates the file objects, called as
+        file_factory(path, memory_fs, dir_entry, mode)
+    :param max_memory: the maximum number of bytes of file contents to keep in
+        memory, or None for no limit
+    :param spill_fs: the filesystem to move file contents to when there's more
+        than `max_memory`, or None to create a TempFS when it's needed
+
     """
 
     _meta = {'thread_safe': True,
@@ -266,10 +754,14 @@ class MemoryFS(FS):
              'atomic.rename': True,
              'atomic.setcontents': False}
 
+    _lock_class = ReadWriteLock
+
     def _make_dir_entry(self, *args, **kwargs):
-        return self.dir_entry_factory(*args, **kwargs)
+        dir_entry = self.dir_entry_factory(*args, **kwargs)
+        dir_entry.owner = self._generation
+        return dir_entry
 
-    def __init__(self, file_factory=None):
+    def __init__(self, file_factory=None, max_memory=None, spill_fs=None):
         super(MemoryFS, self).__init__(thread_synchronize=_thread_synchronize_default)
 
         self.dir_entry_factory = DirEntry
@@ -277,8 +769,37 @@ class MemoryFS(FS):
         if not callable(self.file_factory):
             raise ValueError("file_factory should be callable")
 
+        #  Entries owned by other generations are shared with a snapshot or fork
+        self._generation = _Generation()
+        #  Maps entries on to the number of files opened from them
+        self._open_entries = {}
         self.root = self._make_dir_entry('dir', 'root')
 
+        self.max_memory = max_memory
+        if max_memory is not None:
+            self._spill_store = _SpillStore(max_memory, spill_fs)
+        else:
+            self._spill_store = None
+
+    def __getstate__(self):
+        state = super(MemoryFS, self).__getstate__()
+        state['_open_entries'] = {}
+        #  Spilled contents are pickled with the entries
+        state['_spill_store'] = None
+        return state
+
+    def __setstate__(self, state):
+        super(MemoryFS, self).__setstate__(state)
+        if '_generation' not in state:
+            self._generation = _Generation()
+            self._open_entries = {}
+        if 'max_memory' not in state:
+            self.max_memory = None
+        if self.max_memory is not None:
+            self._spill_store = _SpillStore(self.max_memory)
+        else:
+            self._spill_store = None
+
     def __str__(self):
         return "<MemoryFS>"
 
@@ -288,8 +809,43 @@ class MemoryFS(FS):
     def __unicode__(self):
         return "<MemoryFS>"
 
-    @synchronize
+    def close(self):
+        if not self.closed and self._spill_store is not None:
+            self._spill_store.release()
+        super(MemoryFS, self).close()
+
+    def getmeta(self, meta_name, default=NoDefaultMeta):
+        store = self._spill_store
+        if meta_name == 'memoryfs.max_memory':
+            return self.max_memory
+        elif meta_name == 'memoryfs.eviction_policy':
+            return 'lru' if store is not None else None
+        elif store is not None:
+            if meta_name == 'memoryfs.resident_bytes':
+                return store.resident_bytes
+            elif meta_name == 'memoryfs.spilled_bytes':
+                return store.spilled_bytes
+            elif meta_name == 'memoryfs.spilled_files':
+                return store.spilled_files
+        return super(MemoryFS, self).getmeta(meta_name, default)
+
+    def _accessed(self, dir_entry):
+        """Records an access to the contents of a file (called holding the
+        entry's lock, if it has one)."""
+        store = self._spill_store
+        if store is not None:
+            store.touch(dir_entry)
+
+    def _check_memory(self):
+        """Spills the contents of the least recently used files to disk, if
+        more than `max_memory` bytes are in memory."""
+        store = self._spill_store
+        if store is not None and store.resident_bytes > store.max_memory:
+            store.evict()
+
     def _get_dir_entry(self, dirpath):
+        #  Doesn't need the lock: the tree is only changed by single dict
+        #  operations, and a directory is never changed in to a file
         dirpath = normpath(dirpath)
         current_dir = self.root
         for path_component in iteratepath(dirpath):
@@ -301,14 +857,206 @@ class MemoryFS(FS):
             current_dir = dir_entry
         return current_dir
 
+    def _acquire_shared(self):
+        lock = self._lock
+        acquire_read = getattr(lock, 'acquire_read', None)
+        if acquire_read is None:
+            lock.acquire()
+        else:
+            acquire_read()
+
+    def _release_shared(self):
+        lock = self._lock
+        release_read = getattr(lock, 'release_read', None)
+        if release_read is None:
+            lock.release()
+        else:
+            release_read()
+
+    def _owns_path(self, path):
+        """Checks that the entry at a path (or as much of the path as exists)
+        and the directories that contain it aren't shared with a snapshot or fork."""
+        generation = self._generation
+        current_dir = self.root
+        if current_dir.owner is not generation:
+            return False
+        for path_component in iteratepath(normpath(path)):
+            if current_dir.contents is None:
+                break
+            current_dir = current_dir.contents.get(path_component, None)
+            if current_dir is None:
+                break
+            if current_dir.owner is not generation:
+                return False
+        return True
+
+    def _lock_dir(self, dirpath, own_path=None):
+        """Acquires the filesystem's lock shared and the lock of a directory,
+        so that entries may be added to, removed from or changed in the
+        directory while other directories are changed. Returns the entry for
+        the directory, or None (holding neither lock) if it isn't a directory.
+        Release the locks with :py:meth:`_unlock_dir`.
+
+        :param own_path: a path to copy first (along with the directories
+            that contain it) if it's shared with a snapshot or fork
+
+        """
+        while True:
+            self._acquire_shared()
+            if own_path is None or self._owns_path(own_path):
+                break
+            #  Entries are only copied while the lock is held exclusively
+            self._release_shared()
+            self._get_writable_dir_entry(own_path)
+        dir_entry = self._get_dir_entry(dirpath)
+        if dir_entry is None or not dir_entry.isdir():
+            self._release_shared()
+            return None
+        dir_entry.get_lock().acquire()
+        return dir_entry
+
+    def _unlock_dir(self, dir_entry):
+        dir_entry.lock.release()
+        self._release_shared()
+
+    def _copy_dir_entry(self, dir_entry):
+        """Copies an entry shared with a snapshot or fork, so that it can be
+        modified. Directory contents are copied, but not the entries in them."""
+        entry_copy = self._make_dir_entry(dir_entry.type, dir_entry.name)
+        entry_copy.created_time = dir_entry.created_time
+        entry_copy.modified_time = dir_entry.modified_time
+        entry_copy.accessed_time = dir_entry.accessed_time
+        entry_copy.xattrs = dir_entry.copy_xattrs()
+        if dir_entry.isdir():
+            entry_copy.contents = dir_entry.contents.copy()
+            return entry_copy
+        entry_copy.share_data(dir_entry, self._spill_store)
+        lock = dir_entry.lock
+        if lock is not None and dir_entry.open_files:
+            #  Move the files opened from this filesystem over to the copy
+            with lock:
+                entry_copy.lock = lock
+                open_files = [f for f in dir_entry.open_files if f.memory_fs is self]
+                if open_files:
+                    for f in open_files:
+                        dir_entry.open_files.remove(f)
+                        f.dir_entry = entry_copy
+                    entry_copy.open_files = open_files
+                    if not dir_entry.open_files:
+                        dir_entry.open_files = None
+                    self._open_entries[entry_copy] = self._open_entries.pop(dir_entry, len(open_files))
+        return entry_copy
+
+    def _own_child(self, dir_entry, name):
+        """Gets an entry in a directory to modify, copying it first if it's
+        shared (the directory must not be shared)."""
+        child = dir_entry.contents.get(name)
+        if child is not None and child.owner is not self._generation:
+            child = dir_entry.contents[name] = self._copy_dir_entry(child)
+        return child
+
+    @synchronize
+    def _get_writable_dir_entry(self, path):
+        """Gets an entry to modify, or None if it doesn't exist. If the entry
+        is shared with a snapshot or fork, it's copied along with the
+        directories that contain it."""
+        if self.root.owner is not self._generation:
+            self.root = self._copy_dir_entry(self.root)
+        current_dir = self.root
+        for path_component in iteratepath(normpath(path)):
+            if current_dir.contents is None:
+                return None
+            current_dir = self._own_child(current_dir, path_component)
+            if current_dir is None:
+                return None
+        return current_dir
+
+    @synchronize
+    def _own_open_file(self, open_file):
+        """Gives a file that's about to be written to an entry that isn't
+        shared with a snapshot or fork."""
+        dir_entry = open_file.dir_entry
+        if dir_entry.owner is self._generation:
+            return
+        if self._get_dir_entry(open_file.path) is dir_entry:
+            self._get_writable_dir_entry(open_file.path)
+        else:
+            #  Removed or replaced since it was opened, so the copy is detached
+            self._copy_dir_entry(dir_entry)
+
+    def _share_tree(self):
+        """Starts a new generation, so that the entries in the tree are
+        copied before they're modified (the filesystem's lock must be held)."""
+        #  Writes to open files check the generation while holding the entry's lock
+        locks = [dir_entry.get_lock() for dir_entry in self._open_entries]
+        for lock in locks:
+            lock.acquire()
+        try:
+            self._generation = _Generation()
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
     @synchronize
+    def fork(self):
+        """Creates an independent, writable copy of the filesystem.
+
+        The copy shares its directory tree with the original, so forking takes
+        the same time regardless of the size of the filesystem. Each
+        filesystem copies the entries it modifies (and the directories that
+        contain them) the first time it modifies them.
+
+        """
+        self._share_tree()
+        fork = MemoryFS(file_factory=self.file_factory)
+        fork.dir_entry_factory = self.dir_entry_factory
+        fork.root = self.root
+        if self._spill_store is not None:
+            #  Forks share the memory limit
+            fork.max_memory = self.max_memory
+            fork._spill_store = self._spill_store
+            self._spill_store.add_user()
+        return fork
+
+    def snapshot(self):
+        """Gets a read-only view of the filesystem as it is now.
+
+        Like :py:meth:`fork`, taking a snapshot takes the same time regardless
+        of the size of the filesystem. Pass the snapshot to :py:meth:`restore`
+        to return the filesystem to this point.
+
+        :returns: a :py:class:`MemoryFSSnapshot`
+
+        """
+        return MemoryFSSnapshot(self.fork())
+
+    def restore(self, snapshot):
+        """Restores the filesystem to a snapshot (or a fork). Files that are
+        open when the filesystem is restored are no longer part of it.
+
+        :param snapshot: a :py:class:`MemoryFSSnapshot` from :py:meth:`snapshot`,
+            or a MemoryFS from :py:meth:`fork`
+
+        """
+        if isinstance(snapshot, MemoryFSSnapshot):
+            snapshot = snapshot.wrapped_fs
+        if not isinstance(snapshot, MemoryFS):
+            raise ValueError("snapshot should be a MemoryFSSnapshot or a MemoryFS")
+        if snapshot is self:
+            return
+        with snapshot._lock:
+            snapshot._share_tree()
+            root = snapshot.root
+        with self._lock:
+            self._share_tree()
+            self.root = root
+
     def _dir_entry(self, path):
         dir_entry = self._get_dir_entry(path)
         if dir_entry is None:
             raise ResourceNotFoundError(path)
         return dir_entry
 
-    @synchronize
     def desc(self, path):
         if self.isdir(path):
             return "Memory dir"
@@ -317,7 +1065,6 @@ class MemoryFS(FS):
         else:
             return "No description available"
 
-    @synchronize
     def isdir(self, path):
         path = normpath(path)
         if path in ('', '/'):
@@ -327,7 +1074,6 @@ class MemoryFS(FS):
             return False
         return dir_item.isdir()
 
-    @synchronize
     def isfile(self, path):
         path = normpath(path)
         if path in ('', '/'):
@@ -337,14 +1083,12 @@ class MemoryFS(FS):
             return False
         return dir_item.isfile()
 
-    @synchronize
     def exists(self, path):
         path = normpath(path)
         if path in ('', '/'):
             return True
         return self._get_dir_entry(path) is not None
 
-    @synchronize
     def makedir(self, dirname, recursive=False, allow_recreate=False):
         if not dirname and not allow_recreate:
             raise PathError(dirname)
@@ -353,54 +1097,43 @@ class MemoryFS(FS):
             if allow_recreate:
                 return
             raise DestinationExistsError(dirname)
-        dirpath, dirname = pathsplit(dirname.rstrip('/'))
-
-        if recursive:
-            parent_dir = self._get_dir_entry(dirpath)
-            if parent_dir is not None:
-                if parent_dir.isfile():
-                    raise ResourceInvalidError(dirname, msg="Can not create a directory, because path references a file: %(path)s")
-                else:
-                    if not allow_recreate:
-                        if dirname in parent_dir.contents:
-                            raise DestinationExistsError(dirname, msg="Can not create a directory that already exists (try allow_recreate=True): %(path)s")
-
-            current_dir = self.root
-            for path_component in iteratepath(dirpath)[:-1]:
-                dir_item = current_dir.contents.get(path_component, None)
-                if dir_item is None:
-                    break
-                if not dir_item.isdir():
-                    raise ResourceInvalidError(dirname, msg="Can not create a directory, because path references a file: %(path)s")
-                current_dir = dir_item
-
-            current_dir = self.root
-            for path_component in iteratepath(dirpath):
-                dir_item = current_dir.contents.get(path_component, None)
-                if dir_item is None:
-                    new_dir = self._make_dir_entry("dir", path_component)
-                    current_dir.contents[path_component] = new_dir
-                    current_dir = new_dir
-                else:
-                    current_dir = dir_item
-
-            parent_dir = current_dir
+        dirpath, dirname = pathsplit(fullpath)
 
-        else:
-            parent_dir = self._get_dir_entry(dirpath)
+        if not recursive:
+            parent_dir = self._lock_dir(dirpath, dirpath)
             if parent_dir is None:
+                if self.isfile(dirpath):
+                    raise ResourceInvalidError(dirname, msg="Can not create a directory, because path references a file: %(path)s")
                 raise ParentDirectoryMissingError(dirname, msg="Could not make dir, as parent dir does not exist: %(path)s")
-
-        dir_item = parent_dir.contents.get(dirname, None)
-        if dir_item is not None:
-            if dir_item.isdir():
-                if not allow_recreate:
-                    raise DestinationExistsError(dirname)
-            else:
+            try:
+                self._make_child_dir(parent_dir, dirname, allow_recreate)
+            finally:
+                self._unlock_dir(parent_dir)
+            return
+
+        #  Each directory is created holding the lock of its parent
+        current_path = ''
+        path_components = iteratepath(fullpath)
+        last_index = len(path_components) - 1
+        for index, path_component in enumerate(path_components):
+            parent_dir = self._lock_dir(current_path, current_path)
+            if parent_dir is None:
                 raise ResourceInvalidError(dirname, msg="Can not create a directory, because path references a file: %(path)s")
+            try:
+                self._make_child_dir(parent_dir, path_component,
+                                     allow_recreate or index < last_index)
+            finally:
+                self._unlock_dir(parent_dir)
+            current_path = pathjoin(current_path, path_component)
 
+    def _make_child_dir(self, parent_dir, dirname, allow_recreate):
+        dir_item = parent_dir.contents.get(dirname, None)
         if dir_item is None:
             parent_dir.contents[dirname] = self._make_dir_entry("dir", dirname)
+        elif not dir_item.isdir():
+            raise ResourceInvalidError(dirname, msg="Can not create a directory, because path references a file: %(path)s")
+        elif not allow_recreate:
+            raise DestinationExistsError(dirname, msg="Can not create a directory that already exists (try allow_recreate=True): %(path)s")
 
 
     #@synchronize
@@ -409,59 +1142,67 @@ class MemoryFS(FS):
     #        f.close()
 
 
-    @synchronize
     @iotools.filelike_to_stream
     def open(self, path, mode='r', buffering=-1, encoding=None, errors=None, newline=None, line_buffering=False, **kwargs):
         path = normpath(path)
         filepath, filename = pathsplit(path)
-        parent_dir_entry = self._get_dir_entry(filepath)
-
-        if parent_dir_entry is None or not parent_dir_entry.isdir():
+        writable = 'w' in mode or 'a' in mode or '+' in mode
+        parent_dir_entry = self._lock_dir(filepath, path if writable else None)
+        if parent_dir_entry is None:
             raise ResourceNotFoundError(path)
 
-        if 'r' in mode or 'a' in mode:
-            if filename not in parent_dir_entry.contents:
-                raise ResourceNotFoundError(path)
-
-            file_dir_entry = parent_dir_entry.contents[filename]
-            if file_dir_entry.isdir():
-                raise ResourceInvalidError(path)
-
-            file_dir_entry.accessed_time = datetime.datetime.now()
-
-            mem_file = self.file_factory(path, self, file_dir_entry.mem_file, mode, file_dir_entry.lock)
-            file_dir_entry.open_files.append(mem_file)
-            return mem_file
-
-        elif 'w' in mode:
-            if filename not in parent_dir_entry.contents:
-                file_dir_entry = self._make_dir_entry("file", filename)
-                parent_dir_entry.contents[filename] = file_dir_entry
-            else:
-                file_dir_entry = parent_dir_entry.contents[filename]
-
-            file_dir_entry.accessed_time = datetime.datetime.now()
-
-            mem_file = self.file_factory(path, self, file_dir_entry.mem_file, mode, file_dir_entry.lock)
+        try:
+            file_dir_entry = parent_dir_entry.contents.get(filename, None)
+            if 'r' in mode or 'a' in mode:
+                if file_dir_entry is None:
+                    raise ResourceNotFoundError(path)
+                if file_dir_entry.isdir():
+                    raise ResourceInvalidError(path)
+                return self._open_dir_entry(path, file_dir_entry, mode)
+
+            elif 'w' in mode:
+                if file_dir_entry is None:
+                    file_dir_entry = self._make_dir_entry("file", filename)
+                    parent_dir_entry.contents[filename] = file_dir_entry
+                elif file_dir_entry.isdir():
+                    raise ResourceInvalidError(path)
+                return self._open_dir_entry(path, file_dir_entry, mode)
+        finally:
+            self._unlock_dir(parent_dir_entry)
+
+    def _open_dir_entry(self, path, file_dir_entry, mode):
+        if file_dir_entry.owner is self._generation:
+            #  Not updated in entries shared with a snapshot
+            file_dir_entry.accessed_time = time.time()
+        mem_file = self.file_factory(path, self, file_dir_entry, mode)
+        with file_dir_entry.get_lock():
+            if file_dir_entry.open_files is None:
+                file_dir_entry.open_files = []
             file_dir_entry.open_files.append(mem_file)
-            return mem_file
+            self._open_entries[file_dir_entry] = self._open_entries.get(file_dir_entry, 0) + 1
+        self._check_memory()
+        return mem_file
 
-        if parent_dir_entry is None:
-            raise ResourceNotFoundError(path)
-
-    @synchronize
     def remove(self, path):
-        dir_entry = self._get_dir_entry(path)
-
-        if dir_entry is None:
+        path = normpath(path)
+        pathname, filename = pathsplit(path)
+        parent_dir = self._lock_dir(pathname, pathname)
+        if parent_dir is None:
             raise ResourceNotFoundError(path)
-
-        if dir_entry.isdir():
-            raise ResourceInvalidError(path, msg="That's a directory, not a file: %(path)s")
-
-        pathname, dirname = pathsplit(path)
-        parent_dir = self._get_dir_entry(pathname)
-        del parent_dir.contents[dirname]
+        try:
+            dir_entry = parent_dir.contents.get(filename, None) if filename else parent_dir
+            if dir_entry is None:
+                raise ResourceNotFoundError(path)
+            if dir_entry.isdir():
+                raise ResourceInvalidError(path, msg="That's a directory, not a file: %(path)s")
+            del parent_dir.contents[filename]
+            if dir_entry.owner is self._generation:
+                with dir_entry.get_lock():
+                    if dir_entry.open_files is None:
+                        #  A copy of the file may now own the contents
+                        dir_entry._release_data()
+        finally:
+            self._unlock_dir(parent_dir)
 
     @synchronize
     def removedir(self, path, recursive=False, force=False):
@@ -482,7 +1223,7 @@ class MemoryFS(FS):
             rpathname = path
             while rpathname:
                 rpathname, dirname = pathsplit(rpathname)
-                parent_dir = self._get_dir_entry(rpathname)
+                parent_dir = self._get_writable_dir_entry(rpathname)
                 if not dirname:
                     raise RemoveRootError(path)
                 del parent_dir.contents[dirname]
@@ -491,7 +1232,7 @@ class MemoryFS(FS):
                     break
         else:
             pathname, dirname = pathsplit(path)
-            parent_dir = self._get_dir_entry(pathname)
+            parent_dir = self._get_writable_dir_entry(pathname)
             if not dirname:
                 raise RemoveRootError(path)
             del parent_dir.contents[dirname]
@@ -504,55 +1245,65 @@ class MemoryFS(FS):
         src_entry = self._get_dir_entry(src)
         if src_entry is None:
             raise ResourceNotFoundError(src)
-        open_files = src_entry.open_files[:]
-        for f in open_files:
-            f.flush()
-            f.path = dst
 
         dst_dir,dst_name = pathsplit(dst)
         dst_entry = self._get_dir_entry(dst)
         if dst_entry is not None:
             raise DestinationExistsError(dst)
-
-        src_dir_entry = self._get_dir_entry(src_dir)
-        src_xattrs = src_dir_entry.xattrs.copy()
-        dst_dir_entry = self._get_dir_entry(dst_dir)
-        if dst_dir_entry is None:
+        if self._get_dir_entry(dst_dir) is None:
             raise ParentDirectoryMissingError(dst)
-        dst_dir_entry.contents[dst_name] = src_dir_entry.contents[src_name]
-        dst_dir_entry.contents[dst_name].name = dst_name
-        dst_dir_entry.xattrs.update(src_xattrs)
+
+        src_dir_entry = self._get_writable_dir_entry(src_dir)
+        src_xattrs = src_dir_entry.copy_xattrs()
+        dst_dir_entry = self._get_writable_dir_entry(dst_dir)
+        src_entry = self._own_child(src_dir_entry, src_name)
+        for f in src_entry.open_files or ():
+            if f.memory_fs is self:
+                f.flush()
+                f.path = dst
+        dst_dir_entry.contents[dst_name] = src_entry
+        src_entry.name = dst_name
+        if src_xattrs:
+            dst_dir_entry.get_xattrs().update(src_xattrs)
         del src_dir_entry.contents[src_name]
 
-    @synchronize
     def settimes(self, path, accessed_time=None, modified_time=None):
-        now = datetime.datetime.now()
-        if accessed_time is None:
-            accessed_time = now
-        if modified_time is None:
-            modified_time = now
+        now = time.time()
+        accessed_time = now if accessed_time is None else _timestamp(accessed_time)
+        modified_time = now if modified_time is None else _timestamp(modified_time)
 
-        dir_entry = self._get_dir_entry(path)
-        if dir_entry is not None:
+        path = normpath(path)
+        parent_dir = self._lock_dir(pathsplit(path)[0], path)
+        if parent_dir is None:
+            return False
+        try:
+            dir_entry = self._get_dir_entry(path)
+            if dir_entry is None:
+                return False
             dir_entry.accessed_time = accessed_time
             dir_entry.modified_time = modified_time
             return True
-        return False
-
-    @synchronize
-    def _on_close_memory_file(self, open_file, path):
-        dir_entry = self._get_dir_entry(path)
-        if dir_entry is not None and open_file in dir_entry.open_files:
-            dir_entry.open_files.remove(open_file)
-
+        finally:
+            self._unlock_dir(parent_dir)
 
-    @synchronize
-    def _on_modify_memory_file(self, path):
-        dir_entry = self._get_dir_entry(path)
-        if dir_entry is not None:
-            dir_entry.modified_time = datetime.datetime.now()
+    def _on_close_memory_file(self, open_file, dir_entry):
+        self._acquire_shared()
+        try:
+            #  The file may have been moved to a copy of the entry
+            dir_entry = getattr(open_file, 'dir_entry', dir_entry)
+            with dir_entry.get_lock():
+                open_files = dir_entry.open_files
+                if open_files is not None and open_file in open_files:
+                    open_files.remove(open_file)
+                    if not open_files:
+                        dir_entry.open_files = None
+                    count = self._open_entries.pop(dir_entry, 1) - 1
+                    if count:
+                        self._open_entries[dir_entry] = count
+        finally:
+            self._release_shared()
+        self._check_memory()
 
-    @synchronize
     def listdir(self, path="/", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
         dir_entry = self._get_dir_entry(path)
         if dir_entry is None:
@@ -565,93 +1316,243 @@ class MemoryFS(FS):
                 paths[i] = str(p)
         return self._listdir_helper(path, paths, wildcard, full, absolute, dirs_only, files_only)
 
-    @synchronize
+    def _listdir_partition(self, path):
+        dir_entry = self._get_dir_entry(path)
+        if dir_entry is None:
+            raise ResourceNotFoundError(path)
+        if dir_entry.isfile():
+            raise ResourceInvalidError(path, msg="not a directory: %(path)s")
+        dirs = []
+        files = []
+        for name, entry in list(dir_entry.contents.items()):
+            if not isinstance(name, str):
+                name = str(name)
+            if entry.isdir():
+                dirs.append(name)
+            else:
+                files.append(name)
+        return dirs, files
+
+    def _listdirinfo_partition(self, path):
+        dir_entry = self._get_dir_entry(path)
+        if dir_entry is None:
+            raise ResourceNotFoundError(path)
+        if dir_entry.isfile():
+            raise ResourceInvalidError(path, msg="not a directory: %(path)s")
+        _dir_entry_info = self._dir_entry_info
+        dirs = []
+        files = []
+        for name, entry in list(dir_entry.contents.items()):
+            if not isinstance(name, str):
+                name = str(name)
+            if entry.isdir():
+                dirs.append((name, _dir_entry_info(entry)))
+            else:
+                files.append((name, _dir_entry_info(entry)))
+        return dirs, files
+
     def getinfo(self, path):
         dir_entry = self._get_dir_entry(path)
 
         if dir_entry is None:
             raise ResourceNotFoundError(path)
 
-        info = {}
-        info['created_time'] = dir_entry.created_time
-        info['modified_time'] = dir_entry.modified_time
-        info['accessed_time'] = dir_entry.accessed_time
+        return self._dir_entry_info(dir_entry)
 
+    def _dir_entry_info(self, dir_entry):
         if dir_entry.isdir():
-            info['st_mode'] = 0o755 | stat.S_IFDIR
-        else:
-            info['size'] = len(dir_entry.data or b(''))
-            info['st_mode'] = 0o666 | stat.S_IFREG
-
-        return info
+            return DirEntryInfo((dir_entry.created_time,
+                                 dir_entry.modified_time,
+                                 dir_entry.accessed_time,
+                                 0o755 | stat.S_IFDIR,
+                                 None))
+        return DirEntryInfo((dir_entry.created_time,
+                             dir_entry.modified_time,
+                             dir_entry.accessed_time,
+                             0o666 | stat.S_IFREG,
+                             dir_entry.get_size()))
+
+    def _clone_dir_entry(self, dir_entry):
+        """Copies an entry and everything in it, sharing the contents of files
+        with the originals."""
+        clone = self._make_dir_entry(dir_entry.type, dir_entry.name)
+        stack = [(dir_entry, clone)]
+        while stack:
+            src_entry, dst_entry = stack.pop()
+            dst_entry.xattrs = src_entry.copy_xattrs()
+            if src_entry.isfile():
+                dst_entry.share_data(src_entry, self._spill_store)
+                continue
+            for name, entry in src_entry.contents.items():
+                entry_clone = self._make_dir_entry(entry.type, name)
+                dst_entry.contents[name] = entry_clone
+                stack.append((entry, entry_clone))
+        return clone
+
+    def _merge_dir_entry(self, src_entry, dst_entry, path, ignore_errors):
+        """Moves the contents of a cloned directory in to an existing
+        directory, replacing files with the same names."""
+        if src_entry.xattrs:
+            dst_entry.get_xattrs().update(src_entry.xattrs)
+        for name, entry in src_entry.contents.items():
+            entry_path = pathjoin(path, name)
+            existing = self._own_child(dst_entry, name)
+            if existing is None:
+                dst_entry.contents[name] = entry
+            elif existing.isdir() and entry.isdir():
+                self._merge_dir_entry(entry, existing, entry_path, ignore_errors)
+            elif existing.isfile() and entry.isfile():
+                lock = existing.lock
+                if lock is None:
+                    existing.take_data(entry)
+                else:
+                    with lock:
+                        existing.take_data(entry)
+                existing.modified_time = time.time()
+                if entry.xattrs:
+                    existing.get_xattrs().update(entry.xattrs)
+            elif not ignore_errors:
+                raise ResourceInvalidError(entry_path, msg="Can't copy a file over a directory, or a directory over a file: %(path)s")
 
     @synchronize
     def copydir(self, src, dst, overwrite=False, ignore_errors=False, chunk_size=1024*64):
         src_dir_entry = self._get_dir_entry(src)
         if src_dir_entry is None:
             raise ResourceNotFoundError(src)
-        src_xattrs = src_dir_entry.xattrs.copy()
-        super(MemoryFS, self).copydir(src, dst, overwrite, ignore_errors=ignore_errors, chunk_size=chunk_size)
+        if not src_dir_entry.isdir():
+            raise ResourceInvalidError(src, msg="Source is not a directory: %(path)s")
+        dst = normpath(dst)
         dst_dir_entry = self._get_dir_entry(dst)
         if dst_dir_entry is not None:
-            dst_dir_entry.xattrs.update(src_xattrs)
+            if not overwrite:
+                raise DestinationExistsError(dst)
+            if not dst_dir_entry.isdir():
+                raise ResourceInvalidError(dst, msg="Destination is not a directory: %(path)s")
+            dst_parent_entry = None
+        else:
+            dst_path, dst_name = pathsplit(dst)
+            dst_parent_entry = self._get_dir_entry(dst_path)
+            if dst_parent_entry is None or not dst_parent_entry.isdir():
+                raise ParentDirectoryMissingError(dst)
+
+        #  Cloned before the destination is changed, in case it's inside the source
+        clone = self._clone_dir_entry(src_dir_entry)
+        if dst_parent_entry is not None:
+            clone.name = dst_name
+            self._get_writable_dir_entry(dst_path).contents[dst_name] = clone
+        else:
+            self._merge_dir_entry(clone, self._get_writable_dir_entry(dst), dst, ignore_errors)
 
     @synchronize
     def movedir(self, src, dst, overwrite=False, ignore_errors=False, chunk_size=1024*64):
         src_dir_entry = self._get_dir_entry(src)
         if src_dir_entry is None:
             raise ResourceNotFoundError(src)
-        src_xattrs = src_dir_entry.xattrs.copy()
+        src_xattrs = src_dir_entry.copy_xattrs()
         super(MemoryFS, self).movedir(src, dst, overwrite, ignore_errors=ignore_errors, chunk_size=chunk_size)
-        dst_dir_entry = self._get_dir_entry(dst)
-        if dst_dir_entry is not None:
-            dst_dir_entry.xattrs.update(src_xattrs)
+        if src_xattrs:
+            dst_dir_entry = self._get_writable_dir_entry(dst)
+            if dst_dir_entry is not None:
+                dst_dir_entry.get_xattrs().update(src_xattrs)
 
     @synchronize
     def copy(self, src, dst, overwrite=False, chunk_size=1024*64):
         src_dir_entry = self._get_dir_entry(src)
         if src_dir_entry is None:
             raise ResourceNotFoundError(src)
-        src_xattrs = src_dir_entry.xattrs.copy()
-        super(MemoryFS, self).copy(src, dst, overwrite, chunk_size)
+        if not src_dir_entry.isfile():
+            raise ResourceInvalidError(src, msg="Source is not a file: %(path)s")
         dst_dir_entry = self._get_dir_entry(dst)
-        if dst_dir_entry is not None:
-            dst_dir_entry.xattrs.update(src_xattrs)
+        if dst_dir_entry is None:
+            dst_path, dst_name = pathsplit(normpath(dst))
+            dst_parent_entry = self._get_dir_entry(dst_path)
+            if dst_parent_entry is None or not dst_parent_entry.isdir():
+                raise ParentDirectoryMissingError(dst)
+            dst_dir_entry = self._make_dir_entry("file", dst_name)
+            self._get_writable_dir_entry(dst_path).contents[dst_name] = dst_dir_entry
+        elif not overwrite:
+            raise DestinationExistsError(dst)
+        elif not dst_dir_entry.isfile():
+            raise ResourceInvalidError(dst, msg="Destination is a directory: %(path)s")
+        else:
+            dst_dir_entry = self._get_writable_dir_entry(dst)
+            dst_dir_entry.modified_time = time.time()
+        dst_dir_entry.share_data(src_dir_entry, self._spill_store)
+        src_xattrs = src_dir_entry.copy_xattrs()
+        if src_xattrs:
+            dst_dir_entry.get_xattrs().update(src_xattrs)
 
     @synchronize
     def move(self, src, dst, overwrite=False, chunk_size=1024*64):
         src_dir_entry = self._get_dir_entry(src)
         if src_dir_entry is None:
             raise ResourceNotFoundError(src)
-        src_xattrs = src_dir_entry.xattrs.copy()
+        src_xattrs = src_dir_entry.copy_xattrs()
         super(MemoryFS, self).move(src, dst, overwrite, chunk_size)
-        dst_dir_entry = self._get_dir_entry(dst)
-        if dst_dir_entry is not None:
-            dst_dir_entry.xattrs.update(src_xattrs)
+        if src_xattrs:
+            dst_dir_entry = self._get_writable_dir_entry(dst)
+            if dst_dir_entry is not None:
+                dst_dir_entry.get_xattrs().update(src_xattrs)
 
-    @synchronize
     def getcontents(self, path, mode="rb", encoding=None, errors=None, newline=None):
         dir_entry = self._get_dir_entry(path)
         if dir_entry is None:
             raise ResourceNotFoundError(path)
         if not dir_entry.isfile():
             raise ResourceInvalidError(path, msg="not a file: %(path)s")
-        data = dir_entry.data or b('')
+        data = dir_entry.get_value()
+        self._check_memory()
         if 'b' not in mode:
             return iotools.decode_binary(data, encoding=encoding, errors=errors, newline=newline)
         return data
 
-    @synchronize
+    def getrange(self, path, offset, length=None):
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        dir_entry = self._get_dir_entry(path)
+        if dir_entry is None:
+            raise ResourceNotFoundError(path)
+        if not dir_entry.isfile():
+            raise ResourceInvalidError(path, msg="not a file: %(path)s")
+        with dir_entry.get_lock():
+            data = dir_entry.get_data()
+            if length is None:
+                chunk = _copy_bytes(data, offset, len(data))
+            else:
+                chunk = _copy_bytes(data, offset, offset + length)
+            self._accessed(dir_entry)
+        self._check_memory()
+        return chunk
+
     def setcontents(self, path, data=b'', encoding=None, errors=None, chunk_size=1024*64):
-        if isinstance(data, six.binary_type):
-            if not self.exists(path):
-                self.open(path, 'wb').close()
-            dir_entry = self._get_dir_entry(path)
-            if not dir_entry.isfile():
-                raise ResourceInvalidError('Not a directory %(path)s', path)
-            new_mem_file = StringIO()
-            new_mem_file.write(data)
-            dir_entry.mem_file = new_mem_file
+        if isinstance(data, (six.binary_type, bytearray, memoryview)):
+            if isinstance(data, memoryview):
+                data = iotools.byte_view(data)
+            path = normpath(path)
+            dirpath, filename = pathsplit(path)
+            parent_dir_entry = self._lock_dir(dirpath, path)
+            if parent_dir_entry is None:
+                raise ResourceNotFoundError(path)
+            try:
+                dir_entry = parent_dir_entry.contents.get(filename, None) if filename else parent_dir_entry
+                if dir_entry is None:
+                    #  Create the entry directly, rather than opening a file
+                    dir_entry = self._make_dir_entry("file", filename)
+                    parent_dir_entry.contents[filename] = dir_entry
+                elif not dir_entry.isfile():
+                    raise ResourceInvalidError('Not a directory %(path)s', path)
+                lock = dir_entry.lock
+                if lock is None:
+                    dir_entry.set_data(bytearray(data))
+                    self._accessed(dir_entry)
+                else:
+                    with lock:
+                        dir_entry.set_data(bytearray(data))
+                        self._accessed(dir_entry)
+                dir_entry.modified_time = time.time()
+            finally:
+                self._unlock_dir(parent_dir_entry)
+            self._check_memory()
             return len(data)
 
         return super(MemoryFS, self).setcontents(path, data=data, encoding=encoding, errors=errors, chunk_size=chunk_size)
@@ -668,27 +1569,60 @@ class MemoryFS(FS):
         # new_mem_file.write(data)
         # dir_entry.mem_file = new_mem_file
 
-    @synchronize
     def setxattr(self, path, key, value):
-        dir_entry = self._dir_entry(path)
-        key = str(key)
-        dir_entry.xattrs[key] = value
+        path = normpath(path)
+        parent_dir = self._lock_dir(pathsplit(path)[0], path)
+        if parent_dir is None:
+            raise ResourceNotFoundError(path)
+        try:
+            dir_entry = self._dir_entry(path)
+            key = str(key)
+            dir_entry.get_xattrs()[key] = value
+        finally:
+            self._unlock_dir(parent_dir)
 
-    @synchronize
     def getxattr(self, path, key, default=None):
         key = str(key)
         dir_entry = self._dir_entry(path)
+        if not dir_entry.xattrs:
+            return default
         return dir_entry.xattrs.get(key, default)
 
-    @synchronize
     def delxattr(self, path, key):
         dir_entry = self._dir_entry(path)
+        if not dir_entry.xattrs or key not in dir_entry.xattrs:
+            return
+        path = normpath(path)
+        parent_dir = self._lock_dir(pathsplit(path)[0], path)
+        if parent_dir is None:
+            raise ResourceNotFoundError(path)
         try:
-            del dir_entry.xattrs[key]
-        except KeyError:
-            pass
+            dir_entry = self._dir_entry(path)
+            if dir_entry.xattrs:
+                dir_entry.xattrs.pop(key, None)
+        finally:
+            self._unlock_dir(parent_dir)
 
-    @synchronize
     def listxattrs(self, path):
         dir_entry = self._dir_entry(path)
-        return list(dir_entry.xattrs.keys())
+        return list(dir_entry.xattrs or ())
+
+
+class MemoryFSSnapshot(ReadOnlyFS):
+    """A read-only view of a :py:class:`MemoryFS` at the time
+    :py:meth:`MemoryFS.snapshot` was called.
+
+    A snapshot shares its directory tree with the filesystem it was taken
+    from, and isn't affected by later changes to that filesystem.
+
+    """
+
+    def __repr__(self):
+        return "<MemoryFSSnapshot>"
+
+    __str__ = __repr__
+
+    def fork(self):
+        """Creates a writable copy of the filesystem as it was when the
+        snapshot was taken (see :py:meth:`MemoryFS.fork`)."""
+        return self.wrapped_fs.fork()
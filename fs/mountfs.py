@@ -84,6 +84,8 @@ class MountFS(FS):
     DirMount = DirMount
     FileMount = FileMount
 
+    _lock_class = ReadWriteLock
+
     def __init__(self, auto_close=True, thread_synchronize=_thread_synchronize_default):
         self.auto_close = auto_close
         super(MountFS, self).__init__(thread_synchronize=thread_synchronize)
@@ -153,7 +155,7 @@ class MountFS(FS):
                 raise NoPathURLError(path=path)
         return fs.getpathurl(delegate_path, allow_none=allow_none)
 
-    @synchronize
+    @synchronize_read
     def desc(self, path):
         fs, _mount_path, delegate_path = self._delegate(path)
         if fs is self:
@@ -163,7 +165,7 @@ class MountFS(FS):
                 return "Mounted file"
         return "Mounted dir, maps to path %s on %s" % (abspath(delegate_path) or '/', str(fs))
 
-    @synchronize
+    @synchronize_read
     def isdir(self, path):
         fs, _mount_path, delegate_path = self._delegate(path)
         if fs is None:
@@ -176,7 +178,7 @@ class MountFS(FS):
             return not isinstance(obj, MountFS.FileMount)
         return fs.isdir(delegate_path)
 
-    @synchronize
+    @synchronize_read
     def isfile(self, path):
         fs, _mount_path, delegate_path = self._delegate(path)
         if fs is None:
@@ -186,7 +188,7 @@ class MountFS(FS):
             return isinstance(obj, MountFS.FileMount)
         return fs.isfile(delegate_path)
 
-    @synchronize
+    @synchronize_read
     def exists(self, path):
         if path in ("/", ""):
             return True
@@ -197,7 +199,7 @@ class MountFS(FS):
             return True
         return fs.exists(delegate_path)
 
-    @synchronize
+    @synchronize_read
     def listdir(self, path="/", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
         fs, _mount_path, delegate_path = self._delegate(path)
 
@@ -241,7 +243,7 @@ class MountFS(FS):
 
             return paths
 
-    @synchronize
+    @synchronize_read
     def ilistdir(self, path="/", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
         fs, _mount_path, delegate_path = self._delegate(path)
 
@@ -297,7 +299,7 @@ class MountFS(FS):
                 raise DestinationExistsError(path, msg="Can not create a directory that already exists (try allow_recreate=True): %(path)s")
         return fs.makedir(delegate_path, recursive=recursive, allow_recreate=allow_recreate)
 
-    @synchronize
+    @synchronize_read
     def open(self, path, mode='r', buffering=-1, encoding=None, errors=None, newline=None, line_buffering=False, **kwargs):
         obj = self.mount_tree.get(path, None)
         if type(obj) is MountFS.FileMount:
@@ -460,7 +462,7 @@ class MountFS(FS):
             raise UnsupportedError("settimes")
         fs.settimes(delegate_path, accessed_time, modified_time)
 
-    @synchronize
+    @synchronize_read
     def getinfo(self, path):
         path = normpath(path)
 
@@ -477,7 +479,25 @@ class MountFS(FS):
             return {}
         return fs.getinfo(delegate_path)
 
-    @synchronize
+    @synchronize_read
+    def getinfo_many(self, paths):
+        results = {}
+        batches = {}
+        for path in paths:
+            fs, _mount_path, delegate_path = self._delegate(path)
+            if fs is None or fs is self:
+                results[path] = self._getinfo_or_none(path)
+            else:
+                batches.setdefault(id(fs), (fs, []))[1].append((path, delegate_path))
+
+        # Each mounted filesystem gets its paths in one batch
+        for fs, entries in batches.values():
+            infos = fs.getinfo_many([delegate_path for _path, delegate_path in entries])
+            for path, delegate_path in entries:
+                results[path] = infos[delegate_path]
+        return results
+
+    @synchronize_read
     def getsize(self, path):
         path = normpath(path)
         fs, _mount_path, delegate_path = self._delegate(path)
@@ -498,7 +518,15 @@ class MountFS(FS):
 
         return fs.getinfo(delegate_path).get("size", None)
 
-    @synchronize
+    @synchronize_read
+    def gethash(self, path, algorithm='md5', chunk_size=64*1024):
+        path = normpath(path)
+        fs, _mount_path, delegate_path = self._delegate(path)
+        if fs is None or fs is self:
+            return super(MountFS, self).gethash(path, algorithm, chunk_size)
+        return fs.gethash(delegate_path, algorithm, chunk_size)
+
+    @synchronize_read
     def getxattr(self,path,name,default=None):
         path = normpath(path)
         fs, _mount_path, delegate_path = self._delegate(path)
@@ -530,7 +558,7 @@ class MountFS(FS):
             return True
         return fs.delxattr(delegate_path, name)
 
-    @synchronize
+    @synchronize_read
     def listxattrs(self,path):
         path = normpath(path)
         fs, _mount_path, delegate_path = self._delegate(path)
@@ -63,7 +63,7 @@ you can always access them directly.
 
 """
 
-from fs.base import FS, synchronize
+from fs.base import FS, ReadWriteLock, synchronize, synchronize_read
 from fs.path import *
 from fs.errors import *
 from fs import _thread_synchronize_default
@@ -84,6 +84,8 @@ class MultiFS(FS):
               'case_insensitive_paths' : False
               }
 
+    _lock_class = ReadWriteLock
+
     def __init__(self, auto_close=True):
         """
 
@@ -98,13 +100,13 @@ class MultiFS(FS):
         self.fs_priorities = {}
         self.writefs = None
 
-    @synchronize
+    @synchronize_read
     def __str__(self):
         return "<MultiFS: %s>" % ", ".join(str(fs) for fs in self.fs_sequence)
 
     __repr__ = __str__
 
-    @synchronize
+    @synchronize_read
     def __unicode__(self):
         return "<MultiFS: %s>" % ", ".join(str(fs) for fs in self.fs_sequence)
 
@@ -188,11 +190,11 @@ class MultiFS(FS):
         del self.fs_lookup[name]
         self._priority_sort()
 
-    @synchronize
+    @synchronize_read
     def __getitem__(self, name):
         return self.fs_lookup[name]
 
-    @synchronize
+    @synchronize_read
     def __iter__(self):
         return iter(self.fs_sequence[:])
 
@@ -202,7 +204,7 @@ class MultiFS(FS):
                 return fs
         return None
 
-    @synchronize
+    @synchronize_read
     def which(self, path, mode='r'):
         """Retrieves the filesystem that a given path would delegate to.
         Returns a tuple of the filesystem's name and the filesystem object itself.
@@ -219,7 +221,7 @@ class MultiFS(FS):
                         return fs_name, fs
         raise ResourceNotFoundError(path, msg="Path does not map to any filesystem: %(path)s")
 
-    @synchronize
+    @synchronize_read
     def getsyspath(self, path, allow_none=False):
         fs = self._delegate_search(path)
         if fs is not None:
@@ -228,7 +230,7 @@ class MultiFS(FS):
             return None
         raise ResourceNotFoundError(path)
 
-    @synchronize
+    @synchronize_read
     def desc(self, path):
         if not self.exists(path):
             raise ResourceNotFoundError(path)
@@ -238,7 +240,7 @@ class MultiFS(FS):
             return ""
         return "%s (in %s)" % (fs.desc(path), name)
 
-    @synchronize
+    @synchronize_read
     def open(self, path, mode='r', buffering=-1, encoding=None, errors=None, newline=None, line_buffering=False, **kwargs):
         if 'w' in mode or '+' in mode or 'a' in mode:
             if self.writefs is None:
@@ -250,25 +252,25 @@ class MultiFS(FS):
                 return fs_file
         raise ResourceNotFoundError(path)
 
-    @synchronize
+    @synchronize_read
     def exists(self, path):
         return self._delegate_search(path) is not None
 
-    @synchronize
+    @synchronize_read
     def isdir(self, path):
         fs = self._delegate_search(path)
         if fs is not None:
             return fs.isdir(path)
         return False
 
-    @synchronize
+    @synchronize_read
     def isfile(self, path):
         fs = self._delegate_search(path)
         if fs is not None:
             return fs.isfile(path)
         return False
 
-    @synchronize
+    @synchronize_read
     def listdir(self, path="./", *args, **kwargs):
         paths = []
         for fs in self:
@@ -310,9 +312,31 @@ class MultiFS(FS):
             raise OperationFailedError('settimes', path=path, msg="No writeable FS set")
         self.writefs.settimes(path, accessed_time, modified_time)
 
-    @synchronize
+    @synchronize_read
+    def gethash(self, path, algorithm='md5', chunk_size=64*1024):
+        fs = self._delegate_search(path)
+        if fs is None:
+            raise ResourceNotFoundError(path)
+        return fs.gethash(path, algorithm, chunk_size)
+
+    @synchronize_read
     def getinfo(self, path):
         for fs in self:
             if fs.exists(path):
                 return fs.getinfo(path)
         raise ResourceNotFoundError(path)
+
+    @synchronize_read
+    def getinfo_many(self, paths):
+        results = dict.fromkeys(paths)
+        # Paths not found in a filesystem are passed on to the next one
+        remaining = list(results)
+        for fs in self:
+            if not remaining:
+                break
+            infos = fs.getinfo_many(remaining)
+            remaining = [path for path in remaining if infos[path] is None]
+            for path, info in infos.items():
+                if info is not None:
+                    results[path] = info
+        return results
@@ -42,6 +42,12 @@ them::
 
     from fs.opener import fsopendir, fsopen
 
+Openers are imported when they are first used, if they are added to a registry
+by their dotted path. This keeps the cost of importing `fs.opener` low when a
+registry has openers for many filesystems::
+
+    opener.add('myapp.openers.DBOpener', names=['db'])
+
 
 """
 
@@ -66,13 +72,12 @@ __all__ = ['OpenerError',
            'DavOpener',
            'HTTPOpener']
 
+#  Filesystems (and the modules they need) are imported by each opener's
+#  get_fs, so that importing this module stays cheap
 from fs.path import pathsplit, join, iswildcard, normpath
-from fs.osfs import OSFS
-from fs.filelike import FileWrapper
-from os import getcwd
 import os.path
 import re
-from urllib.parse import urlparse
+import threading
 
 class OpenerError(Exception):
     """The base exception thrown by openers"""
@@ -114,7 +119,34 @@ def _parse_name(fs_name):
     else:
         return fs_name, None
 
+def _split_root(fs_path):
+    """Splits a URL (which may have credentials and no scheme) in to the URL
+    of the server, and the path on the server."""
+    username, password, url = _parse_credentials(fs_path)
+    scheme = None
+    if '://' in url:
+        scheme, url = url.split('://', 1)
+    if '/' in url:
+        netloc, path = url.split('/', 1)
+    else:
+        netloc, path = url, ''
+    root = netloc
+    if username is not None:
+        if password is not None:
+            root = '%s:%s@%s' % (username, password, root)
+        else:
+            root = '%s@%s' % (username, root)
+    if scheme is not None:
+        root = '%s://%s' % (scheme, root)
+    return root, path
+
+def _root_key(root_url):
+    """Gets a key that identifies the server and credentials of a URL."""
+    username, password, url = _parse_credentials(root_url)
+    return username, password, url.lower()
+
 def _split_url_path(url):
+    from urllib.parse import urlparse
     if '://' not in url:
         url = 'http://' + url
     scheme, netloc, path, _params, _query, _fragment = urlparse(url)
@@ -155,10 +187,13 @@ class OpenerRegistry(object):
 ''', re.VERBOSE)
 
 
-    def __init__(self, openers=[]):
+    def __init__(self, openers=[], pool=None):
         self.registry = {}
         self.openers = {}
         self.default_opener = 'osfs'
+        #: The :py:class:`~fs.pool.FSPool` used in pooled mode (created when first needed)
+        self.pool = pool
+        self._pool_lock = threading.Lock()
         for opener in openers:
             self.add(opener)
 
@@ -177,21 +212,57 @@ class OpenerRegistry(object):
         if name not in self.registry:
             raise NoOpenerError("No opener for %s" % name)
         index = self.registry[name]
-        return self.openers[index]
+        return self._load_opener(index)
 
-    def add(self, opener):
+    def _load_opener(self, index):
+        """Gets an opener, importing it if it was added by its dotted path."""
+        opener = self.openers[index]
+        if isinstance(opener, str):
+            module_name, _, class_name = opener.rpartition('.')
+            try:
+                module = __import__(module_name, fromlist=[class_name])
+                opener = getattr(module, class_name)
+            except (ImportError, AttributeError, ValueError) as e:
+                raise OpenerError("Unable to import opener %s (%s)" % (opener, e))
+            self.openers[index] = opener
+        return opener
+
+    def list_openers(self):
+        """Gets a list of the openers in the registry, importing any that were
+        added by their dotted path."""
+        return [self._load_opener(index) for index in sorted(self.openers)]
+
+    def add(self, opener, names=None):
         """Adds an opener to the registry
 
-        :param opener: a class derived from fs.opener.Opener
+        :param opener: a class derived from fs.opener.Opener, or the dotted
+            path of one (e.g. ``'myapp.openers.MyOpener'``), which is imported
+            the first time it is used
+        :param names: the protocols the opener handles; required if the opener
+            is given as a dotted path, otherwise the opener's `names` attribute
+            is used
 
         """
 
+        if names is None:
+            if isinstance(opener, str):
+                raise ValueError("names are required for an opener given by its dotted path")
+            names = opener.names
         index = len(self.openers)
         self.openers[index] = opener
-        for name in opener.names:
+        for name in names:
             self.registry[name] = index
 
-    def parse(self, fs_url, default_fs_name=None, writeable=False, create_dir=False, cache_hint=True):
+    def get_pool(self):
+        """Gets the pool of filesystems used in pooled mode, creating it if
+        necessary."""
+        with self._pool_lock:
+            if self.pool is None:
+                from fs.pool import FSPool
+                self.pool = FSPool()
+            return self.pool
+
+    def parse(self, fs_url, default_fs_name=None, writeable=False, create_dir=False, cache_hint=True, pooled=False):
         """Parses a FS url and returns an fs object a path within that FS object
         (if indicated in the path). A tuple of (<FS instance>, <path>) is returned.
 
@@ -199,6 +270,11 @@ class OpenerRegistry(object):
         :param default_fs_name: the default FS to use if none is indicated (defaults is OSFS)
         :param writeable: if True, a writeable FS will be returned
         :param create_dir: if True, then the directory in the FS will be created
+        :param pooled: if True, filesystems that connect to a server are shared
+            with other URLs for the same server and credentials (see
+            :py:mod:`fs.pool`), and the FS returned is a
+            :py:class:`~fs.pool.PooledFS` which should be closed when it's no
+            longer needed
 
         """
 
@@ -233,6 +309,13 @@ class OpenerRegistry(object):
         if fs_url is None:
             raise OpenerError("Unable to parse '%s'" % orig_url)
 
+        if pooled:
+            split = opener.split_root(fs_url)
+            if split is not None:
+                root_url, fs_path = split
+                return self._parse_pooled(opener, fs_name, fs_name_params, root_url, fs_path, path,
+                                          writeable, create_dir, cache_hint)
+
         fs, fs_path = opener.get_fs(self, fs_name, fs_name_params, fs_url, writeable, create_dir)
         fs.cache_hint(cache_hint)
 
@@ -255,7 +338,34 @@ class OpenerRegistry(object):
 
         return fs, fs_path or ''
 
-    def open(self, fs_url, mode='r', **kwargs):
+    def _parse_pooled(self, opener, fs_name, fs_name_params, root_url, fs_path, path, writeable, create_dir, cache_hint):
+        def open_root():
+            root_fs, _path = opener.get_fs(self, fs_name, fs_name_params, root_url, writeable, False)
+            root_fs.cache_hint(cache_hint)
+            return root_fs
+
+        key = (opener, fs_name_params, _root_key(root_url))
+        root_fs = self.get_pool().acquire(key, open_root, opener.check_fs)
+        try:
+            if fs_path and iswildcard(fs_path):
+                pathname, resourcename = pathsplit(fs_path)
+            else:
+                fs_path = join(fs_path, path)
+                if create_dir and fs_path:
+                    if not root_fs.getmeta('read_only', False):
+                        root_fs.makedir(fs_path, allow_recreate=True, recursive=True)
+                pathname, resourcename = pathsplit(fs_path or '')
+            if not (pathname and resourcename):
+                return root_fs, resourcename or fs_path or ''
+            #  The directory holds its own reference to the pooled FS
+            fs = root_fs.opendir(pathname)
+        except:
+            root_fs.close()
+            raise
+        root_fs.close()
+        return fs, resourcename
+
+    def open(self, fs_url, mode='r', pooled=False, **kwargs):
         """Opens a file from a given FS url
 
         If you intend to do a lot of file manipulation, it would likely be more
@@ -264,41 +374,57 @@ class OpenerRegistry(object):
 
         :param fs_url: a FS URL, e.g. ftp://ftp.mozilla.org/README
         :param mode: mode to open file file
+        :param pooled: if True, use a pooled filesystem (see `parse`)
         :rtype: a file
 
         """
 
         writeable = 'w' in mode or 'a' in mode or '+' in mode
-        fs, path = self.parse(fs_url, writeable=writeable)
+        fs, path = self.parse(fs_url, writeable=writeable, pooled=pooled)
         file_object = fs.open(path, mode)
 
         file_object = _FSClosingFile(fs, file_object, mode)
         #file_object.fs = fs
         return file_object
 
-    def getcontents(self, fs_url, mode='rb', encoding=None, errors=None, newline=None):
+    def getcontents(self, fs_url, mode='rb', encoding=None, errors=None, newline=None, pooled=False):
         """Gets the contents from a given FS url (if it references a file)
 
         :param fs_url: a FS URL e.g. ftp://ftp.mozilla.org/README
+        :param pooled: if True, use a pooled filesystem (see `parse`)
 
         """
-        fs, path = self.parse(fs_url)
-        return fs.getcontents(path, mode, encoding=encoding, errors=errors, newline=newline)
+        fs, path = self.parse(fs_url, pooled=pooled)
+        try:
+            return fs.getcontents(path, mode, encoding=encoding, errors=errors, newline=newline)
+        finally:
+            if pooled:
+                fs.close()
 
-    def opendir(self, fs_url, writeable=True, create_dir=False):
+    def opendir(self, fs_url, writeable=True, create_dir=False, pooled=False):
         """Opens an FS object from an FS URL
 
         :param fs_url: an FS URL e.g. ftp://ftp.mozilla.org
         :param writeable: set to True (the default) if the FS must be writeable
         :param create_dir: create the directory references by the FS URL, if
             it doesn't already exist
+        :param pooled: if True, filesystems that connect to a server are shared
+            with other URLs for the same server (see `parse`); the FS returned
+            should be closed when it's no longer needed
 
         """
-        fs, path = self.parse(fs_url, writeable=writeable, create_dir=create_dir)
+        fs, path = self.parse(fs_url, writeable=writeable, create_dir=create_dir, pooled=pooled)
         if path and '://' not in fs_url:
             # A shortcut to return an OSFS rather than a SubFS for os paths
+            from fs.osfs import OSFS
             return OSFS(fs_url)
         if path:
+            from fs.pool import PooledFS
+            if isinstance(fs, PooledFS):
+                try:
+                    return fs.opendir(path)
+                finally:
+                    fs.close()
             fs = fs.opendir(path)
         return fs
 
@@ -324,8 +450,26 @@ class Opener(object):
     two class attributes: names and desc. `names` is a list of protocols that
     list opener will opener. `desc` is an English description of the individual opener syntax.
 
+    Openers for filesystems that connect to a server may also define
+    `split_root` and `check_fs`, so that their filesystems can be shared in
+    pooled mode (see :py:mod:`fs.pool`).
+
     """
-    pass
+
+    @classmethod
+    def split_root(cls, fs_path):
+        """Splits the path part of a URL in to the URL of the root of a
+        filesystem (e.g. a server along with the credentials), and a path
+        within that filesystem. Returns None if the filesystems can't be
+        shared.
+
+        """
+        return None
+
+    @classmethod
+    def check_fs(cls, fs):
+        """Raises an exception if a shared filesystem can no longer be used."""
+        pass
 
 
 class OSFSOpener(Opener):
@@ -403,6 +547,7 @@ rpc://www.example.org (opens an RPC server on www.example.org, default port 80)"
 
     @classmethod
     def get_fs(cls, registry, fs_name, fs_name_params, fs_path, writeable, create_dir):
+        from urllib.parse import urlparse
         from fs.rpcfs import RPCFS
         _username, _password, fs_path = _parse_credentials(fs_path)
         if '://' not in fs_path:
@@ -428,6 +573,7 @@ examples:
 
     @classmethod
     def get_fs(cls, registry, fs_name, fs_name_params, fs_path, writeable, create_dir):
+        from urllib.parse import urlparse
         from fs.ftpfs import FTPFS
         username, password, fs_path = _parse_credentials(fs_path)
 
@@ -453,6 +599,15 @@ examples:
         else:
             return ftpfs, resourcepath
 
+    @classmethod
+    def split_root(cls, fs_path):
+        return _split_root(fs_path)
+
+    @classmethod
+    def check_fs(cls, fs):
+        with fs._lock:
+            fs.ftp.voidcmd('NOOP')
+
 
 class SFTPOpener(Opener):
     names = ['sftp']
@@ -508,6 +663,16 @@ examples:
 
         return sftpfs, resourcename
 
+    @classmethod
+    def split_root(cls, fs_path):
+        return _split_root(fs_path)
+
+    @classmethod
+    def check_fs(cls, fs):
+        if not fs._transport.is_active():
+            from fs.errors import RemoteConnectionError
+            raise RemoteConnectionError('check connection')
+
 
 class MemOpener(Opener):
     names = ['mem', 'ram']
@@ -592,6 +757,10 @@ class S3Opener(Opener):
 
         return fs, path
 
+    @classmethod
+    def split_root(cls, fs_path):
+        return _split_root(fs_path)
+
 
 class TahoeOpener(Opener):
     names = ['tahoe']
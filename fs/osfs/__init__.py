@@ -36,6 +36,7 @@ from fs.base import *
 from fs.path import *
 from fs.errors import *
 from fs import _thread_synchronize_default
+from fs.info import StatInfo
 
 from fs.osfs.xattrs import OSFSXAttrMixin
 from fs.osfs.watch import OSFSWatchMixin
@@ -280,6 +281,40 @@ class OSFS(OSFSXAttrMixin, OSFSWatchMixin, FS):
 
             return self._listdir_helper(path, paths, wildcard, full, absolute, False, False)
 
+    @convert_os_errors
+    def _listdir_partition(self, path):
+        if scandir is None:
+            return super(OSFS, self)._listdir_partition(path)
+        _decode_path = self._decode_path
+        dirs = []
+        files = []
+        for dir_entry in scandir(self.getsyspath(path)):
+            if dir_entry.is_dir():
+                dirs.append(_decode_path(dir_entry.name))
+            elif dir_entry.is_file():
+                files.append(_decode_path(dir_entry.name))
+        return dirs, files
+
+    @convert_os_errors
+    def _listdirinfo_partition(self, path):
+        if scandir is None:
+            return super(OSFS, self)._listdirinfo_partition(path)
+        _decode_path = self._decode_path
+        _stat_info = self._stat_info
+        dirs = []
+        files = []
+        for dir_entry in scandir(self.getsyspath(path)):
+            try:
+                if dir_entry.is_dir():
+                    dirs.append((_decode_path(dir_entry.name), _stat_info(dir_entry.stat())))
+                elif dir_entry.is_file():
+                    files.append((_decode_path(dir_entry.name), _stat_info(dir_entry.stat())))
+            except OSError as e:
+                # Could happen if the entry is deleted whilst we are listing
+                if e.errno != errno.ENOENT:
+                    raise
+        return dirs, files
+
     @convert_os_errors
     def makedir(self, path, recursive=False, allow_recreate=False):
         sys_path = self.getsyspath(path)
@@ -363,21 +398,13 @@ class OSFS(OSFSXAttrMixin, OSFSWatchMixin, FS):
 
     @convert_os_errors
     def getinfo(self, path):
-        stats = self._stat(path)
-        info = dict((k, getattr(stats, k)) for k in dir(stats) if k.startswith('st_'))
-        info['size'] = info['st_size']
-        #  TODO: this doesn't actually mean 'creation time' on unix
-        fromtimestamp = datetime.datetime.fromtimestamp
-        ct = info.get('st_ctime', None)
-        if ct is not None:
-            info['created_time'] = fromtimestamp(ct)
-        at = info.get('st_atime', None)
-        if at is not None:
-            info['accessed_time'] = fromtimestamp(at)
-        mt = info.get('st_mtime', None)
-        if mt is not None:
-            info['modified_time'] = fromtimestamp(mt)
-        return info
+        return self._stat_info(self._stat(path))
+
+    @classmethod
+    def _stat_info(cls, stats):
+        """Build an info mapping from a stat result."""
+        #  TODO: created_time (st_ctime) doesn't actually mean 'creation time' on unix
+        return StatInfo(stats)
 
     @convert_os_errors
     def getinfokeys(self, path, *keys):
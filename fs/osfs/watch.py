@@ -4,41 +4,85 @@ fs.osfs.watch
 
 Change watcher support for OSFS
 
+The native implementation (the win32 API, or pyinotify) is imported when a
+watcher is first added to an OSFS, rather than when :py:mod:`fs.osfs` is
+imported. At that point the OSFS object's class is replaced with a subclass
+that includes the native watcher mixin.
+
 """
 
-import os
 import sys
-import errno
 import threading
 
-from fs.errors import *
-from fs.path import *
-from fs.watch import *
+from fs.errors import UnsupportedError
 
-OSFSWatchMixin = None
+_backend_lock = threading.RLock()
+_backend = None
+_backend_loaded = False
+_watchable_classes = {}
+
+
+def _get_backend():
+    """Gets the native watcher mixin, or None if there isn't one."""
+    global _backend, _backend_loaded
+    with _backend_lock:
+        if not _backend_loaded:
+            #  Try using native implementation on win32
+            if sys.platform == "win32":
+                try:
+                    from fs.osfs.watch_win32 import OSFSWatchMixin as _backend
+                except ImportError:
+                    pass
+            #  Try using pyinotify if available
+            if _backend is None:
+                try:
+                    from fs.osfs.watch_inotify import OSFSWatchMixin as _backend
+                except ImportError:
+                    pass
+            _backend_loaded = True
+    return _backend
 
-#  Try using native implementation on win32
-if sys.platform == "win32":
-    try:
-        from fs.osfs.watch_win32 import OSFSWatchMixin
-    except ImportError:
-        pass
 
-#  Try using pyinotify if available
-if OSFSWatchMixin is None:
+def _new_instance(cls):
+    return cls.__new__(cls)
+
+
+def _watchable_class(cls, backend):
+    """Gets a subclass of cls that includes the native watcher mixin."""
     try:
-        from fs.osfs.watch_inotify import OSFSWatchMixin
-    except ImportError:
-        pass
-
-#  Fall back to raising UnsupportedError
-if OSFSWatchMixin is None:
-    class OSFSWatchMixin(object):
-        def __init__(self, *args, **kwargs):
-            super(OSFSWatchMixin, self).__init__(*args, **kwargs)
-        def add_watcher(self,*args,**kwds):
-            raise UnsupportedError
-        def del_watcher(self,watcher_or_callback):
-            raise UnsupportedError
+        return _watchable_classes[cls]
+    except KeyError:
+        def __reduce_ex__(self, protocol):
+            #  Pickle as the original class, which loads the backend again if needed
+            reduced = super(watchable_cls, self).__reduce_ex__(protocol)
+            return (_new_instance, (cls,)) + tuple(reduced[2:])
+        watchable_cls = type(cls.__name__, (backend, cls), {'__module__': cls.__module__,
+                                                           '__reduce_ex__': __reduce_ex__})
+        _watchable_classes[cls] = watchable_cls
+        return watchable_cls
+
+
+class OSFSWatchMixin(object):
+    """Mixin providing change-watcher support, loading the native
+    implementation when the first watcher is added.
+
+    If there's no native implementation, the methods raise
+    :py:class:`~fs.errors.UnsupportedError`.
 
+    """
 
+    def add_watcher(self, callback, path="/", events=None, recursive=True):
+        backend = _get_backend()
+        if backend is None:
+            raise UnsupportedError
+        from fs.path import PathMap
+        with _backend_lock:
+            if not isinstance(self, backend):
+                self._watchers = PathMap()
+                self.__class__ = _watchable_class(self.__class__, backend)
+        return self.add_watcher(callback, path, events, recursive)
+
+    def del_watcher(self, watcher_or_callback):
+        if _get_backend() is None:
+            raise UnsupportedError
+        #  No watchers have been added
@@ -199,6 +199,11 @@ class RemoteFileBuffer(FileWrapper):
                 data = None
             return data
 
+    def _readinto(self, buffer):
+        with self._lock:
+            self._fillbuffer(len(buffer))
+            return self.wrapped_file.readinto(buffer) or 0
+
     def _seek(self,offset,whence=SEEK_SET):
         with self._lock:
             if not self._eof:
@@ -26,9 +26,11 @@ from fs.path import *
 from fs.errors import *
 from fs.remote import *
 from fs.filelike import LimitBytesFile
+from fs.glob import compile_glob
 from fs import iotools
 
 import six
+from six import b
 
 # Boto is not thread-safe, so we need to use a per-thread S3 connection.
 if hasattr(threading,"local"):
@@ -223,7 +225,9 @@ class S3FS(FS):
         """Synchronously set the contents of a key."""
         if isinstance(key,str):
             key = self._s3bukt.new_key(key)
-        if isinstance(contents,str):
+        if isinstance(contents,(bytearray,memoryview)):
+            contents = iotools.make_bytes_io(contents)
+        if isinstance(contents,(six.text_type,six.binary_type)):
             key.set_contents_from_string(contents)
         elif hasattr(contents,"md5"):
             hexmd5 = contents.md5
@@ -311,6 +315,45 @@ class S3FS(FS):
         #  This will take care of closing the socket when it's done.
         return RemoteFileBuffer(self,path,mode,f)
 
+    def getrange(self,path,offset,length=None):
+        """Read a range of bytes from a file, with a HTTP Range request."""
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        s3path = self._s3path(path)
+        k = self._s3bukt.get_key(s3path)
+        if k is None:
+            if self.isdir(path):
+                raise ResourceInvalidError(path)
+            raise ResourceNotFoundError(path)
+        if length == 0 or offset >= k.size:
+            return b("")
+        if length is None:
+            byte_range = "bytes=%d-" % (offset,)
+        else:
+            byte_range = "bytes=%d-%d" % (offset,offset+length-1,)
+        return k.get_contents_as_string(headers={"Range":byte_range})
+
+    def gethash(self,path,algorithm='md5',chunk_size=64*1024):
+        """Get a hash of the contents of a file.
+
+        The ETag of an object uploaded in a single part (and not encrypted with
+        a KMS key) is the MD5 hash of its contents, so MD5 hashes are got
+        without downloading the object where possible.
+        """
+        if algorithm == 'md5':
+            k = self._s3bukt.get_key(self._s3path(path))
+            if k is None:
+                if self.isdir(path):
+                    raise ResourceInvalidError(path)
+                raise ResourceNotFoundError(path)
+            etag = k.etag or ""
+            if isinstance(etag,bytes):
+                etag = etag.decode("utf8")
+            etag = etag.strip('"').strip("'")
+            if len(etag) == 32 and "-" not in etag and getattr(k,"encrypted",None) != "aws:kms":
+                return etag.lower()
+        return super(S3FS,self).gethash(path,algorithm,chunk_size)
+
     def exists(self,path):
         """Check whether a path exists."""
         s3path = self._s3path(path)
@@ -411,6 +454,58 @@ class S3FS(FS):
                     raise ResourceInvalidError(path,msg=msg)
                 raise ResourceNotFoundError(path)
 
+    def _listdir_partition(self, path):
+        dirs = []
+        files = []
+        for (name, k) in self._iter_keys(path):
+            if self._key_is_dir(k):
+                dirs.append(name)
+            else:
+                files.append(name)
+        return dirs, files
+
+    def _listdirinfo_partition(self, path):
+        dirs = []
+        files = []
+        for (name, k) in self._iter_keys(path):
+            if self._key_is_dir(k):
+                dirs.append((name, self._get_key_info(k, name)))
+            else:
+                files.append((name, self._get_key_info(k, name)))
+        return dirs, files
+
+    def iglob(self,pattern):
+        """Generator version of glob.
+
+        Patterns that can match at any depth (with ``**``) are matched against
+        a single listing of the keys that start with the pattern's literal
+        prefix, rather than listing each directory in turn.
+        """
+        glob = compile_glob(pattern)
+        if not glob.recursive:
+            return super(S3FS,self).iglob(pattern)
+        return self._iglob_keys(glob)
+
+    def _iglob_keys(self,glob):
+        sep = self._separator
+        s3prefix = self._prefix + relpath(glob.prefix).replace("/",sep)
+        seen_dirs = set()
+        for k in self._s3bukt.list(prefix=s3prefix):
+            name = k.name
+            if not isinstance(name,str):
+                name = name.decode("utf8")
+            name = name[len(self._prefix):]
+            is_dir = name.endswith(sep)
+            path = abspath(name.rstrip(sep).replace(sep,"/"))
+            #  Directories are implied by the keys inside them
+            for dir_path in recursepath(dirname(path))[1:] + ([path] if is_dir else []):
+                if dir_path not in seen_dirs:
+                    seen_dirs.add(dir_path)
+                    if glob.match(dir_path):
+                        yield dir_path
+            if not is_dir and not glob.dirs_only and glob.match(path):
+                yield path
+
     def _key_is_dir(self, k):
         if isinstance(k,Prefix):
             return True
@@ -580,8 +675,8 @@ class S3FS(FS):
             info['size'] = int(key.size)
         etag = getattr(key,"etag",None)
         if etag is not None:
-            if isinstance(etag,str):
-               etag = etag.encode("utf8")
+            if isinstance(etag,bytes):
+               etag = etag.decode("utf8")
             info['etag'] = etag.strip('"').strip("'")
         if hasattr(key,"last_modified"):
             # TODO: does S3 use any other formats?
@@ -685,8 +780,8 @@ class S3FS(FS):
               ignore_errors=False ):
         if search != "breadth" or dir_wildcard is not None:
             args = (wildcard,dir_wildcard,search,ignore_errors)
-            for item in super(S3FS,self).walkfiles(path,*args):
-                yield (item,self.getinfo(item))
+            for item in super(S3FS,self).walkinfo(path,*args):
+                yield item
         else:
             prefix = self._s3path(path)
             for k in self._s3bukt.list(prefix=prefix):
@@ -712,8 +807,8 @@ class S3FS(FS):
               ignore_errors=False ):
         if search != "breadth" or dir_wildcard is not None:
             args = (wildcard,dir_wildcard,search,ignore_errors)
-            for item in super(S3FS,self).walkfiles(path,*args):
-                yield (item,self.getinfo(item))
+            for item in super(S3FS,self).walkfilesinfo(path,*args):
+                yield item
         else:
             prefix = self._s3path(path)
             for k in self._s3bukt.list(prefix=prefix):
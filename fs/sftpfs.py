@@ -8,19 +8,21 @@ Filesystem accessing an SFTP server (via paramiko)
 
 """
 
-import datetime
 import stat as statinfo
 import threading
 import os
 import paramiko
 from getpass import getuser
 import errno
+import binascii
 
 from fs.base import *
+from fs.base import _coalesce_ranges
 from fs.path import *
 from fs.errors import *
 from fs.utils import isdir, isfile
 from fs import iotools
+from fs.info import StatInfo
 
 
 ENOENT = errno.ENOENT
@@ -56,6 +58,14 @@ if not hasattr(paramiko.SFTPFile, "__enter__"):
     paramiko.SFTPFile.__exit__ = lambda self,et,ev,tb: self.close() and False
 
 
+class SFTPInfo(StatInfo):
+    """Info for a :py:class:`paramiko.SFTPAttributes` object."""
+
+    __slots__ = ()
+
+    _stat_fields = frozenset('st_size st_uid st_gid st_mode st_atime st_mtime'.split())
+
+
 class SFTPFS(FS):
     """A filesystem stored on a remote SFTP server.
 
@@ -441,14 +451,11 @@ class SFTPFS(FS):
 
         return self._listdir_helper(path, paths, wildcard, full, absolute, False, False)
 
-    @synchronize
-    @convert_os_errors
-    def listdirinfo(self,path="./",wildcard=None,full=False,absolute=False,dirs_only=False,files_only=False):
+    def _listdir_attr(self, path):
+        """List a directory with a single LIST request, returning SFTPAttributes."""
         npath = self._normpath(path)
         try:
-            attrs = self.client.listdir_attr(npath)
-            attrs_map = dict((a.filename, a) for a in attrs)
-            paths = list(attrs_map.keys())
+            return self.client.listdir_attr(npath)
         except IOError as e:
             if getattr(e,"errno",None) == ENOENT:
                 if self.isfile(path):
@@ -458,6 +465,13 @@ class SFTPFS(FS):
                 raise ResourceInvalidError(path,msg="Can't list directory contents of a file: %(path)s")
             raise
 
+    @synchronize
+    @convert_os_errors
+    def listdirinfo(self,path="./",wildcard=None,full=False,absolute=False,dirs_only=False,files_only=False):
+        attrs = self._listdir_attr(path)
+        attrs_map = dict((a.filename, a) for a in attrs)
+        paths = list(attrs_map.keys())
+
         if dirs_only:
             filter_paths = []
             for path, attr in attrs_map.items():
@@ -480,11 +494,42 @@ class SFTPFS(FS):
             info = attrs_map.get(resourcename)
             if info is None:
                 return self.getinfo(pathjoin(path, p))
-            return self._extract_info(info.__dict__)
+            return self._extract_info(info)
 
         return [(p, getinfo(p)) for p in
                     self._listdir_helper(path, paths, wildcard, full, absolute, False, False)]
 
+    @synchronize
+    @convert_os_errors
+    def _listdir_partition(self, path):
+        dirs = []
+        files = []
+        for attr in self._listdir_attr(path):
+            name = attr.filename
+            if not isinstance(name, str):
+                name = name.decode(self.encoding)
+            if isdir(self, pathjoin(path, name), attr.__dict__):
+                dirs.append(name)
+            else:
+                files.append(name)
+        return dirs, files
+
+    @synchronize
+    @convert_os_errors
+    def _listdirinfo_partition(self, path):
+        dirs = []
+        files = []
+        for attr in self._listdir_attr(path):
+            name = attr.filename
+            if not isinstance(name, str):
+                name = name.decode(self.encoding)
+            info = self._extract_info(attr)
+            if isdir(self, pathjoin(path, name), info):
+                dirs.append((name, info))
+            else:
+                files.append((name, info))
+        return dirs, files
+
     @synchronize
     @convert_os_errors
     def makedir(self,path,recursive=False,allow_recreate=False):
@@ -608,40 +653,81 @@ class SFTPFS(FS):
                 raise ParentDirectoryMissingError(dst,msg="Destination directory does not exist: %(path)s")
             raise
 
-    _info_vars = frozenset('st_size st_uid st_gid st_mode st_atime st_mtime'.split())
     @classmethod
-    def _extract_info(cls, stats):
-        fromtimestamp = datetime.datetime.fromtimestamp
-        info = dict((k, v) for k, v in stats.items() if k in cls._info_vars and not k.startswith('_'))
-        info['size'] = info['st_size']
-        ct = info.get('st_ctime')
-        if ct is not None:
-            info['created_time'] = fromtimestamp(ct)
-        at = info.get('st_atime')
-        if at is not None:
-            info['accessed_time'] = fromtimestamp(at)
-        mt = info.get('st_mtime')
-        if mt is not None:
-            info['modified_time'] = fromtimestamp(mt)
-        return info
+    def _extract_info(cls, attr):
+        """Build an info mapping from an SFTPAttributes object."""
+        return SFTPInfo(attr)
 
     @synchronize
     @convert_os_errors
     def getinfo(self, path):
         npath = self._normpath(path)
-        stats = self.client.stat(npath)
-        info = dict((k, getattr(stats, k)) for k in dir(stats) if not k.startswith('_'))
-        info['size'] = info['st_size']
-        ct = info.get('st_ctime', None)
-        if ct is not None:
-            info['created_time'] = datetime.datetime.fromtimestamp(ct)
-        at = info.get('st_atime', None)
-        if at is not None:
-            info['accessed_time'] = datetime.datetime.fromtimestamp(at)
-        mt = info.get('st_mtime', None)
-        if mt is not None:
-            info['modified_time'] = datetime.datetime.fromtimestamp(mt)
-        return info
+        return self._extract_info(self.client.stat(npath))
+
+    def getrange(self, path, offset, length=None):
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        if length is None:
+            length = max(self.getsize(path) - offset, 0)
+        return self.getranges(path, [(offset, length)])[0]
+
+    @synchronize
+    @convert_os_errors
+    def getranges(self, path, ranges):
+        #  Request every run of bytes at once with readv, which pipelines
+        #  the reads rather than waiting for each one in turn
+        npath = self._normpath(path)
+        ranges = list(ranges)
+        results = [b''] * len(ranges)
+        spans = _coalesce_ranges(ranges)
+        if self.isdir(path):
+            raise ResourceInvalidError(path)
+        f = self.client.open(npath, 'rb')
+        try:
+            size = f.stat().st_size
+            chunks = [(offset, min(length, size - offset))
+                      for offset, length, _members in spans if offset < size]
+            span_data = list(f.readv(chunks)) if chunks else []
+        finally:
+            f.close()
+        for (span_offset, _span_length, members), data in zip(spans, span_data):
+            for index, offset, length in members:
+                start = offset - span_offset
+                results[index] = data[start:start + length]
+        return results
+
+    #  Hash algorithms the draft "check-file" extension defines
+    _check_file_algorithms = frozenset(('md5', 'sha1', 'sha224', 'sha256', 'sha384', 'sha512', 'crc32'))
+    #  True or False once it's known whether the server supports check-file
+    _check_file = None
+
+    def gethash(self, path, algorithm='md5', chunk_size=64*1024):
+        #  Servers that support the check-file extension hash the file
+        #  themselves, so it doesn't have to be downloaded
+        if algorithm in self._check_file_algorithms and self._check_file is not False:
+            digest = self._check_file_hash(path, algorithm)
+            if digest is not None:
+                return digest
+        return super(SFTPFS, self).gethash(path, algorithm, chunk_size)
+
+    @synchronize
+    @convert_os_errors
+    def _check_file_hash(self, path, algorithm):
+        npath = self._normpath(path)
+        if self.isdir(path):
+            raise ResourceInvalidError(path)
+        f = self.client.open(npath, 'rb')
+        try:
+            try:
+                digest = f.check(algorithm)
+            except IOError:
+                #  Not supported by the server (OpenSSH doesn't)
+                self._check_file = False
+                return None
+        finally:
+            f.close()
+        self._check_file = True
+        return binascii.hexlify(digest).decode('ascii')
 
     @synchronize
     @convert_os_errors
@@ -18,6 +18,7 @@ from fs.path import *
 from fs.errors import *
 from fs.filelike import StringIO
 
+import array
 import datetime
 import unittest
 import os
@@ -25,6 +26,8 @@ import os.path
 import pickle
 import random
 import copy
+import zlib
+import hashlib
 
 import time
 try:
@@ -178,6 +181,44 @@ class FSTestCases(object):
             "hello", "rb"), b("to you, good sir!"))
         self.fs.setcontents("hello", b(""))
         self.assertEqual(self.fs.getcontents("hello", "rb"), b(""))
+        #  setcontents() should accept bytes-like objects
+        self.fs.setcontents("hello", bytearray(b("bytearray")))
+        self.assertEqual(self.fs.getcontents("hello", "rb"), b("bytearray"))
+        view = memoryview(array.array("H", [1, 2, 3]))
+        self.fs.setcontents("hello", view)
+        self.assertEqual(self.fs.getcontents("hello", "rb"), view.tobytes())
+
+    def test_getrange(self):
+        self.fs.setcontents("a", b("0123456789"))
+        self.assertEqual(self.fs.getrange("a", 0, 3), b("012"))
+        self.assertEqual(self.fs.getrange("a", 4, 2), b("45"))
+        self.assertEqual(self.fs.getrange("a", 7), b("789"))
+        self.assertEqual(self.fs.getrange("a", 8, 100), b("89"))
+        self.assertEqual(self.fs.getrange("a", 20, 5), b(""))
+        self.assertEqual(self.fs.getrange("a", 3, 0), b(""))
+        self.assertRaises(ResourceNotFoundError, self.fs.getrange, "b", 0, 1)
+        self.assertRaises(ValueError, self.fs.getrange, "a", -3)
+        self.assertRaises(ValueError, self.fs.getrange, "a", 0, -1)
+
+    def test_getranges(self):
+        self.fs.setcontents("a", b("0123456789"))
+        ranges = [(6, 2), (0, 3), (2, 3), (5, 1), (9, 5), (20, 1), (4, 0)]
+        self.assertEqual(self.fs.getranges("a", ranges),
+                         [b("67"), b("012"), b("234"), b("5"), b("9"), b(""), b("")])
+        self.assertEqual(self.fs.getranges("a", []), [])
+        self.assertRaises(ValueError, self.fs.getranges, "a", [(-1, 2)])
+
+    def test_gethash(self):
+        data = b("0123456789") * 10000
+        self.fs.setcontents("a", data)
+        self.assertEqual(self.fs.gethash("a"), hashlib.md5(data).hexdigest())
+        self.assertEqual(self.fs.gethash("a", "sha256"), hashlib.sha256(data).hexdigest())
+        self.assertEqual(self.fs.gethash("a", "crc32"), "%08x" % (zlib.crc32(data) & 0xffffffff))
+        self.assertEqual(self.fs.gethash("a", "sha1", chunk_size=7), hashlib.sha1(data).hexdigest())
+        self.fs.setcontents("empty", b(""))
+        self.assertEqual(self.fs.gethash("empty"), hashlib.md5(b("")).hexdigest())
+        self.assertRaises(ValueError, self.fs.gethash, "a", "nosuchhash")
+        self.assertRaises(ResourceNotFoundError, self.fs.gethash, "b")
 
     def test_setcontents_async(self):
         #  setcontents() should accept both a string...
@@ -195,6 +236,21 @@ class FSTestCases(object):
         self.assertEqual(self.fs.getcontents(
             "hello", "rb"), b("to you, good sir!"))
 
+    def test_async_futures(self):
+        self.assertEqual(self.fs.setcontents_async("a", b("12345")).result(), 5)
+        self.assertEqual(self.fs.getcontents_async("a").result(), b("12345"))
+        self.fs.copy_async("a", "b").result()
+        self.assertEqual(self.fs.getcontents("b", "rb"), b("12345"))
+        self.assertRaises(DestinationExistsError, self.fs.copy_async("a", "b").result)
+        self.fs.remove_async("a").result()
+        self.assertFalse(self.fs.exists("a"))
+        self.assertRaises(ResourceNotFoundError, self.fs.getcontents_async("a").result)
+        errors = []
+        future = self.fs.setcontents_async("missing/c", b("c"), error_callback=errors.append)
+        self.assertTrue(future.wait())
+        self.assertTrue(isinstance(future.exception(), FSError))
+        self.assertEqual(errors, [future.exception()])
+
     def test_isdir_isfile(self):
         self.assertFalse(self.fs.exists("dir1"))
         self.assertFalse(self.fs.isdir("dir1"))
@@ -404,6 +460,96 @@ class FSTestCases(object):
         self.assertEqual(sorted(self.fs.walkdirs(
             wildcard="*foo*")), ["/", "/foo", "/foo/baz"])
 
+    def test_walk_search_order(self):
+        self.fs.makedir('foo/bar/baz', recursive=True)
+        self.fs.setcontents('foo/a', b('a'))
+        self.fs.setcontents('foo/bar/b', b('b'))
+        self.fs.setcontents('foo/bar/baz/c', b('c'))
+        breadth = [d for d, _files in self.fs.walk(search="breadth")]
+        self.assertEqual(breadth, ["/", "/foo", "/foo/bar", "/foo/bar/baz"])
+        depth = [d for d, _files in self.fs.walk(search="depth")]
+        self.assertEqual(depth, ["/foo/bar/baz", "/foo/bar", "/foo", "/"])
+        self.assertEqual(sorted(self.fs.walkfiles(search="depth")),
+                         ["/foo/a", "/foo/bar/b", "/foo/bar/baz/c"])
+        self.assertRaises(ValueError, list, self.fs.walk(search="sideways"))
+        self.assertRaises(ResourceNotFoundError, list, self.fs.walk("zebra"))
+
+    def test_walkinfo(self):
+        self.fs.makeopendir('bar').setcontents('a.txt', b('123'))
+        self.fs.makeopendir('foo').makeopendir(
+            "baz").setcontents('b', b('12345'))
+        walked = dict(self.fs.walkinfo())
+        self.assertEqual(sorted(walked.keys()), [
+                         "/bar", "/bar/a.txt", "/foo", "/foo/baz", "/foo/baz/b"])
+        self.assertEqual(walked["/bar/a.txt"]["size"], 3)
+        self.assertEqual(walked["/foo/baz/b"]["size"], 5)
+        self.assertEqual(sorted(p for p, _info in self.fs.walkinfo(search="depth")),
+                         sorted(walked.keys()))
+        self.assertEqual(sorted(p for p, _info in self.fs.walkinfo(wildcard="*.txt")),
+                         ["/bar", "/bar/a.txt", "/foo", "/foo/baz"])
+
+    def test_walkfilesinfo(self):
+        self.fs.makeopendir('bar').setcontents('a.txt', b('123'))
+        self.fs.makeopendir('foo').setcontents('b', b('12345'))
+        walked = sorted(self.fs.walkfilesinfo())
+        self.assertEqual([p for p, _info in walked], ["/bar/a.txt", "/foo/b"])
+        self.assertEqual([info["size"] for _p, info in walked], [3, 5])
+        self.assertEqual([p for p, _info in self.fs.walkfilesinfo(wildcard="*.txt")],
+                         ["/bar/a.txt"])
+        self.assertEqual([p for p, _info in self.fs.walkfilesinfo(dir_wildcard="*foo*")],
+                         ["/foo/b"])
+
+    def test_getinfo_many(self):
+        self.fs.makeopendir('foo').setcontents('a', b('123'))
+        self.fs.setcontents('foo/b', b('12345'))
+        self.fs.makedir('foo/sub')
+        self.fs.setcontents('c', b(''))
+        paths = ['foo/a', 'foo/b', 'foo/sub', 'foo/missing',
+                 'c', 'bar/missing', 'c/missing', '/']
+        infos = self.fs.getinfo_many(paths)
+        self.assertEqual(sorted(infos.keys()), sorted(paths))
+        self.assertEqual(infos['foo/a']['size'], 3)
+        self.assertEqual(infos['foo/b']['size'], 5)
+        for path in ('foo/missing', 'bar/missing', 'c/missing'):
+            self.assertTrue(infos[path] is None)
+        self.assertEqual(self.fs.exists_many(paths), dict(
+            (path, self.fs.exists(path)) for path in paths))
+        self.assertEqual(self.fs.isdir_many(paths), dict(
+            (path, self.fs.isdir(path)) for path in paths))
+
+    def test_listdir_partition(self):
+        self.fs.makedir('foo/bar', recursive=True)
+        self.fs.setcontents('foo/a.txt', b('hello'))
+        self.fs.setcontents('foo/b.txt', b('world'))
+        dirs, files = self.fs._listdir_partition('foo')
+        self.assertEqual(sorted(dirs), ["bar"])
+        self.assertEqual(sorted(files), ["a.txt", "b.txt"])
+        self.assertEqual(self.fs._listdir_partition('foo/bar'), ([], []))
+        self.assertRaises(ResourceNotFoundError, self.fs._listdir_partition, "zebra")
+        self.assertRaises(ResourceInvalidError, self.fs._listdir_partition, "foo/a.txt")
+
+    def test_glob(self):
+        self.fs.makedir('src/fs/tests', recursive=True)
+        self.fs.makedir('src/docs')
+        self.fs.setcontents('src/setup.py', b('setup'))
+        self.fs.setcontents('src/fs/base.py', b('base'))
+        self.fs.setcontents('src/fs/tests/test_base.py', b('test'))
+        self.fs.setcontents('src/docs/index.rst', b('docs'))
+        self.assertEqual(sorted(self.fs.glob('src/*.py')), ['/src/setup.py'])
+        self.assertEqual(sorted(self.fs.glob('src/**/*.py')),
+                         ['/src/fs/base.py', '/src/fs/tests/test_base.py', '/src/setup.py'])
+        self.assertEqual(sorted(self.fs.glob('/src/*/')), ['/src/docs', '/src/fs'])
+        self.assertEqual(sorted(self.fs.glob('src/{docs,fs/tests}/*')),
+                         ['/src/docs/index.rst', '/src/fs/tests/test_base.py'])
+        self.assertEqual(sorted(self.fs.glob('src/**')),
+                         ['/src/docs', '/src/docs/index.rst', '/src/fs', '/src/fs/base.py',
+                          '/src/fs/tests', '/src/fs/tests/test_base.py', '/src/setup.py'])
+        self.assertEqual(self.fs.glob('src/setup.py'), ['/src/setup.py'])
+        self.assertEqual(self.fs.glob('src/setup.py/'), [])
+        self.assertEqual(self.fs.glob('src/*.txt'), [])
+        self.assertEqual(self.fs.glob('nosuchdir/**/*.py'), [])
+        self.assertEqual(sorted(self.fs.iglob('src/fs/*')), ['/src/fs/base.py', '/src/fs/tests'])
+
     def test_unicode(self):
         alpha = "\N{GREEK SMALL LETTER ALPHA}"
         beta = "\N{GREEK SMALL LETTER BETA}"
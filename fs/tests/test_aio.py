@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import unittest
+
+from fs.aio import AsyncFS
+from fs.memoryfs import MemoryFS
+from fs.tempfs import TempFS
+from fs.errors import ResourceNotFoundError
+from fs.filelike import StringIO
+
+from six import b
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestAsyncFS(unittest.TestCase):
+
+    def make_fs(self):
+        return MemoryFS()
+
+    def setUp(self):
+        self.fs = self.make_fs()
+        self.afs = AsyncFS(self.fs, chunk_size=4)
+
+    def tearDown(self):
+        run(self.afs.close())
+
+    def test_contents(self):
+        async def test():
+            self.assertEqual(await self.afs.setcontents("a", b("hello world")), 11)
+            self.assertEqual(await self.afs.getcontents("a"), b("hello world"))
+            await self.afs.setcontents("b", StringIO(b("from a file")))
+            self.assertEqual(await self.afs.getcontents("b"), b("from a file"))
+            await self.afs.setcontents("c", u"text")
+            self.assertEqual(await self.afs.getcontents("c", "rt"), u"text")
+            with self.assertRaises(ResourceNotFoundError):
+                await self.afs.getcontents("missing")
+        run(test())
+
+    def test_file(self):
+        async def test():
+            async with await self.afs.open("f", "wb") as f:
+                await f.write(b("0123456789"))
+            async with await self.afs.open("f", "rb") as f:
+                self.assertEqual(await f.read(3), b("012"))
+                await f.seek(5)
+                self.assertEqual(await f.tell(), 5)
+                chunks = [chunk async for chunk in f.chunks()]
+                self.assertEqual(chunks, [b("5678"), b("9")])
+            self.assertTrue(f.closed)
+        run(test())
+
+    def test_directories(self):
+        async def test():
+            await self.afs.makedir("foo/bar", recursive=True)
+            await self.afs.setcontents("foo/bar/baz.txt", b("baz"))
+            self.assertEqual(await self.afs.listdir("foo"), ["bar"])
+            self.assertTrue(await self.afs.isdir("foo/bar"))
+            self.assertTrue(await self.afs.isfile("foo/bar/baz.txt"))
+            self.assertEqual((await self.afs.getinfo("foo/bar/baz.txt"))["size"], 3)
+            walked = [item async for item in self.afs.walk()]
+            self.assertEqual(walked, list(self.fs.walk()))
+            files = [path async for path in self.afs.walkfiles(wildcard="*.txt")]
+            self.assertEqual(files, ["/foo/bar/baz.txt"])
+            await self.afs.copy("foo/bar/baz.txt", "copy.txt")
+            await self.afs.remove("foo/bar/baz.txt")
+            self.assertFalse(await self.afs.exists("foo/bar/baz.txt"))
+            self.assertEqual(self.fs.getcontents("copy.txt"), b("baz"))
+        run(test())
+
+    def test_timeout(self):
+        release = threading.Event()
+
+        async def test():
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.afs._call(release.wait, timeout=0.05)
+            release.set()
+        run(test())
+
+    def test_walk_timeout(self):
+        self.fs.makedir("foo/bar", recursive=True)
+        release = threading.Event()
+        walk = self.fs.walk
+
+        def slow_walk(*args, **kwargs):
+            for item in walk(*args, **kwargs):
+                release.wait()
+                yield item
+        self.fs.walk = slow_walk
+
+        async def test():
+            walker = self.afs.walk(timeout=0.05)
+            with self.assertRaises(asyncio.TimeoutError):
+                await walker.__anext__()
+            with self.assertRaises(asyncio.TimeoutError):
+                await walker.__anext__()
+            release.set()
+            #  The step that timed out is carried on, rather than run again
+            walked = [item async for item in walker]
+            self.assertEqual(walked, list(walk()))
+            await walker.aclose()
+        try:
+            run(test())
+        finally:
+            release.set()
+
+    def test_workers(self):
+        self.assertEqual(self.afs.workers, 8)
+        self.fs._meta = dict(self.fs._meta, thread_safe=False)
+        afs = AsyncFS(self.fs)
+        self.assertEqual(afs.workers, 1)
+        run(afs.close())
+
+
+class TestAsyncFS_TempFS(TestAsyncFS):
+
+    def make_fs(self):
+        return TempFS()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+
+  fs.tests.test_benchmarks:  testcases for the fs.benchmarks suite
+
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from fs.benchmarks import suite, importtime, memory
+
+
+class TestSuite(unittest.TestCase):
+
+    def test_run_suite(self):
+        results = suite.run_suite(["memoryfs", "readonlyfs"], scale="quick", out=None)
+        #  The results must survive a round trip through JSON
+        results = json.loads(json.dumps(results))
+        self.assertEqual(results["scale"], "quick")
+        memory_results = results["results"]["memoryfs"]
+        self.assertEqual(sorted(memory_results), sorted(workload[0] for workload in suite.WORKLOADS))
+        for result in memory_results.values():
+            self.assertTrue(result["seconds"] >= 0)
+        self.assertTrue("skipped" in results["results"]["readonlyfs"]["small_write"])
+        self.assertTrue("seconds" in results["results"]["readonlyfs"]["small_read"])
+
+    def test_work_checked(self):
+        #  HTTPFS can't list directories, so walking the tree does nothing
+        results = suite.run_suite(["httpfs"], ["small_read", "walk"], scale="quick", out=None)
+        httpfs_results = results["results"]["httpfs"]
+        self.assertTrue("seconds" in httpfs_results["small_read"])
+        self.assertTrue("WorkloadNotDone" in httpfs_results["walk"]["error"])
+
+    def test_stored_baseline(self):
+        with open(suite.BASELINE) as f:
+            baseline = json.load(f)
+        self.assertEqual(baseline["scale_settings"], suite.SCALES["quick"])
+        self.assertEqual(suite.compare(baseline, baseline), [])
+
+    def test_compare(self):
+        def make_results(**timings):
+            workloads = {}
+            for name, seconds in timings.items():
+                workloads[name] = {"seconds": seconds} if seconds is not None else {"error": "failed"}
+            return {"scale_settings": suite.SCALES["quick"], "results": {"memoryfs": workloads}}
+
+        baseline = make_results(walk=1.0, copydir=1.0, movedir=1.0, listdirinfo=0.0001)
+        results = make_results(walk=1.1, copydir=2.0, movedir=None, listdirinfo=0.0005)
+        self.assertEqual(suite.compare(results, baseline),
+                         [("memoryfs", "copydir", 1.0, 2.0),
+                          ("memoryfs", "movedir", 1.0, None)])
+        self.assertEqual(suite.compare(baseline, baseline), [])
+
+        other_scale = dict(baseline, scale_settings=suite.SCALES["standard"])
+        self.assertRaises(ValueError, suite.compare, results, other_scale)
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_opener_imports(self):
+        results = importtime.run(["fs.opener"], repeat=1, out=None)
+        self.assertTrue(results["fs.opener"]["seconds"] > 0)
+        imports = results["fs.opener"]["imports"]
+        self.assertTrue("fs.opener" in imports)
+        #  Filesystems are imported by the openers that use them
+        for module in ("fs.base", "fs.osfs", "fs.watch"):
+            self.assertFalse(module in imports, module)
+
+    def test_osfs_imports(self):
+        imports = importtime.run(["fs.osfs"], repeat=1, out=None)["fs.osfs"]["imports"]
+        #  The change watcher implementation is imported when a watcher is added
+        self.assertFalse("fs.watch" in imports)
+        self.assertFalse("fs.osfs.watch_inotify" in imports)
+
+    def test_import_error(self):
+        self.assertRaises(ImportError, importtime.import_profile, "fs.nosuchmodule")
+
+    def test_other_directory(self):
+        cwd = os.getcwd()
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            os.chdir(tmp_dir)
+            self.assertTrue("fs.opener" in importtime.import_profile("fs.opener"))
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(tmp_dir)
+
+    def test_suite_import_error(self):
+        modules = importtime.MODULES
+        importtime.MODULES = ["fs.nosuchmodule"]
+        try:
+            results = suite.run_suite(["memoryfs", "imports"], scale="quick", out=None)
+        finally:
+            importtime.MODULES = modules
+        self.assertTrue("skipped" in results["results"]["imports"])
+        self.assertTrue("walk" in results["results"]["memoryfs"])
+
+
+class TestMemory(unittest.TestCase):
+
+    def test_measure(self):
+        result = memory.measure(files=1000, size=16, files_per_dir=100)
+        self.assertEqual(result["entries"], 1010)
+        self.assertTrue(result["bytes"] > 0)
+        #  A small file entry took over 800 bytes when files were StringIO objects
+        self.assertTrue(result["bytes_per_entry"] < 600, result)
@@ -0,0 +1,61 @@
+import threading
+import unittest
+
+from fs.executor import BoundedExecutor, FSFuture
+from fs.memoryfs import MemoryFS
+
+from six import b
+
+
+class TestBoundedExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = BoundedExecutor(max_workers=2, max_queued=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_result(self):
+        future = self.executor.submit(lambda a, b: a + b, 1, b=2)
+        self.assertTrue(isinstance(future, FSFuture))
+        self.assertEqual(future.result(), 3)
+        self.assertTrue(future.wait())
+        self.assertTrue(future.is_set())
+
+    def test_exception(self):
+        def fail():
+            raise ValueError("fail")
+        future = self.executor.submit(fail)
+        self.assertRaises(ValueError, future.result)
+
+    def test_backpressure(self):
+        release = threading.Event()
+        futures = [self.executor.submit(release.wait) for _ in range(3)]
+        submitted = threading.Event()
+
+        def submit_another():
+            futures.append(self.executor.submit(lambda: None))
+            submitted.set()
+
+        thread = threading.Thread(target=submit_another)
+        thread.start()
+        #  Two running and one queued, so the fourth must wait
+        self.assertFalse(submitted.wait(0.2))
+        release.set()
+        self.assertTrue(submitted.wait(5))
+        thread.join()
+        for future in futures:
+            future.result(5)
+
+    def test_fs_executor(self):
+        fs = MemoryFS()
+        fs.setexecutor(self.executor)
+        self.assertTrue(fs._get_executor() is self.executor)
+        fs.setcontents_async("foo", b("bar")).result()
+        self.assertEqual(fs.getcontents("foo"), b("bar"))
+        fs.setexecutor(None)
+        self.assertFalse(fs._get_executor() is self.executor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,9 @@ import os
 import sys
 import shutil
 import tempfile
+import datetime
+
+from six import b
 
 
 from fs import osfs
@@ -63,6 +66,319 @@ class TestMemoryFS(unittest.TestCase,FSTestCases,ThreadingTestCases):
     def setUp(self):
         self.fs = memoryfs.MemoryFS()
 
+    def test_lazy_entry_state(self):
+        self.fs.setcontents("a.txt", b("hello"))
+        entry = self.fs._dir_entry("a.txt")
+        self.assertTrue(isinstance(entry.data, bytearray))
+        self.assertEqual(entry.lock, None)
+        self.assertEqual(entry.xattrs, None)
+        self.assertEqual(entry.open_files, None)
+        f = self.fs.open("a.txt", "rb")
+        self.assertEqual(len(entry.open_files), 1)
+        self.assertNotEqual(entry.lock, None)
+        f.close()
+        self.assertEqual(entry.open_files, None)
+        self.assertEqual(self.fs.listxattrs("a.txt"), [])
+        self.assertEqual(entry.xattrs, None)
+
+    def test_write_in_place(self):
+        self.fs.setcontents("a.txt", b("hello world"))
+        with self.fs.open("a.txt", "rb+") as f:
+            f.seek(6)
+            f.write(b("there"))
+            f.seek(15)
+            f.write(b("!"))
+        self.assertEqual(self.fs.getcontents("a.txt", "rb"), b("hello there\0\0\0\0!"))
+        with self.fs.open("a.txt", "rb") as f:
+            buf = bytearray(5)
+            self.assertEqual(f.readinto(buf), 5)
+            self.assertEqual(buf, b("hello"))
+
+    def test_copy_shares_contents(self):
+        self.fs.setcontents("a.txt", b("hello"))
+        self.fs.copy("a.txt", "b.txt")
+        a, b_ = self.fs._dir_entry("a.txt"), self.fs._dir_entry("b.txt")
+        self.assertTrue(a.data is b_.data)
+        with self.fs.open("b.txt", "ab") as f:
+            f.write(b(" world"))
+        self.assertFalse(a.data is b_.data)
+        self.assertEqual(self.fs.getcontents("a.txt", "rb"), b("hello"))
+        self.assertEqual(self.fs.getcontents("b.txt", "rb"), b("hello world"))
+        #  The last file sharing the contents modifies them in place
+        data = a.data
+        with self.fs.open("a.txt", "rb+") as f:
+            f.write(b("j"))
+        self.assertTrue(a.data is data)
+        self.assertEqual(self.fs.getcontents("a.txt", "rb"), b("jello"))
+
+    def test_copydir_shares_contents(self):
+        self.fs.makedir("src/sub", recursive=True)
+        self.fs.setcontents("src/a.txt", b("a"))
+        self.fs.setcontents("src/sub/b.txt", b("b"))
+        self.fs.setxattr("src/sub", "user.key", "value")
+        self.fs.copydir("src", "src/copy")
+        self.assertTrue(self.fs._dir_entry("src/sub/b.txt").data is self.fs._dir_entry("src/copy/sub/b.txt").data)
+        self.assertEqual(self.fs.getxattr("src/copy/sub", "user.key"), "value")
+        self.assertFalse(self.fs.exists("src/copy/copy"))
+        self.fs.setcontents("src/copy/sub/b.txt", b("changed"))
+        self.assertEqual(self.fs.getcontents("src/sub/b.txt", "rb"), b("b"))
+        self.assertRaises(errors.DestinationExistsError, self.fs.copydir, "src", "src/copy")
+        self.fs.setcontents("src/a.txt", b("new"))
+        self.fs.copydir("src", "src/copy", overwrite=True)
+        self.assertEqual(self.fs.getcontents("src/copy/a.txt", "rb"), b("new"))
+        self.assertEqual(self.fs.getcontents("src/copy/sub/b.txt", "rb"), b("b"))
+        self.assertTrue(self.fs.exists("src/copy/copy/a.txt"))
+
+    def test_copy_concurrent_writes(self):
+        import threading
+        data = b("-") * 1024
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for _ in range(3000):
+                self.fs.setcontents("a", data)
+                self.fs.copy("a", "b", overwrite=True)
+                files = [self.fs.open("a", "r+b"), self.fs.open("b", "r+b")]
+                barrier = threading.Barrier(2)
+                def write(f, pos, c):
+                    barrier.wait()
+                    f.seek(pos)
+                    f.write(c)
+                    f.close()
+                threads = [threading.Thread(target=write, args=(files[0], 0, b("A"))),
+                           threading.Thread(target=write, args=(files[1], len(data) - 1, b("B")))]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                #  Neither file's write may show up in the other file
+                self.assertEqual(self.fs.getcontents("a", "rb"), b("A") + data[1:])
+                self.assertEqual(self.fs.getcontents("b", "rb"), data[:-1] + b("B"))
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+    def _run_in_thread(self, func):
+        import threading
+        thread = threading.Thread(target=func)
+        thread.daemon = True
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+
+    def test_fine_grained_locking(self):
+        self.fs.makedir("a")
+        self.fs.makedir("b")
+        self.fs.setcontents("a/1.txt", b("1"))
+        results = []
+        #  Changing one directory doesn't block changes to another
+        dir_entry = self.fs._lock_dir("a")
+        try:
+            def change_other_dir():
+                self.fs.setcontents("b/2.txt", b("2"))
+                self.fs.makedir("b/c")
+                self.fs.remove("b/2.txt")
+                results.append(self.fs.getcontents("a/1.txt", "rb"))
+            self._run_in_thread(change_other_dir)
+        finally:
+            self.fs._unlock_dir(dir_entry)
+        #  Reading and writing open files doesn't need the filesystem's lock
+        f = self.fs.open("a/1.txt", "r+b")
+        try:
+            with self.fs._lock:
+                def use_file():
+                    f.write(b("one"))
+                    results.append(self.fs.listdir("b"))
+                    results.append(self.fs.getcontents("a/1.txt", "rb"))
+                self._run_in_thread(use_file)
+        finally:
+            f.close()
+        self.assertEqual(results, [b("1"), ["c"], b("one")])
+
+    def test_pickle_legacy_entry(self):
+        entry = memoryfs.DirEntry("file", "a.txt")
+        state = {"type": "file", "name": "a.txt", "contents": None,
+                 "mem_file": b("data"), "xattrs": {},
+                 "created_time": datetime.datetime(2015, 1, 2, 3, 4, 5),
+                 "modified_time": datetime.datetime(2015, 1, 2, 3, 4, 5),
+                 "accessed_time": datetime.datetime(2015, 1, 2, 3, 4, 5)}
+        entry.__setstate__(state)
+        self.assertEqual(entry.get_value(), b("data"))
+        self.assertEqual(datetime.datetime.fromtimestamp(entry.modified_time),
+                         datetime.datetime(2015, 1, 2, 3, 4, 5))
+
+
+class TestMemoryFSFork(unittest.TestCase,FSTestCases,ThreadingTestCases):
+
+    def setUp(self):
+        #  Every entry the fork modifies is shared with the original
+        self.original_fs = memoryfs.MemoryFS()
+        self.fs = self.original_fs.fork()
+
+    def tearDown(self):
+        self.assertEqual(self.original_fs.listdir(), [])
+
+
+class TestMemoryFSSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.fs = memoryfs.MemoryFS()
+        self.fs.makedir("foo/bar", recursive=True)
+        self.fs.setcontents("foo/bar/a.txt", b("a"))
+        self.fs.setcontents("b.txt", b("b"))
+        self.fs.setxattr("b.txt", "user.key", "value")
+
+    def test_snapshot(self):
+        snapshot = self.fs.snapshot()
+        self.fs.setcontents("foo/bar/a.txt", b("changed"))
+        self.fs.remove("b.txt")
+        self.fs.makedir("foo/new")
+        self.fs.rename("foo/bar", "foo/baz")
+        self.assertEqual(snapshot.getcontents("foo/bar/a.txt", "rb"), b("a"))
+        self.assertEqual(snapshot.getcontents("b.txt", "rb"), b("b"))
+        self.assertEqual(snapshot.getxattr("b.txt", "user.key"), "value")
+        self.assertEqual(sorted(snapshot.listdir("foo")), ["bar"])
+        self.assertEqual(sorted(self.fs.listdir("foo")), ["baz", "new"])
+        self.assertTrue(snapshot.getmeta("read_only"))
+        self.assertRaises(errors.UnsupportedError, snapshot.setcontents, "c.txt", b("c"))
+        self.assertRaises(errors.UnsupportedError, snapshot.open, "b.txt", "wb")
+
+    def test_only_touched_path_is_copied(self):
+        self.fs.makedir("other")
+        snapshot = self.fs.snapshot()
+        self.fs.setcontents("foo/bar/a.txt", b("changed"))
+        root = snapshot.wrapped_fs.root
+        self.assertFalse(self.fs.root is root)
+        self.assertTrue(self.fs.root.contents["other"] is root.contents["other"])
+        self.assertFalse(self.fs.root.contents["foo"] is root.contents["foo"])
+
+    def test_open_files(self):
+        f = self.fs.open("foo/bar/a.txt", "ab")
+        snapshot = self.fs.snapshot()
+        f.write(b("1"))
+        f.flush()
+        self.fs.snapshot()
+        f.write(b("2"))
+        f.close()
+        self.assertEqual(snapshot.getcontents("foo/bar/a.txt", "rb"), b("a"))
+        self.assertEqual(self.fs.getcontents("foo/bar/a.txt", "rb"), b("a12"))
+
+    def test_fork(self):
+        snapshot = self.fs.snapshot()
+        fork = self.fs.fork()
+        fork.setcontents("foo/bar/a.txt", b("fork"))
+        fork.removedir("foo", force=True)
+        self.fs.setcontents("b.txt", b("original"))
+        self.assertEqual(self.fs.getcontents("foo/bar/a.txt", "rb"), b("a"))
+        self.assertEqual(fork.getcontents("b.txt", "rb"), b("b"))
+        self.assertFalse(fork.exists("foo"))
+        snapshot_fork = snapshot.fork()
+        snapshot_fork.setcontents("b.txt", b("snapshot fork"))
+        self.assertEqual(snapshot.getcontents("b.txt", "rb"), b("b"))
+
+    def test_restore(self):
+        snapshot = self.fs.snapshot()
+        self.fs.removedir("foo", force=True)
+        self.fs.setcontents("b.txt", b("changed"))
+        self.fs.restore(snapshot)
+        self.assertEqual(self.fs.getcontents("foo/bar/a.txt", "rb"), b("a"))
+        self.assertEqual(self.fs.getcontents("b.txt", "rb"), b("b"))
+        #  The snapshot can be restored again
+        self.fs.setcontents("b.txt", b("changed again"))
+        self.fs.restore(snapshot)
+        self.assertEqual(self.fs.getcontents("b.txt", "rb"), b("b"))
+        self.assertRaises(ValueError, self.fs.restore, tempfile)
+
+    def test_pickle(self):
+        import pickle
+        self.fs.snapshot()
+        fs = pickle.loads(pickle.dumps(self.fs))
+        fs.setcontents("b.txt", b("changed"))
+        self.assertEqual(fs.getcontents("foo/bar/a.txt", "rb"), b("a"))
+        self.assertEqual(self.fs.getcontents("b.txt", "rb"), b("b"))
+
+
+class TestMemoryFSSpill(unittest.TestCase,FSTestCases,ThreadingTestCases):
+
+    def setUp(self):
+        #  Small enough that most files written by the tests are spilled
+        self.fs = memoryfs.MemoryFS(max_memory=64)
+
+    def tearDown(self):
+        spill_fs = self.fs._spill_store.spill_fs
+        self.fs.close()
+        self.assertTrue(spill_fs.closed)
+
+    def _spilled(self, path):
+        return isinstance(self.fs._dir_entry(path).data, memoryfs._SpilledData)
+
+    def test_spill_and_reload(self):
+        for name in "abcd":
+            self.fs.setcontents(name, b(name) * 40)
+        self.assertTrue(self._spilled("a"))
+        self.assertFalse(self._spilled("d"))
+        self.assertEqual(self.fs.getmeta("memoryfs.resident_bytes"), 40)
+        self.assertEqual(self.fs.getmeta("memoryfs.spilled_files"), 3)
+        self.assertEqual(self.fs.getmeta("memoryfs.spilled_bytes"), 120)
+        #  Info doesn't load the contents
+        self.assertEqual(self.fs.getsize("a"), 40)
+        self.assertTrue(self._spilled("a"))
+        self.assertEqual(self.fs.getcontents("a", "rb"), b("a") * 40)
+        self.assertFalse(self._spilled("a"))
+        self.assertTrue(self._spilled("d"))
+        self.assertEqual(self.fs.getrange("b", 38), b("bb"))
+        with self.fs.open("c", "ab") as f:
+            f.write(b("c"))
+        self.assertEqual(self.fs.getcontents("c", "rb"), b("c") * 41)
+
+    def test_remove_spilled(self):
+        self.fs.setcontents("a", b("a") * 100)
+        self.fs.setcontents("b", b("b") * 10)
+        self.assertTrue(self._spilled("a"))
+        spill_fs = self.fs._spill_store.spill_fs
+        self.assertEqual(len(spill_fs.listdir()), 1)
+        self.fs.remove("a")
+        self.assertEqual(spill_fs.listdir(), [])
+        self.assertEqual(self.fs.getmeta("memoryfs.spilled_files"), 0)
+
+    def test_meta(self):
+        self.assertEqual(self.fs.getmeta("memoryfs.max_memory"), 64)
+        self.assertEqual(self.fs.getmeta("memoryfs.eviction_policy"), "lru")
+        unbounded_fs = memoryfs.MemoryFS()
+        self.assertEqual(unbounded_fs.getmeta("memoryfs.max_memory"), None)
+        self.assertEqual(unbounded_fs.getmeta("memoryfs.eviction_policy"), None)
+        self.assertFalse(unbounded_fs.hasmeta("memoryfs.resident_bytes"))
+
+    def test_spill_after_copy(self):
+        self.fs.setcontents("a", b("a") * 40)
+        self.fs.copy("a", "b")
+        self.fs.setcontents("b", b("b") * 40)
+        #  The original no longer shares its contents, so it's counted
+        self.assertTrue(self._spilled("a"))
+        self.assertEqual(self.fs.getmeta("memoryfs.resident_bytes"), 40)
+        self.assertEqual(self.fs.getcontents("a", "rb"), b("a") * 40)
+        fork = self.fs.fork()
+        try:
+            fork.setcontents("a", b("fork"))
+            self.assertTrue(self._spilled("b"))
+            self.assertEqual(self.fs.getmeta("memoryfs.resident_bytes"), 44)
+        finally:
+            fork.close()
+
+    def test_fork_and_pickle(self):
+        import pickle
+        self.fs.setcontents("a", b("a") * 100)
+        self.fs.setcontents("b", b("b") * 10)
+        fork = self.fs.fork()
+        fork.setcontents("a", b("fork"))
+        self.assertEqual(self.fs.getcontents("a", "rb"), b("a") * 100)
+        fork.close()
+        self.assertFalse(self.fs._spill_store.spill_fs.closed)
+        self.fs.setcontents("c", b("c") * 100)
+        self.assertTrue(self._spilled("c"))
+        fs = pickle.loads(pickle.dumps(self.fs))
+        self.assertEqual(fs.getcontents("c", "rb"), b("c") * 100)
+        self.assertEqual(fs.getmeta("memoryfs.max_memory"), 64)
+
 
 from fs import mountfs
 class TestMountFS(unittest.TestCase,FSTestCases,ThreadingTestCases):
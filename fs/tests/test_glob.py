@@ -0,0 +1,126 @@
+import unittest
+
+from fs.glob import compile_glob, compile_wildcard
+from fs.memoryfs import MemoryFS
+
+from six import b
+
+
+class TestCompileGlob(unittest.TestCase):
+
+    def test_prefix(self):
+        glob = compile_glob('photos/IMG_*.jpg')
+        self.assertEqual(glob.base, '/photos')
+        self.assertEqual(glob.prefix, '/photos/IMG_')
+        self.assertFalse(glob.recursive)
+        self.assertFalse(glob.is_literal)
+        glob = compile_glob('/a/b/**/c')
+        self.assertEqual(glob.base, '/a/b')
+        self.assertEqual(glob.prefix, '/a/b/')
+        self.assertTrue(glob.recursive)
+        glob = compile_glob('*.txt')
+        self.assertEqual(glob.base, '/')
+        self.assertEqual(glob.prefix, '/')
+        glob = compile_glob('a/b.txt')
+        self.assertTrue(glob.is_literal)
+        self.assertEqual(glob.base, '/a/b.txt')
+
+    def test_match(self):
+        glob = compile_glob('src/*.py')
+        self.assertTrue(glob.match('/src/base.py'))
+        self.assertFalse(glob.match('/src/fs/base.py'))
+        self.assertFalse(glob.match('/src/base.pyc'))
+        glob = compile_glob('a/?[0-9][!a-z]')
+        self.assertTrue(glob.match('/a/x1A'))
+        self.assertFalse(glob.match('/a/x1a'))
+        self.assertFalse(glob.match('/a/x1/'))
+        glob = compile_glob('.*')
+        self.assertTrue(glob.match('/.hidden'))
+
+    def test_recursive(self):
+        glob = compile_glob('a/**/*.py')
+        self.assertTrue(glob.match('/a/b.py'))
+        self.assertTrue(glob.match('/a/b/c/d.py'))
+        self.assertFalse(glob.match('/b/c.py'))
+        glob = compile_glob('a/**')
+        self.assertTrue(glob.match('/a/b'))
+        self.assertTrue(glob.match('/a/b/c'))
+        self.assertFalse(glob.match('/a'))
+        glob = compile_glob('**/**/c')
+        self.assertTrue(glob.match('/c'))
+        self.assertTrue(glob.match('/a/b/c'))
+
+    def test_braces(self):
+        glob = compile_glob('*.{jpg,png}')
+        self.assertTrue(glob.match('/a.jpg'))
+        self.assertTrue(glob.match('/a.png'))
+        self.assertFalse(glob.match('/a.gif'))
+        glob = compile_glob('{a/b,c/d}/*.txt')
+        self.assertTrue(glob.match('/a/b/e.txt'))
+        self.assertTrue(glob.match('/c/d/e.txt'))
+        self.assertFalse(glob.match('/a/d/e.txt'))
+        self.assertEqual(glob.base, '/')
+        glob = compile_glob('a/{b,c{d,e}}')
+        self.assertTrue(glob.match('/a/ce'))
+        self.assertFalse(glob.match('/a/c'))
+
+    def test_dirs_only(self):
+        self.assertTrue(compile_glob('a/*/').dirs_only)
+        self.assertFalse(compile_glob('a/*').dirs_only)
+        self.assertFalse(compile_glob('/').dirs_only)
+
+    def test_cached(self):
+        self.assertTrue(compile_glob('a/*.txt') is compile_glob('a/*.txt'))
+
+    def test_compile_wildcard(self):
+        self.assertTrue(compile_wildcard(None)('anything'))
+        self.assertTrue(compile_wildcard('*.txt')('a.txt'))
+        self.assertFalse(compile_wildcard('*.txt')('a.py'))
+        is_a = lambda name: name == 'a'
+        self.assertTrue(compile_wildcard(is_a) is is_a)
+
+
+class TestGlobPruning(unittest.TestCase):
+
+    def setUp(self):
+        self.fs = MemoryFS()
+        for top in ('a', 'b', 'c'):
+            for sub in range(5):
+                path = '%s/%d' % (top, sub)
+                self.fs.makedir(path, recursive=True)
+                self.fs.setcontents(path + '/file.txt', b('data'))
+        self.listed = []
+        listdir_partition = self.fs._listdir_partition
+
+        def counting_listdir_partition(path):
+            self.listed.append(path)
+            return listdir_partition(path)
+        self.fs._listdir_partition = counting_listdir_partition
+
+    def test_literal_prefix(self):
+        self.assertEqual(sorted(self.fs.glob('a/*/file.txt')),
+                         ['/a/%d/file.txt' % sub for sub in range(5)])
+        #  Only /a is listed, the file name is checked in each directory's listing
+        self.assertEqual(sorted(self.listed), ['/a'] + ['/a/%d' % sub for sub in range(5)])
+
+    def test_pruning(self):
+        self.assertEqual(self.fs.glob('*/3/*.txt'), ['/a/3/file.txt', '/b/3/file.txt', '/c/3/file.txt'])
+        #  The literal '3' is followed without listing /a, /b or /c
+        self.assertEqual(sorted(self.listed), ['/', '/a/3', '/b/3', '/c/3'])
+
+    def test_literal(self):
+        self.assertEqual(self.fs.glob('a/1/file.txt'), ['/a/1/file.txt'])
+        self.assertEqual(self.listed, [])
+
+    def test_recursive(self):
+        self.assertEqual(sorted(self.fs.glob('b/**/*.txt')), ['/b/%d/file.txt' % sub for sub in range(5)])
+        self.assertTrue(all(path.startswith('/b') for path in self.listed))
+
+    def test_multiple_recursive(self):
+        self.assertEqual(sorted(self.fs.glob('**/**/*.txt')),
+                         sorted(self.fs.glob('**/*.txt')))
+        self.assertEqual(len(self.fs.glob('**/*.txt')), 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
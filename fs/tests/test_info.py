@@ -0,0 +1,67 @@
+"""
+
+  fs.tests.test_info:  testcases for the lazy info mappings
+
+"""
+
+import os
+import pickle
+import datetime
+import unittest
+
+from fs.info import Info, StatInfo
+
+
+class TestStatInfo(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = os.stat(__file__)
+        self.info = StatInfo(self.stats)
+
+    def test_values(self):
+        info = self.info
+        self.assertEqual(info['size'], self.stats.st_size)
+        self.assertEqual(info['st_mode'], self.stats.st_mode)
+        self.assertEqual(info['modified_time'], datetime.datetime.fromtimestamp(self.stats.st_mtime))
+        #  Datetimes are computed once
+        self.assertTrue(info['modified_time'] is info['modified_time'])
+        self.assertRaises(KeyError, lambda: info['nosuchkey'])
+        self.assertEqual(info.get('nosuchkey', 'default'), 'default')
+
+    def test_mapping(self):
+        info = self.info
+        keys = set(name for name in dir(self.stats) if name.startswith('st_'))
+        keys.update(['size', 'created_time', 'accessed_time', 'modified_time'])
+        self.assertEqual(set(info), keys)
+        self.assertEqual(len(info), len(keys))
+        self.assertTrue('modified_time' in info)
+        self.assertFalse('nosuchkey' in info)
+        as_dict = dict(info)
+        self.assertEqual(info, as_dict)
+        self.assertEqual(info.copy(), as_dict)
+        self.assertTrue(isinstance(info.copy(), dict))
+
+    def test_modify(self):
+        info = self.info
+        info['name'] = 'test_info.py'
+        info['size'] = 10
+        del info['st_ino']
+        self.assertEqual(info['name'], 'test_info.py')
+        self.assertEqual(info['size'], 10)
+        self.assertFalse('st_ino' in info)
+        self.assertRaises(KeyError, lambda: info['st_ino'])
+        self.assertFalse('st_ino' in list(info))
+        self.assertRaises(KeyError, info.__delitem__, 'st_ino')
+
+    def test_pickle(self):
+        self.info['name'] = 'test_info.py'
+        del self.info['st_ino']
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            info = pickle.loads(pickle.dumps(self.info, protocol))
+            self.assertEqual(info, self.info)
+            self.assertFalse('st_ino' in info)
+
+    def test_values_only(self):
+        info = Info(values={'size': 0})
+        self.assertEqual(info, {'size': 0})
+        self.assertEqual(list(info), ['size'])
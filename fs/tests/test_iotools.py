@@ -1,8 +1,13 @@
 
 
 from fs import iotools
+from fs.filelike import StringIO, LimitBytesFile
 
 import io
+import os
+import shutil
+import threading
+import tempfile
 import unittest
 from os.path import dirname, join, abspath
 
@@ -54,3 +59,103 @@ class TestIOTools(unittest.TestCase):
         with o.open('file', 'rt') as f:
             text = f.read()
             self.assertTrue(isinstance(text, str))
+
+    def test_copy_file_data(self):
+        """Test copy_file_data with OS files and file-like objects"""
+        with self.get_bin_file() as f:
+            data = f.read()
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            dst_path = join(tmp_dir, 'copy')
+            with self.get_bin_file() as src:
+                src.read(10)
+                with io.open(dst_path, 'wb') as dst:
+                    dst.write(b'head')
+                    self.assertEqual(iotools.copy_file_data(src, dst), len(data) - 10)
+                    self.assertEqual(dst.tell(), len(data) - 6)
+                    dst.write(b'tail')
+                self.assertEqual(src.tell(), len(data))
+            with io.open(dst_path, 'rb') as f:
+                self.assertEqual(f.read(), b'head' + data[10:] + b'tail')
+
+            dst = io.BytesIO()
+            with self.get_bin_file() as src:
+                self.assertEqual(iotools.copy_file_data(src, dst, chunk_size=100), len(data))
+            self.assertEqual(dst.getvalue(), data)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_copy_file_data_pipe(self):
+        """Test copy_file_data and setcontents from a pipe, which can't seek"""
+        from fs.tempfs import TempFS
+        data = b'0123456789' * 20000
+        tmp_fs = TempFS()
+
+        def copy_file(src):
+            with tmp_fs.open('copy', 'wb') as dst:
+                return iotools.copy_file_data(src, dst)
+
+        def write_pipe(write_fd):
+            with io.open(write_fd, 'wb') as f:
+                f.write(data)
+
+        try:
+            for copy in (copy_file, lambda src: tmp_fs.setcontents('copy', src)):
+                read_fd, write_fd = os.pipe()
+                writer = threading.Thread(target=write_pipe, args=(write_fd,))
+                writer.start()
+                try:
+                    with io.open(read_fd, 'rb') as src:
+                        self.assertEqual(copy(src), len(data))
+                finally:
+                    writer.join()
+                self.assertEqual(tmp_fs.getcontents('copy', 'rb'), data)
+        finally:
+            tmp_fs.close()
+
+    def test_readinto(self):
+        """Test reading into buffers through make_stream"""
+        data = b'0123456789' * 1000
+        buf = bytearray(16)
+        for make_f in (lambda: io.BytesIO(data),
+                       lambda: StringIO(data),
+                       lambda: LimitBytesFile(len(data), StringIO(data + b'extra'))):
+            with iotools.make_stream('f', make_f(), 'rb') as f:
+                self.assertEqual(f.readinto(buf), 16)
+                self.assertEqual(bytes(buf), data[:16])
+                self.assertEqual(f.read(4), data[16:20])
+            with iotools.make_stream('f', make_f(), 'rb', buffering=100) as f:
+                self.assertTrue(isinstance(f, io.BufferedReader))
+                self.assertEqual(f.read(), data)
+            with iotools.make_stream('f', make_f(), 'rb') as f:
+                f.read(9995)
+                self.assertEqual(f.readinto(buf), 5)
+                self.assertEqual(bytes(buf[:5]), data[-5:])
+                self.assertEqual(f.readinto(buf), 0)
+
+    def test_filelike_readinto(self):
+        """Test FileLikeBase.readinto mixed with other reads"""
+        f = StringIO(b'hello\nworld')
+        self.assertEqual(f.readline(), b'hello\n')
+        buf = bytearray(3)
+        self.assertEqual(f.readinto(buf), 3)
+        self.assertEqual(bytes(buf), b'wor')
+        self.assertEqual(f.readinto1(memoryview(buf)[:1]), 1)
+        self.assertEqual(f.read(), b'd')
+        self.assertEqual(f.readinto(buf), 0)
+        f.seek(2)
+        self.assertEqual(f.readinto(buf), 3)
+        self.assertEqual(bytes(buf), b'llo')
+
+    def test_make_bytes_io(self):
+        """Test make_bytes_io with bytes-like objects"""
+        data = bytearray(b'hello world')
+        f = iotools.make_bytes_io(memoryview(data))
+        self.assertEqual(f.read(5), b'hello')
+        #  The data isn't copied
+        data[6:] = b'WORLD'
+        self.assertEqual(f.read(), b' WORLD')
+        f.seek(0)
+        self.assertEqual(f.read(), b'hello WORLD')
+        self.assertEqual(iotools.make_bytes_io(b'bytes').read(), b'bytes')
+        self.assertEqual(iotools.make_bytes_io(u'text').read(), b'text')
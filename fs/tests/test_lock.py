@@ -0,0 +1,113 @@
+import pickle
+import threading
+import time
+import unittest
+
+from fs.base import ReadWriteLock, synchronize, synchronize_read
+from fs.memoryfs import MemoryFS
+
+
+class Counter(object):
+
+    def __init__(self, lock):
+        self._lock = lock
+        self.active = 0
+        self.most_active = 0
+        self.count_lock = threading.Lock()
+
+    def _enter(self):
+        with self.count_lock:
+            self.active += 1
+            self.most_active = max(self.most_active, self.active)
+        time.sleep(0.05)
+        with self.count_lock:
+            self.active -= 1
+
+    @synchronize_read
+    def read(self):
+        self._enter()
+
+    @synchronize
+    def write(self):
+        self._enter()
+
+
+class TestReadWriteLock(unittest.TestCase):
+
+    def run_threads(self, target, count=4):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_shared_reads(self):
+        counter = Counter(ReadWriteLock())
+        self.run_threads(counter.read)
+        self.assertTrue(counter.most_active > 1)
+
+    def test_exclusive_writes(self):
+        counter = Counter(ReadWriteLock())
+        self.run_threads(counter.write)
+        self.assertEqual(counter.most_active, 1)
+
+    def test_reads_with_rlock(self):
+        #  synchronize_read is exclusive with a plain lock
+        counter = Counter(threading.RLock())
+        self.run_threads(counter.read)
+        self.assertEqual(counter.most_active, 1)
+
+    def test_reentrant(self):
+        lock = ReadWriteLock()
+        with lock:
+            with lock:
+                self.assertTrue(lock.acquire_read())
+                lock.release_read()
+        self.assertTrue(lock.acquire_read())
+        self.assertTrue(lock.acquire_read())
+        lock.release_read()
+        #  Upgrade to a write lock while the only reader
+        with lock:
+            self.assertFalse(self.acquire_in_thread(lock.acquire_read))
+        lock.release_read()
+        self.assertTrue(self.acquire_in_thread(lock.acquire))
+        self.assertRaises(RuntimeError, lock.release)
+        self.assertRaises(RuntimeError, lock.release_read)
+
+    def acquire_in_thread(self, acquire):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(acquire(blocking=False)))
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_writer_waits_for_readers(self):
+        lock = ReadWriteLock()
+        lock.acquire_read()
+        self.assertFalse(self.acquire_in_thread(lock.acquire))
+        events = []
+
+        def write():
+            with lock:
+                events.append("write")
+        thread = threading.Thread(target=write)
+        thread.start()
+        time.sleep(0.05)
+        #  A waiting writer holds back new readers
+        self.assertFalse(self.acquire_in_thread(lock.acquire_read))
+        events.append("read done")
+        lock.release_read()
+        thread.join()
+        self.assertEqual(events, ["read done", "write"])
+
+    def test_fs_lock(self):
+        fs = MemoryFS()
+        self.assertTrue(isinstance(fs._lock, ReadWriteLock))
+        fs.setcontents("a", b"data")
+        fs = pickle.loads(pickle.dumps(fs))
+        self.assertTrue(isinstance(fs._lock, ReadWriteLock))
+        self.assertEqual(fs.getcontents("a"), b"data")
+
+
+if __name__ == "__main__":
+    unittest.main()
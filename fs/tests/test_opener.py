@@ -8,7 +8,7 @@ import unittest
 import tempfile
 import shutil
 
-from fs.opener import opener
+from fs.opener import opener, OpenerRegistry, OpenerError, NoOpenerError, MemOpener
 from fs import path
 
 class TestOpener(unittest.TestCase):
@@ -25,8 +25,21 @@ class TestOpener(unittest.TestCase):
         file_object.close()
         self.assertTrue(file_object.closed)
 
-
-
-
-
+    def testLazyOpener(self):
+        registry = OpenerRegistry([MemOpener])
+        registry.add('fs.opener.ZipOpener', names=['zip', 'zip64'])
+        self.assertEqual(registry.openers[1], 'fs.opener.ZipOpener')
+        from fs.opener import ZipOpener
+        self.assertTrue(registry.get_opener('zip64') is ZipOpener)
+        self.assertTrue(registry.openers[1] is ZipOpener)
+        self.assertEqual(registry.list_openers(), [MemOpener, ZipOpener])
+        self.assertRaises(NoOpenerError, registry.get_opener, 'ftp')
+        self.assertRaises(ValueError, registry.add, 'fs.opener.FTPOpener')
+
+    def testLazyOpenerImportError(self):
+        registry = OpenerRegistry()
+        registry.add('fs.nosuchmodule.Opener', names=['foo'])
+        registry.add('fs.opener.NoSuchOpener', names=['bar'])
+        self.assertRaises(OpenerError, registry.get_opener, 'foo')
+        self.assertRaises(OpenerError, registry.get_opener, 'bar')
 
@@ -0,0 +1,157 @@
+import os
+import datetime
+import tempfile
+import unittest
+
+from fs.errors import ResourceNotFoundError
+from fs.memoryfs import MemoryFS
+from fs.tempfs import TempFS
+from fs import utils
+from fs.utils import syncdir, SyncPlan
+
+from six import b
+
+
+class TestSyncdir(unittest.TestCase):
+
+    def setUp(self):
+        self.src_fs = MemoryFS()
+        self.src_fs.setcontents("a.txt", b("a"))
+        self.src_fs.makedir("foo/bar", recursive=True)
+        self.src_fs.setcontents("foo/b.txt", b("b"))
+        self.src_fs.setcontents("foo/bar/c.txt", b("c"))
+        self.dst_fs = MemoryFS()
+
+    def _check_synced(self):
+        for path in self.src_fs.walkfiles():
+            self.assertEqual(self.dst_fs.getcontents(path, "rb"), self.src_fs.getcontents(path, "rb"))
+        self.assertEqual(sorted(self.src_fs.walkdirs()), sorted(self.dst_fs.walkdirs()))
+
+    def test_initial_sync(self):
+        plan = syncdir(self.src_fs, self.dst_fs)
+        self.assertTrue(isinstance(plan, SyncPlan))
+        self.assertEqual(sorted(plan.copy), ["/a.txt", "/foo/b.txt", "/foo/bar/c.txt"])
+        self.assertEqual(plan.make_dirs, ["/foo", "/foo/bar"])
+        self.assertEqual(len(plan), 5)
+        self._check_synced()
+
+    def test_unchanged(self):
+        syncdir(self.src_fs, self.dst_fs)
+        for compare in ("size", "size+mtime", "hash"):
+            plan = syncdir(self.src_fs, self.dst_fs, compare=compare)
+            self.assertEqual(len(plan), 0)
+            self.assertEqual(plan.unchanged, 3)
+
+    def test_changed(self):
+        syncdir(self.src_fs, self.dst_fs)
+        self.src_fs.setcontents("a.txt", b("aaa"))
+        self.src_fs.setcontents("new.txt", b("new"))
+        plan = syncdir(self.src_fs, self.dst_fs, compare="size")
+        self.assertEqual(plan.update, ["/a.txt"])
+        self.assertEqual(plan.copy, ["/new.txt"])
+        self.assertEqual(plan.unchanged, 2)
+        self._check_synced()
+
+    def test_compare_mtime(self):
+        syncdir(self.src_fs, self.dst_fs)
+        #  Same size, modified after the sync
+        self.src_fs.setcontents("a.txt", b("x"))
+        self.src_fs.settimes("a.txt", modified_time=datetime.datetime.now() + datetime.timedelta(hours=1))
+        self.assertEqual(len(syncdir(self.src_fs, self.dst_fs, compare="size", dry_run=True)), 0)
+        plan = syncdir(self.src_fs, self.dst_fs, compare="size+mtime")
+        self.assertEqual(plan.update, ["/a.txt"])
+        self.assertEqual(self.dst_fs.getcontents("a.txt", "rb"), b("x"))
+
+    def test_compare_hash(self):
+        syncdir(self.src_fs, self.dst_fs)
+        self.dst_fs.setcontents("foo/b.txt", b("x"))
+        self.assertEqual(len(syncdir(self.src_fs, self.dst_fs, dry_run=True)), 0)
+        plan = syncdir(self.src_fs, self.dst_fs, compare="hash")
+        self.assertEqual(plan.update, ["/foo/b.txt"])
+        self._check_synced()
+
+    def test_dry_run(self):
+        plan = syncdir(self.src_fs, self.dst_fs, dry_run=True)
+        self.assertEqual(len(plan), 5)
+        self.assertEqual(self.dst_fs.listdir(), [])
+        self.assertEqual(list(plan)[0], ("make_dirs", "/foo"))
+
+    def test_delete(self):
+        self.dst_fs.makedir("extra/sub", recursive=True)
+        self.dst_fs.setcontents("extra/sub/x.txt", b("x"))
+        self.dst_fs.setcontents("extra.txt", b("x"))
+        plan = syncdir(self.src_fs, self.dst_fs)
+        self.assertEqual(plan.remove, [])
+        self.assertTrue(self.dst_fs.exists("extra.txt"))
+        plan = syncdir(self.src_fs, self.dst_fs, delete=True)
+        self.assertEqual(plan.remove_dirs, ["/extra"])
+        self.assertEqual(plan.remove, ["/extra.txt"])
+        self._check_synced()
+        self.assertEqual(sorted(self.dst_fs.listdir()), ["a.txt", "foo"])
+
+    def test_replace(self):
+        self.dst_fs.makedir("a.txt")
+        self.dst_fs.setcontents("a.txt/x", b("x"))
+        self.dst_fs.setcontents("foo", b("not a dir"))
+        plan = syncdir(self.src_fs, self.dst_fs)
+        self.assertEqual(plan.remove_dirs, ["/a.txt"])
+        self.assertEqual(plan.remove, ["/foo"])
+        self._check_synced()
+
+    def test_sub_dirs(self):
+        utils.copydir(self.src_fs, (self.dst_fs, "mirror"))
+        self.src_fs.setcontents("foo/bar/c.txt", b("cc"))
+        plan = syncdir((self.src_fs, "foo"), (self.dst_fs, "mirror/foo"))
+        self.assertEqual(plan.update, ["/bar/c.txt"])
+        self.assertEqual(self.dst_fs.getcontents("mirror/foo/bar/c.txt", "rb"), b("cc"))
+
+    def test_errors(self):
+        self.assertRaises(ValueError, syncdir, self.src_fs, self.dst_fs, compare="md5")
+        self.assertRaises(ResourceNotFoundError, syncdir, (self.src_fs, "nodir"), self.dst_fs)
+
+    def test_checkpoint(self):
+        temp_dir = tempfile.mkdtemp()
+        checkpoint = os.path.join(temp_dir, "sync.checkpoint")
+        try:
+            plan = syncdir(self.src_fs, self.dst_fs, checkpoint=checkpoint)
+            self.assertEqual(len(plan.copy), 3)
+            self.assertFalse(os.path.exists(checkpoint))
+
+            #  Interrupted after copying one file
+            self.src_fs.setcontents("a.txt", b("aa"))
+            self.src_fs.setcontents("foo/b.txt", b("bb"))
+            plan = syncdir(self.src_fs, self.dst_fs, dry_run=True)
+            self.assertEqual(sorted(plan.update), ["/a.txt", "/foo/b.txt"])
+            with open(checkpoint, "w") as f:
+                f.write('{"src": ["%s", "/"], "dst": ["%s", "/"], "compare": "size+mtime", "delete": false}\n'
+                        % (self.src_fs, self.dst_fs))
+                f.write('{"remove_dirs": [], "remove": [], "make_dirs": [], "copy": [], '
+                        '"update": ["/a.txt", "/foo/b.txt"], "unchanged": 1}\n')
+                f.write('"/a.txt"\n"/foo/b.tx')
+            self.dst_fs.setcontents("a.txt", b("xx"))
+            plan = syncdir(self.src_fs, self.dst_fs, checkpoint=checkpoint)
+            self.assertEqual(plan.update, ["/a.txt", "/foo/b.txt"])
+            #  Already copied, according to the checkpoint
+            self.assertEqual(self.dst_fs.getcontents("a.txt", "rb"), b("xx"))
+            self.assertEqual(self.dst_fs.getcontents("foo/b.txt", "rb"), b("bb"))
+            self.assertFalse(os.path.exists(checkpoint))
+        finally:
+            if os.path.exists(checkpoint):
+                os.remove(checkpoint)
+            os.rmdir(temp_dir)
+
+    def test_osfs(self):
+        src_fs = TempFS()
+        dst_fs = TempFS()
+        try:
+            utils.copydir(self.src_fs, src_fs)
+            self.assertEqual(len(syncdir(src_fs, dst_fs, workers=8).copy), 3)
+            plan = syncdir(src_fs, dst_fs)
+            self.assertEqual((len(plan), plan.unchanged), (0, 3))
+        finally:
+            src_fs.close()
+            dst_fs.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import threading
+import unittest
+
+from fs.errors import ResourceNotFoundError, DestinationExistsError
+from fs.memoryfs import MemoryFS
+from fs.tempfs import TempFS
+from fs.transfer import Transfer, _ByteBudget
+from fs import utils
+
+from six import b
+
+
+def make_tree(fs):
+    fs.setcontents("a.txt", b("a"))
+    fs.makedir("foo/bar", recursive=True)
+    fs.makedir("empty")
+    for i in range(20):
+        fs.setcontents("foo/%02d.txt" % i, b("foo %d" % i))
+    fs.setcontents("foo/bar/baz.txt", b("baz"))
+
+
+class TestTransfer(unittest.TestCase):
+
+    def _check_tree(self, fs, path="/"):
+        sub_fs = fs.opendir(path)
+        self.assertEqual(sub_fs.getcontents("a.txt", "rb"), b("a"))
+        self.assertTrue(sub_fs.isdir("empty"))
+        for i in range(20):
+            self.assertEqual(sub_fs.getcontents("foo/%02d.txt" % i, "rb"), b("foo %d" % i))
+        self.assertEqual(sub_fs.getcontents("foo/bar/baz.txt", "rb"), b("baz"))
+
+    def test_copy_dir(self):
+        for workers in (1, 4):
+            src_fs = MemoryFS()
+            make_tree(src_fs)
+            dst_fs = TempFS()
+            try:
+                with Transfer(workers=workers) as transfer:
+                    transfer.add_dir(src_fs, "/", dst_fs, "copy")
+                self._check_tree(dst_fs, "copy")
+                self.assertEqual(transfer.files_found, 22)
+                self.assertEqual(transfer.files_done, 22)
+                self._check_tree(src_fs)
+            finally:
+                dst_fs.close()
+
+    def test_move_dir(self):
+        for workers in (1, 4):
+            src_fs = MemoryFS()
+            src_fs.makedir("src")
+            make_tree(src_fs.opendir("src"))
+            dst_fs = MemoryFS()
+            with Transfer(workers=workers, move=True) as transfer:
+                transfer.add_dir(src_fs, "src", dst_fs, "/")
+            self._check_tree(dst_fs)
+            self.assertFalse(src_fs.exists("src"))
+
+    def test_add_file(self):
+        src_fs = MemoryFS()
+        src_fs.setcontents("a.txt", b("a"))
+        dst_fs = MemoryFS()
+        with Transfer() as transfer:
+            transfer.add_file(src_fs, "a.txt", dst_fs, "b.txt")
+        self.assertEqual(dst_fs.getcontents("b.txt", "rb"), b("a"))
+
+    def test_overwrite(self):
+        src_fs = MemoryFS()
+        src_fs.setcontents("a.txt", b("new"))
+        dst_fs = MemoryFS()
+        dst_fs.setcontents("a.txt", b("old"))
+        transfer = Transfer(overwrite=False)
+        transfer.add_file(src_fs, "a.txt", dst_fs, "a.txt")
+        self.assertRaises(DestinationExistsError, transfer.wait)
+        self.assertEqual(dst_fs.getcontents("a.txt", "rb"), b("old"))
+
+    def test_errors(self):
+        src_fs = MemoryFS()
+        make_tree(src_fs)
+        dst_fs = MemoryFS()
+        transfer = Transfer()
+        transfer.add_file(src_fs, "missing.txt", dst_fs, "missing.txt")
+        transfer.add_dir(src_fs, "/", dst_fs, "/")
+        self.assertRaises(ResourceNotFoundError, transfer.wait)
+        self.assertRaises(ResourceNotFoundError, transfer.add_dir, src_fs, "nodir", dst_fs, "/")
+
+    def test_ignore_errors(self):
+        src_fs = MemoryFS()
+        make_tree(src_fs)
+        dst_fs = MemoryFS()
+        with Transfer(ignore_errors=True, move=True) as transfer:
+            transfer.add_file(src_fs, "missing.txt", dst_fs, "missing.txt")
+            transfer.add_dir(src_fs, "foo", dst_fs, "foo")
+        self.assertEqual(len(transfer.errors), 1)
+        self.assertEqual(transfer.errors[0][0], "missing.txt")
+        self.assertEqual(dst_fs.getcontents("foo/bar/baz.txt", "rb"), b("baz"))
+        self.assertFalse(src_fs.exists("foo"))
+
+    def test_callbacks(self):
+        src_fs = MemoryFS()
+        make_tree(src_fs)
+        dst_fs = MemoryFS()
+        files = []
+        dirs = []
+        with Transfer(on_file=lambda *args: files.append(args),
+                      on_dir=lambda *args: dirs.append(args)) as transfer:
+            transfer.add_dir(src_fs, "/", dst_fs, "/")
+        self.assertEqual(len(files), 22)
+        self.assertTrue((src_fs, "/foo/bar/baz.txt", dst_fs, "/foo/bar/baz.txt", 3) in files)
+        self.assertEqual(sorted(path for _fs, path in dirs), ["/empty", "/foo", "/foo/bar"])
+
+    def test_byte_budget(self):
+        budget = _ByteBudget(10)
+        self.assertEqual(budget.acquire(6), 6)
+        #  Larger than the limit, reserves the whole budget
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(budget.acquire(100)))
+        thread.start()
+        thread.join(0.1)
+        self.assertEqual(acquired, [])
+        budget.release(6)
+        thread.join()
+        self.assertEqual(acquired, [10])
+        budget.release(10)
+        self.assertEqual(budget.in_flight, 0)
+
+    def test_max_bytes_in_flight(self):
+        src_fs = MemoryFS()
+        for i in range(16):
+            src_fs.setcontents("%02d.bin" % i, b("x") * 100)
+        dst_fs = MemoryFS()
+        active = [0, 0]
+        lock = threading.Lock()
+        setcontents = dst_fs.setcontents
+
+        def counting_setcontents(*args, **kwargs):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            try:
+                return setcontents(*args, **kwargs)
+            finally:
+                with lock:
+                    active[0] -= 1
+        dst_fs.setcontents = counting_setcontents
+        with Transfer(workers=8, max_bytes_in_flight=250) as transfer:
+            transfer.add_dir(src_fs, "/", dst_fs, "/")
+        self.assertEqual(transfer.files_done, 16)
+        self.assertTrue(active[1] <= 2)
+
+
+class TestUtilsTransfer(unittest.TestCase):
+
+    def test_copydir_workers(self):
+        src_fs = MemoryFS()
+        make_tree(src_fs)
+        dst_fs = MemoryFS()
+        utils.copydir(src_fs, (dst_fs, "copy"), workers=8)
+        TestTransfer._check_tree(self, dst_fs, "copy")
+
+    def test_copydir_same_fs(self):
+        fs = MemoryFS()
+        fs.makedir("src")
+        make_tree(fs.opendir("src"))
+        utils.copydir((fs, "src"), (fs, "dst"), workers=4)
+        TestTransfer._check_tree(self, fs, "src")
+        TestTransfer._check_tree(self, fs, "dst")
+
+    def test_copydir_progress(self):
+        src_fs = MemoryFS()
+        make_tree(src_fs)
+        dst_fs = MemoryFS()
+        steps = []
+        utils.copydir_progress(lambda step, num_steps: steps.append((step, num_steps)), src_fs, dst_fs)
+        self.assertEqual(steps[0], (0, None))
+        self.assertEqual(steps[-1], (22, 22))
+        step_counts = [step for step, _num_steps in steps]
+        self.assertEqual(step_counts, sorted(step_counts))
+        self.assertTrue(set(range(23)) <= set(step_counts))
+
+    def test_movedir_no_create(self):
+        src_fs = MemoryFS()
+        make_tree(src_fs)
+        dst_fs = MemoryFS()
+        self.assertRaises(ResourceNotFoundError, utils.movedir, (src_fs, "foo"), (dst_fs, "foo"),
+                          create_destination=False)
+        self.assertTrue(src_fs.exists("foo/bar/baz.txt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
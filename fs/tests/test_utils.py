@@ -113,3 +113,71 @@ class TestUtils(unittest.TestCase):
         self.assertTrue(fs.isdirempty('/'))
 
 
+
+    def _make_duplicates(self, fs):
+        fs.makedir("photos")
+        fs.setcontents("a.jpg", b("small"))
+        fs.setcontents("photos/a.jpg", b("small"))
+        fs.setcontents("photos/b.jpg", b("other"))
+        # Large files that only differ after the signature
+        big = b("x") * 100
+        fs.setcontents("big1", big + b("1"))
+        fs.setcontents("big2", big + b("1"))
+        fs.setcontents("big3", big + b("2"))
+        fs.setcontents("empty1", b(""))
+        fs.setcontents("empty2", b(""))
+        fs.setcontents("unique", b("unique file"))
+
+    def test_find_duplicates(self):
+        fs = MemoryFS()
+        self._make_duplicates(fs)
+        for workers in (1, 4):
+            dups = sorted(sorted(paths) for paths in
+                          utils.find_duplicates(fs, signature_size=50, workers=workers))
+            self.assertEqual(dups, [["/a.jpg", "/photos/a.jpg"],
+                                    ["/big1", "/big2"],
+                                    ["/empty1", "/empty2"]])
+
+    def test_find_duplicates_quick(self):
+        fs = MemoryFS()
+        self._make_duplicates(fs)
+        dups = sorted(sorted(paths) for paths in utils.find_duplicates(fs, quick=True, signature_size=50))
+        self.assertTrue(["/big1", "/big2", "/big3"] in dups)
+
+    def test_find_duplicates_paths(self):
+        fs = MemoryFS()
+        self._make_duplicates(fs)
+        dups = list(utils.find_duplicates(fs, fs.walkfiles(wildcard="*.jpg")))
+        self.assertEqual([sorted(paths) for paths in dups], [["/a.jpg", "/photos/a.jpg"]])
+        dups = list(utils.find_duplicates(fs, ["a.jpg", "missing.jpg", "photos/a.jpg"]))
+        self.assertEqual([sorted(paths) for paths in dups], [["a.jpg", "photos/a.jpg"]])
+        self.assertRaises(ValueError, list, utils.find_duplicates(fs, algorithm="nosuchhash"))
+        # A CRC could group files with different contents
+        self.assertRaises(ValueError, list, utils.find_duplicates(fs, algorithm="crc32"))
+        dups = list(utils.find_duplicates(fs, fs.walkfiles(wildcard="*.jpg"), quick=True, algorithm="crc32"))
+        self.assertEqual([sorted(paths) for paths in dups], [["/a.jpg", "/photos/a.jpg"]])
+
+    def test_find_duplicates_reads(self):
+        fs = MemoryFS()
+        self._make_duplicates(fs)
+        reads = []
+        getrange = fs.getrange
+        gethash = fs.gethash
+        def counting_getrange(path, *args):
+            reads.append(("partial", path))
+            return getrange(path, *args)
+        def counting_gethash(path, *args):
+            reads.append(("full", path))
+            return gethash(path, *args)
+        fs.getrange = counting_getrange
+        fs.gethash = counting_gethash
+        progress = []
+        list(utils.find_duplicates(fs, signature_size=50,
+                                   progress_callback=lambda done, total: progress.append((done, total))))
+        # Each file is read at most once per stage, and only if it may have a duplicate
+        self.assertEqual(len(reads), len(set(reads)))
+        self.assertEqual(sorted(path for stage, path in reads if stage == "full"),
+                         ["/big1", "/big2", "/big3"])
+        self.assertFalse(("partial", "/unique") in reads)
+        self.assertEqual(progress[0], (0, 8))
+        self.assertEqual(progress[-1], (8, 8))
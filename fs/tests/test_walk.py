@@ -0,0 +1,99 @@
+import unittest
+
+from fs.tempfs import TempFS
+from fs.memoryfs import MemoryFS
+from fs.walk import ParallelWalker
+from fs.errors import ResourceNotFoundError
+
+from six import b
+
+
+class TestParallelWalker(unittest.TestCase):
+
+    def setUp(self):
+        self.fs = MemoryFS()
+        for dir_path in ("a/b/c", "a/d", "e/f", "g"):
+            self.fs.makedir(dir_path, recursive=True)
+        for file_path in ("1.txt", "a/2.txt", "a/b/3.bin", "a/b/c/4.txt", "e/f/5.txt"):
+            self.fs.setcontents(file_path, b(file_path))
+
+    def tearDown(self):
+        self.fs.close()
+
+    def test_ordered(self):
+        walker = ParallelWalker(self.fs, workers=4)
+        self.assertEqual(list(walker.walk()), list(self.fs.walk()))
+        self.assertEqual(list(walker.walk("a", wildcard="*.txt")),
+                         list(self.fs.walk("a", wildcard="*.txt")))
+        self.assertEqual(list(walker.walkfiles()), list(self.fs.walkfiles()))
+        self.assertEqual(list(walker.walkdirs(wildcard="*a*")),
+                         list(self.fs.walkdirs(wildcard="*a*")))
+        self.assertEqual(list(walker.walkinfo()), list(self.fs.walkinfo()))
+
+    def test_unordered(self):
+        walker = ParallelWalker(self.fs, workers=4, ordered=False)
+        self.assertEqual(sorted(walker.walk()), sorted(self.fs.walk()))
+        self.assertEqual(sorted(walker.walkfiles(wildcard="*.txt")),
+                         sorted(self.fs.walkfiles(wildcard="*.txt")))
+        self.assertEqual(sorted(p for p, _info in walker.walkfilesinfo()),
+                         sorted(self.fs.walkfiles()))
+
+    def test_osfs(self):
+        fs = TempFS()
+        try:
+            fs.makedir("foo/bar", recursive=True)
+            fs.setcontents("foo/bar/baz", b("baz"))
+            for ordered in (True, False):
+                walker = ParallelWalker(fs, workers=2, ordered=ordered)
+                self.assertEqual(list(walker.walkfiles()), ["/foo/bar/baz"])
+        finally:
+            fs.close()
+
+    def test_not_thread_safe(self):
+        self.fs._meta = dict(self.fs._meta, thread_safe=False)
+        walker = ParallelWalker(self.fs, workers=16)
+        self.assertEqual(walker.workers, 1)
+        self.assertEqual(list(walker.walk()), list(self.fs.walk()))
+
+    def test_missing(self):
+        walker = ParallelWalker(self.fs)
+        self.assertRaises(ResourceNotFoundError, list, walker.walk("zebra"))
+
+    def test_bounded(self):
+        for index in range(20):
+            self.fs.makedir("wide/%02d/sub" % index, recursive=True)
+        listed = []
+        partition = self.fs._listdir_partition
+        def listdir_partition(path):
+            listed.append(path)
+            return partition(path)
+        self.fs._listdir_partition = listdir_partition
+        for ordered in (True, False):
+            del listed[:]
+            walker = ParallelWalker(self.fs, workers=2, ordered=ordered)
+            walked = 0
+            for _path, _files in walker.walk():
+                walked += 1
+                self.assertTrue(len(listed) - walked <= 4)
+            self.assertEqual(walked, len(listed))
+
+    def test_subfs(self):
+        sub_fs = self.fs.opendir("a")
+        #  Each directory is listed by the MemoryFS, without checking each entry
+        self.fs.isdir = None
+        for ordered in (True, False):
+            walker = ParallelWalker(sub_fs, workers=2, ordered=ordered)
+            self.assertEqual(sorted(walker.walkfiles()),
+                             ["/2.txt", "/b/3.bin", "/b/c/4.txt"])
+            self.assertEqual(sorted(p for p, _info in walker.walkinfo()),
+                             ["/2.txt", "/b", "/b/3.bin", "/b/c", "/b/c/4.txt", "/d"])
+
+    def test_abandoned(self):
+        walker = ParallelWalker(self.fs, workers=2)
+        walk = walker.walk()
+        self.assertEqual(next(walk)[0], "/")
+        walk.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -226,3 +226,49 @@ class TestWatchers_MemoryFS_polling(TestWatchers_MemoryFS):
     def setUp(self):
         self.fs = memoryfs.MemoryFS()
         self.watchfs = ensure_watchable(self.fs,poll_interval=0.1)
+
+
+class _FakeWatchMixin(WatchableFSMixin):
+    """Stands in for the native watcher implementation."""
+
+
+class TestOSFSWatchLoading(unittest.TestCase):
+
+    def setUp(self):
+        from fs.osfs import watch as osfs_watch
+        self.osfs_watch = osfs_watch
+        self.saved = (osfs_watch._backend, osfs_watch._backend_loaded)
+        osfs_watch._backend = _FakeWatchMixin
+        osfs_watch._backend_loaded = True
+        self.fs = tempfs.TempFS()
+
+    def tearDown(self):
+        self.fs.close()
+        self.osfs_watch._backend, self.osfs_watch._backend_loaded = self.saved
+
+    def test_add_watcher(self):
+        self.assertFalse(isinstance(self.fs, _FakeWatchMixin))
+        events = []
+        watcher = self.fs.add_watcher(events.append, "/")
+        self.assertTrue(isinstance(self.fs, _FakeWatchMixin))
+        self.assertTrue(isinstance(self.fs, tempfs.TempFS))
+        self.assertEqual(self.fs.__class__.__name__, "TempFS")
+        self.fs.notify_watchers(CREATED, "/foo")
+        self.assertEqual([event.path for event in events], ["/foo"])
+        self.fs.del_watcher(watcher)
+        #  The class is only extended once
+        cls = self.fs.__class__
+        self.fs.add_watcher(events.append, "/")
+        self.assertTrue(self.fs.__class__ is cls)
+
+    def test_pickle(self):
+        self.fs.add_watcher(lambda event: None, "/")
+        fs2 = pickle.loads(pickle.dumps(self.fs))
+        self.assertTrue(fs2.__class__ is tempfs.TempFS)
+        self.assertEqual(fs2.root_path, self.fs.root_path)
+
+    def test_unsupported(self):
+        self.osfs_watch._backend = None
+        self.assertRaises(UnsupportedError, self.fs.add_watcher, lambda event: None)
+        self.assertRaises(UnsupportedError, self.fs.del_watcher, lambda event: None)
+
@@ -7,6 +7,7 @@
 import unittest
 from fs.tests import FSTestCases, ThreadingTestCases
 
+import io
 import os
 import sys
 import shutil
@@ -109,3 +110,111 @@ class TestHideDotFilesFS(unittest.TestCase):
         self.assertEqual(len(list(self.fs.ilistdir())), 2)
 
 
+
+
+from fs.wrapfs.metricsfs import MetricsFS
+class TestMetricsFS(TestWrapFS):
+
+    def setUp(self):
+        super(TestMetricsFS, self).setUp()
+        self.fs = MetricsFS(self.fs)
+
+    def test_metrics(self):
+        self.fs.reset()
+        self.fs.makedir("photos")
+        self.fs.setcontents("photos/a.jpg", b("hello"))
+        with self.fs.open("photos/a.jpg", "rb") as f:
+            self.assertEqual(f.read(), b("hello"))
+        self.assertEqual(self.fs.getcontents("photos/a.jpg"), b("hello"))
+        self.assertRaises(ResourceNotFoundError, self.fs.getinfo, "photos/b.jpg")
+        self.fs.getinfo("photos/a.jpg")
+
+        snapshot = self.fs.snapshot()
+        self.assertEqual(snapshot["setcontents"]["/photos"]["bytes_written"], 5)
+        self.assertEqual(snapshot["open"]["/photos"]["bytes_read"], 5)
+        self.assertEqual(snapshot["getcontents"]["/photos"]["bytes_read"], 5)
+        getinfo = snapshot["getinfo"]["/photos"]
+        self.assertEqual(getinfo["count"], 2)
+        self.assertEqual(getinfo["errors"], {"ResourceNotFoundError": 1})
+        self.assertTrue(0 <= getinfo["p50"] <= getinfo["p99"] <= getinfo["max_time"])
+        self.assertEqual(sum(count for _upper, count in getinfo["buckets"]), 2)
+
+        text = self.fs.prometheus_text()
+        self.assertTrue('pyfilesystem_operation_seconds_count{method="getinfo",prefix="/photos"} 2' in text)
+        self.assertTrue('pyfilesystem_operation_seconds_bucket{method="getinfo",prefix="/photos",le="+Inf"} 2' in text)
+        self.assertTrue('pyfilesystem_operation_errors_total{method="getinfo",prefix="/photos",error="ResourceNotFoundError"} 1' in text)
+        self.assertTrue('pyfilesystem_bytes_written_total{method="setcontents",prefix="/photos"} 5' in text)
+
+    def test_text_metrics(self):
+        #  Text is counted in bytes, not characters
+        text = u"\u00e9t\u00e9"
+        self.fs.makedir("docs")
+        self.fs.reset()
+        self.fs.setcontents("docs/a.txt", text, encoding="utf-8")
+        with self.fs.open("docs/b.txt", "wt", encoding="utf-8") as f:
+            f.write(text)
+        with self.fs.open("docs/b.txt", "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), text)
+        self.assertEqual(self.fs.getcontents("docs/a.txt", "rt", encoding="utf-8"), text)
+        self.fs.setcontents("docs/c.txt", io.StringIO(text), encoding="utf-8")
+        snapshot = self.fs.snapshot()
+        self.assertEqual(snapshot["setcontents"]["/docs"]["bytes_written"], 10)
+        self.assertEqual(snapshot["open"]["/docs"]["bytes_written"], 5)
+        self.assertEqual(snapshot["open"]["/docs"]["bytes_read"], 5)
+        self.assertEqual(snapshot["getcontents"]["/docs"]["bytes_read"], 5)
+
+    def test_walk_metrics(self):
+        self.fs.makedir("photos/2015", recursive=True)
+        self.fs.setcontents("photos/2015/a.jpg", b("a"))
+        self.fs.reset()
+        self.assertEqual(list(self.fs.walkfiles()), ["/photos/2015/a.jpg"])
+        self.assertEqual([path for path, _info in self.fs.walkinfo("photos")],
+                         ["/photos/2015", "/photos/2015/a.jpg"])
+        snapshot = self.fs.snapshot()
+        self.assertEqual(snapshot["listdir"]["/"]["count"], 1)
+        self.assertEqual(snapshot["listdir"]["/photos"]["count"], 2)
+        self.assertEqual(snapshot["listdirinfo"]["/photos"]["count"], 2)
+
+        self.fs.reset()
+        self.assertEqual(self.fs.snapshot(), {})
+
+    def test_outermost_call_only(self):
+        self.fs.setcontents("a.txt", b("data"))
+        self.fs.reset()
+        self.fs.copy("a.txt", "b.txt")
+        self.assertEqual(list(self.fs.snapshot().keys()), ["copy"])
+
+
+from fs.wrapfs.hashcachefs import HashCacheFS
+class TestHashCacheFS(TestWrapFS):
+
+    persistent = True
+
+    def setUp(self):
+        super(TestHashCacheFS, self).setUp()
+        self.fs = HashCacheFS(self.fs, persistent=self.persistent)
+
+    def test_cached_hash(self):
+        self.fs.setcontents("a.txt", b("data"))
+        digest = self.fs.gethash("a.txt", "sha1")
+        hashed = []
+        gethash = self.fs.wrapped_fs.gethash
+        def counting_gethash(path, *args, **kwargs):
+            hashed.append(path)
+            return gethash(path, *args, **kwargs)
+        self.fs.wrapped_fs.gethash = counting_gethash
+        self.assertEqual(self.fs.gethash("a.txt", "sha1"), digest)
+        self.assertEqual(hashed, [])
+        #  Cached per algorithm
+        self.fs.gethash("a.txt", "md5")
+        self.assertEqual(len(hashed), 1)
+        #  A change of size invalidates the cached hash
+        self.fs.setcontents("a.txt", b("more data"))
+        self.assertNotEqual(self.fs.gethash("a.txt", "sha1"), digest)
+        self.assertEqual(len(hashed), 2)
+        self.assertEqual(self.fs.listdir(), ["a.txt"])
+
+
+class TestHashCacheFSMemory(TestHashCacheFS):
+
+    persistent = False
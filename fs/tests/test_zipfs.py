@@ -10,9 +10,12 @@ import random
 import zipfile
 import tempfile
 import shutil
+import zlib
+import hashlib
 
 import fs.tests
 from fs.path import *
+from fs.errors import ResourceNotFoundError
 from fs import zipfs
 
 from six import PY3, b
@@ -67,6 +70,12 @@ class TestReadZipFS(unittest.TestCase):
         check_contents("1.txt", b("1"))
         check_contents("foo/bar/baz.txt", b("baz"))
 
+    def test_gethash(self):
+        self.assertEqual(self.fs.gethash("a.txt", "crc32"),
+                         "%08x" % (zlib.crc32(b("Hello, World!")) & 0xffffffff))
+        self.assertEqual(self.fs.gethash("foo/bar/baz.txt", "md5"), hashlib.md5(b("baz")).hexdigest())
+        self.assertRaises(ResourceNotFoundError, self.fs.gethash, "nope.txt", "crc32")
+
     def test_is(self):
         self.assertTrue(self.fs.isfile('a.txt'))
         self.assertTrue(self.fs.isfile('1.txt'))
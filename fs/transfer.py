@@ -0,0 +1,371 @@
+"""
+fs.transfer
+===========
+
+Copies and moves files between filesystems, several files at a time.
+
+Copying a directory tree one file after another is bound by latency when
+either filesystem is remote, as each file waits for the previous one to be
+read and written. A :py:class:`Transfer` copies files on a pool of worker
+threads, so that reads and writes overlap across files, while the source is
+walked (and destination directories created) ahead of the copies. The
+amount of file data in flight is bounded, so a tree of large files doesn't
+exhaust memory on filesystems that buffer whole files.
+
+:py:func:`fs.utils.copydir`, :py:func:`fs.utils.movedir`,
+:py:func:`fs.utils.copydir_progress` and the ``fscp`` / ``fsmv`` commands
+are built on this module. A Transfer may also be used directly, to copy a
+number of files and directories as a batch::
+
+    from fs.transfer import Transfer
+
+    with Transfer(workers=8) as transfer:
+        transfer.add_dir(osfs, 'photos', s3fs, 'backup/photos')
+        transfer.add_file(osfs, 'index.html', s3fs, 'backup/index.html')
+
+"""
+
+__all__ = ['Transfer',
+           'DEFAULT_WORKERS',
+           'DEFAULT_MAX_BYTES_IN_FLIGHT']
+
+import threading
+
+from fs.base import FS
+from fs.errors import FSError, DestinationExistsError, ResourceInvalidError, ResourceNotFoundError
+from fs.executor import BoundedExecutor
+from fs.path import abspath, normpath, pathjoin, relpath, frombase
+from fs.walk import ParallelWalker
+
+
+#: The default number of files copied at once
+DEFAULT_WORKERS = 4
+
+#: The default limit on the size of the files being copied at once
+DEFAULT_MAX_BYTES_IN_FLIGHT = 64 * 1024 * 1024
+
+
+class _ByteBudget(object):
+    """Limits the total size of the files being copied at once.
+
+    A file larger than the limit is copied on its own.
+
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self._cond = threading.Condition(threading.Lock())
+
+    def acquire(self, size):
+        size = min(size, self.limit)
+        with self._cond:
+            while self.in_flight and self.in_flight + size > self.limit:
+                self._cond.wait()
+            self.in_flight += size
+        return size
+
+    def release(self, size):
+        with self._cond:
+            self.in_flight -= size
+            self._cond.notify_all()
+
+
+def copy_file(src_fs, src_path, dst_fs, dst_path, overwrite=True, chunk_size=64*1024):
+    """Copies a file between filesystems, without holding either lock for the
+    duration of the copy.
+
+    Files are copied within a filesystem with its :py:meth:`~fs.base.FS.copy`
+    method, and by the kernel if both have a system path.
+
+    """
+    if src_fs is dst_fs:
+        src_fs.copy(src_path, dst_path, overwrite=overwrite, chunk_size=chunk_size)
+        return
+    if not overwrite and dst_fs.exists(dst_path):
+        raise DestinationExistsError(dst_path)
+    src_syspath = src_fs.getsyspath(src_path, allow_none=True)
+    dst_syspath = dst_fs.getsyspath(dst_path, allow_none=True)
+    if src_syspath is not None and dst_syspath is not None:
+        FS._shutil_copyfile(src_syspath, dst_syspath)
+        return
+    with src_fs.open(src_path, 'rb') as src_file:
+        dst_fs.setcontents(dst_path, src_file, chunk_size=chunk_size)
+
+
+def move_file(src_fs, src_path, dst_fs, dst_path, overwrite=True, chunk_size=64*1024):
+    """Moves a file between filesystems, without holding either lock for the
+    duration of the move."""
+    if src_fs is dst_fs:
+        src_fs.move(src_path, dst_path, overwrite=overwrite, chunk_size=chunk_size)
+        return
+    if not overwrite and dst_fs.exists(dst_path):
+        raise DestinationExistsError(dst_path)
+    src_syspath = src_fs.getsyspath(src_path, allow_none=True)
+    dst_syspath = dst_fs.getsyspath(dst_path, allow_none=True)
+    if src_syspath is not None and dst_syspath is not None:
+        FS._shutil_movefile(src_syspath, dst_syspath)
+        return
+    copy_file(src_fs, src_path, dst_fs, dst_path, overwrite=True, chunk_size=chunk_size)
+    src_fs.remove(src_path)
+
+
+class Transfer(object):
+    """Copies (or moves) files and directories between filesystems, on a
+    pool of worker threads.
+
+    Files and directories are added with :py:meth:`add_file` and
+    :py:meth:`add_dir`, which start copying straight away; :py:meth:`wait`
+    blocks until everything has been copied. Used as a context manager, the
+    transfer is waited for at the end of the ``with`` block (or cancelled, if
+    the block raises an exception).
+
+    If either filesystem doesn't report the *thread_safe* meta value, or
+    `workers` is 1, files are copied one at a time in the calling thread.
+
+    :param workers: the number of files to copy at once
+    :param max_bytes_in_flight: the limit on the total size of the files being
+        copied at once
+    :param move: if True, move files rather than copy them, and remove the
+        source directories added with :py:meth:`add_dir` once their files have
+        been moved
+    :param overwrite: if True, existing files in the destination are replaced,
+        otherwise :py:class:`~fs.errors.DestinationExistsError` is raised
+    :param ignore_errors: if True, files that fail to copy are skipped;
+        otherwise the transfer stops at the first error, which is raised by
+        :py:meth:`wait`
+    :param chunk_size: the size of chunks to use when copying files a chunk
+        at a time
+    :param on_file: a callable called with (src_fs, src_path, dst_fs,
+        dst_path, size) after each file is copied, where size is the size of
+        the file or None if it isn't known. Calls are made one at a time,
+        from the worker threads.
+    :param on_dir: a callable called with (dst_fs, dst_path) after each
+        directory is created
+
+    """
+
+    def __init__(self,
+                 workers=DEFAULT_WORKERS,
+                 max_bytes_in_flight=DEFAULT_MAX_BYTES_IN_FLIGHT,
+                 move=False,
+                 overwrite=True,
+                 ignore_errors=False,
+                 chunk_size=64*1024,
+                 on_file=None,
+                 on_dir=None):
+        self.workers = max(1, workers)
+        self.move = move
+        self.overwrite = overwrite
+        self.ignore_errors = ignore_errors
+        self.chunk_size = chunk_size
+        self.on_file = on_file
+        self.on_dir = on_dir
+
+        #: The number of files found so far
+        self.files_found = 0
+        #: The number of files copied so far
+        self.files_done = 0
+        #: The number of bytes copied so far, for files of known size
+        self.bytes_done = 0
+        #: Errors ignored, as a list of (src_path, exception)
+        self.errors = []
+
+        self._budget = _ByteBudget(max_bytes_in_flight)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._error = None
+        self._cancelled = False
+        self._move_roots = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.cancel()
+        else:
+            self.wait()
+
+    def _is_parallel(self, src_fs, dst_fs):
+        return (self.workers > 1 and
+                src_fs.getmeta('thread_safe', False) and
+                dst_fs.getmeta('thread_safe', False))
+
+    def _check(self):
+        if self._error is not None or self._cancelled:
+            raise _Stopped()
+
+    def _copy(self, src_fs, src_path, dst_fs, dst_path, size):
+        try:
+            if self._error is not None or self._cancelled:
+                return
+            if self.move:
+                move_file(src_fs, src_path, dst_fs, dst_path, overwrite=self.overwrite, chunk_size=self.chunk_size)
+            else:
+                copy_file(src_fs, src_path, dst_fs, dst_path, overwrite=self.overwrite, chunk_size=self.chunk_size)
+        except FSError as e:
+            with self._lock:
+                if self.ignore_errors:
+                    self.errors.append((src_path, e))
+                elif self._error is None:
+                    self._error = e
+            return
+        except BaseException as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+            return
+        with self._lock:
+            self.files_done += 1
+            self.bytes_done += size or 0
+            if self.on_file is not None:
+                self.on_file(src_fs, src_path, dst_fs, dst_path, size)
+
+    def _submit(self, src_fs, src_path, dst_fs, dst_path, size, parallel):
+        self._check()
+        with self._lock:
+            self.files_found += 1
+        if not parallel:
+            self._copy(src_fs, src_path, dst_fs, dst_path, size)
+            self._check()
+            return
+        reserved = self._budget.acquire(size if size is not None else self.chunk_size)
+        self._check_or_release(reserved)
+
+        def copy():
+            try:
+                self._copy(src_fs, src_path, dst_fs, dst_path, size)
+            finally:
+                self._budget.release(reserved)
+
+        if self._executor is None:
+            self._executor = BoundedExecutor(max_workers=self.workers, max_queued=self.workers)
+        self._executor.submit(copy)
+
+    def _check_or_release(self, reserved):
+        try:
+            self._check()
+        except _Stopped:
+            self._budget.release(reserved)
+            raise
+
+    def add_file(self, src_fs, src_path, dst_fs, dst_path):
+        """Copies a file.
+
+        :param src_fs: the source filesystem
+        :param src_path: the path of the file to copy
+        :param dst_fs: the destination filesystem
+        :param dst_path: the path to copy the file to
+
+        """
+        parallel = self._is_parallel(src_fs, dst_fs)
+        size = None
+        if parallel:
+            try:
+                size = src_fs.getsize(src_path)
+            except FSError:
+                pass
+        try:
+            self._submit(src_fs, src_path, dst_fs, dst_path, size, parallel)
+        except _Stopped:
+            pass
+
+    def add_dir(self, src_fs, src_path, dst_fs, dst_path):
+        """Copies the contents of a directory.
+
+        Directories are created in the destination as the source is walked,
+        before the files they contain are copied.
+
+        :param src_fs: the source filesystem
+        :param src_path: the path of the directory to copy
+        :param dst_fs: the destination filesystem
+        :param dst_path: the path to copy the directory contents to (it will
+            be created if it doesn't exist)
+
+        """
+        src_path = abspath(normpath(src_path))
+        dst_path = abspath(normpath(dst_path))
+        if not src_fs.isdir(src_path):
+            if src_fs.isfile(src_path):
+                raise ResourceInvalidError(src_path, msg="Source is not a directory: %(path)s")
+            raise ResourceNotFoundError(src_path)
+        parallel = self._is_parallel(src_fs, dst_fs)
+        root_errors = len(self.errors)
+        #  Sizes are only needed to budget concurrent copies
+        if parallel:
+            walk = ParallelWalker(src_fs, workers=self.workers)._walk(src_path, info=True)
+        else:
+            walk = src_fs._walk(src_path)
+        try:
+            self._check()
+            dst_fs.makedir(dst_path, allow_recreate=True, recursive=True)
+            for current_path, dir_entries, file_entries in walk:
+                current_dst_path = pathjoin(dst_path, relpath(frombase(src_path, abspath(current_path))))
+                for entry in dir_entries:
+                    name = entry[0] if parallel else entry
+                    self._check()
+                    dir_dst_path = pathjoin(current_dst_path, name)
+                    dst_fs.makedir(dir_dst_path, allow_recreate=True)
+                    if self.on_dir is not None:
+                        self.on_dir(dst_fs, dir_dst_path)
+                for entry in file_entries:
+                    if parallel:
+                        name, info = entry
+                        size = info.get('size')
+                    else:
+                        name = entry
+                        size = None
+                    self._submit(src_fs, pathjoin(current_path, name),
+                                 dst_fs, pathjoin(current_dst_path, name),
+                                 size, parallel)
+        except _Stopped:
+            return
+        except FSError as e:
+            if not self.ignore_errors:
+                raise
+            with self._lock:
+                self.errors.append((src_path, e))
+        if self.move:
+            self._move_roots.append((src_fs, src_path, root_errors))
+
+    def cancel(self):
+        """Stops copying files that haven't been started, and waits for the
+        files being copied to finish."""
+        self._cancelled = True
+        self._join()
+
+    def _join(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def wait(self):
+        """Waits for the files that have been added to be copied.
+
+        If `move` is True, this also removes the source directories added with
+        :py:meth:`add_dir`, unless a file in one of them failed to move.
+
+        :raises: the first error, if the transfer stopped because of one
+
+        """
+        self._join()
+        if self._error is not None:
+            raise self._error
+        if self._cancelled:
+            return
+        move_roots = self._move_roots
+        self._move_roots = []
+        for src_fs, src_path, root_errors in move_roots:
+            if any(path == src_path or path.startswith(src_path.rstrip('/') + '/')
+                   for path, _error in self.errors[root_errors:]):
+                continue
+            if src_path == '/':
+                for name in src_fs.listdir('/', dirs_only=True):
+                    src_fs.removedir(pathjoin('/', name), force=True)
+            else:
+                src_fs.removedir(src_path, force=True)
+
+
+class _Stopped(Exception):
+    """Raised internally to stop adding files once the transfer has stopped."""
@@ -12,6 +12,8 @@ __all__ = ['copyfile',
            'movefile',
            'movedir',
            'copydir',
+           'syncdir',
+           'SyncPlan',
            'countbytes',
            'isfile',
            'isdir',
@@ -22,13 +24,18 @@ __all__ = ['copyfile',
 import os
 import sys
 import stat
+import json
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 import six
 from six import PY3
 
-from fs.mountfs import MountFS
-from fs.path import pathjoin
-from fs.errors import DestinationExistsError, RemoveRootError
-from fs.base import FS
+from fs.path import pathjoin, pathcombine, abspath, normpath, relpath, dirname, recursepath
+from fs.errors import FSError, DestinationExistsError, RemoveRootError, ResourceNotFoundError
+from fs.base import FS, _make_hasher
+from fs import iotools
+from fs.transfer import Transfer, DEFAULT_WORKERS, DEFAULT_MAX_BYTES_IN_FLIGHT
+from fs.walk import ParallelWalker
 
 
 def copyfile(src_fs, src_path, dst_fs, dst_path, overwrite=True, chunk_size=64*1024):
@@ -96,12 +103,7 @@ def copyfile_non_atomic(src_fs, src_path, dst_fs, dst_path, overwrite=True, chun
     try:
         src = src_fs.open(src_path, 'rb')
         dst = dst_fs.open(dst_path, 'wb')
-        write = dst.write
-        read = src.read
-        chunk = read(chunk_size)
-        while chunk:
-            write(chunk)
-            chunk = read(chunk_size)
+        iotools.copy_file_data(src, dst, chunk_size)
     finally:
         if src is not None:
             src.close()
@@ -178,12 +180,7 @@ def movefile_non_atomic(src_fs, src_path, dst_fs, dst_path, overwrite=True, chun
         # Chunk copy
         src = src_fs.open(src_path, 'rb')
         dst = dst_fs.open(dst_path, 'wb')
-        write = dst.write
-        read = src.read
-        chunk = read(chunk_size)
-        while chunk:
-            write(chunk)
-            chunk = read(chunk_size)
+        iotools.copy_file_data(src, dst, chunk_size)
     except:
         raise
     else:
@@ -195,73 +192,77 @@ def movefile_non_atomic(src_fs, src_path, dst_fs, dst_path, overwrite=True, chun
             dst.close()
 
 
-def movedir(fs1, fs2, create_destination=True, ignore_errors=False, chunk_size=64*1024):
+def _transfer_args(fs1, fs2, create_destination):
+    """Gets (src_fs, src_path, dst_fs, dst_path) for the directory copy functions."""
+    if isinstance(fs1, tuple):
+        src_fs, src_path = fs1
+    else:
+        src_fs, src_path = fs1, '/'
+    if isinstance(fs2, tuple):
+        dst_fs, dst_path = fs2
+        if not create_destination and not dst_fs.isdir(dst_path):
+            raise ResourceNotFoundError(dst_path)
+    else:
+        dst_fs, dst_path = fs2, '/'
+    return src_fs, src_path, dst_fs, dst_path
+
+
+def movedir(fs1, fs2, create_destination=True, ignore_errors=False, chunk_size=64*1024,
+            workers=DEFAULT_WORKERS, max_bytes_in_flight=DEFAULT_MAX_BYTES_IN_FLIGHT):
     """Moves contents of a directory from one filesystem to another.
 
+    Files are moved several at a time (see :py:class:`fs.transfer.Transfer`).
+    The source directory is removed once its contents have been moved, unless
+    `ignore_errors` is True and a file failed to move.
+
     :param fs1: A tuple of (<filesystem>, <directory path>)
     :param fs2: Destination filesystem, or a tuple of (<filesystem>, <directory path>)
     :param create_destination: If True, the destination will be created if it doesn't exist
     :param ignore_errors: If True, exceptions from file moves are ignored
     :param chunk_size: Size of chunks to move if a simple copy is used
+    :param workers: The number of files to move at once
+    :param max_bytes_in_flight: The limit on the total size of the files being moved at once
 
     """
     if not isinstance(fs1, tuple):
         raise ValueError("first argument must be a tuple of (<filesystem>, <path>)")
+    if fs1[1] in ('', '/'):
+        raise RemoveRootError(fs1[1])
 
-    fs1, dir1 = fs1
-    parent_fs1 = fs1
-    parent_dir1 = dir1
-    fs1 = fs1.opendir(dir1)
-
-    if parent_dir1 in ('', '/'):
-        raise RemoveRootError(dir1)
-
-    if isinstance(fs2, tuple):
-        fs2, dir2 = fs2
-        if create_destination:
-            fs2.makedir(dir2, allow_recreate=True, recursive=True)
-        fs2 = fs2.opendir(dir2)
-
-    mount_fs = MountFS(auto_close=False)
-    mount_fs.mount('src', fs1)
-    mount_fs.mount('dst', fs2)
-
-    mount_fs.copydir('src', 'dst',
-                     overwrite=True,
-                     ignore_errors=ignore_errors,
-                     chunk_size=chunk_size)
-    parent_fs1.removedir(parent_dir1, force=True)
+    src_fs, src_path, dst_fs, dst_path = _transfer_args(fs1, fs2, create_destination)
+    with Transfer(workers=workers,
+                  max_bytes_in_flight=max_bytes_in_flight,
+                  move=True,
+                  ignore_errors=ignore_errors,
+                  chunk_size=chunk_size) as transfer:
+        transfer.add_dir(src_fs, src_path, dst_fs, dst_path)
 
 
-def copydir(fs1, fs2, create_destination=True, ignore_errors=False, chunk_size=64*1024):
+def copydir(fs1, fs2, create_destination=True, ignore_errors=False, chunk_size=64*1024,
+            workers=DEFAULT_WORKERS, max_bytes_in_flight=DEFAULT_MAX_BYTES_IN_FLIGHT):
     """Copies contents of a directory from one filesystem to another.
 
+    Files are copied several at a time (see :py:class:`fs.transfer.Transfer`).
+
     :param fs1: Source filesystem, or a tuple of (<filesystem>, <directory path>)
     :param fs2: Destination filesystem, or a tuple of (<filesystem>, <directory path>)
     :param create_destination: If True, the destination will be created if it doesn't exist
     :param ignore_errors: If True, exceptions from file moves are ignored
     :param chunk_size: Size of chunks to move if a simple copy is used
+    :param workers: The number of files to copy at once
+    :param max_bytes_in_flight: The limit on the total size of the files being copied at once
 
     """
-    if isinstance(fs1, tuple):
-        fs1, dir1 = fs1
-        fs1 = fs1.opendir(dir1)
-    if isinstance(fs2, tuple):
-        fs2, dir2 = fs2
-        if create_destination:
-            fs2.makedir(dir2, allow_recreate=True, recursive=True)
-        fs2 = fs2.opendir(dir2)
+    src_fs, src_path, dst_fs, dst_path = _transfer_args(fs1, fs2, create_destination)
+    with Transfer(workers=workers,
+                  max_bytes_in_flight=max_bytes_in_flight,
+                  ignore_errors=ignore_errors,
+                  chunk_size=chunk_size) as transfer:
+        transfer.add_dir(src_fs, src_path, dst_fs, dst_path)
 
-    mount_fs = MountFS(auto_close=False)
-    mount_fs.mount('src', fs1)
-    mount_fs.mount('dst', fs2)
-    mount_fs.copydir('src', 'dst',
-                     overwrite=True,
-                     ignore_errors=ignore_errors,
-                     chunk_size=chunk_size)
 
-
-def copydir_progress(progress_callback, fs1, fs2, create_destination=True, ignore_errors=False, chunk_size=64*1024):
+def copydir_progress(progress_callback, fs1, fs2, create_destination=True, ignore_errors=False, chunk_size=64*1024,
+                     workers=DEFAULT_WORKERS, max_bytes_in_flight=DEFAULT_MAX_BYTES_IN_FLIGHT):
     """
     Copies the contents of a directory from one fs to another, with a callback function to display progress.
 
@@ -270,15 +271,13 @@ def copydir_progress(progress_callback, fs1, fs2, create_destination=True, ignor
     `num_steps` is the number of steps in the copy process, and `step` is the current step. `num_steps` may be None if the number
     of steps is still being calculated.
 
+    Files are copied while the source is still being walked, so `step` may
+    increase while `num_steps` is None.
+
     """
-    if isinstance(fs1, tuple):
-        fs1, dir1 = fs1
-        fs1 = fs1.opendir(dir1)
-    if isinstance(fs2, tuple):
-        fs2, dir2 = fs2
-        if create_destination:
-            fs2.makedir(dir2, allow_recreate=True, recursive=True)
-        fs2 = fs2.opendir(dir2)
+    src_fs, src_path, dst_fs, dst_path = _transfer_args(fs1, fs2, create_destination)
+
+    num_steps = [None]
 
     def do_callback(step, num_steps):
         try:
@@ -286,29 +285,307 @@ def copydir_progress(progress_callback, fs1, fs2, create_destination=True, ignor
         except:
             pass
 
+    def on_file(src_fs, src_path, dst_fs, dst_path, size):
+        do_callback(transfer.files_done, num_steps[0])
+
     do_callback(0, None)
+    with Transfer(workers=workers,
+                  max_bytes_in_flight=max_bytes_in_flight,
+                  ignore_errors=ignore_errors,
+                  chunk_size=chunk_size,
+                  on_file=on_file) as transfer:
+        transfer.add_dir(src_fs, src_path, dst_fs, dst_path)
+        num_steps[0] = transfer.files_found
+    do_callback(transfer.files_done, num_steps[0])
 
-    file_count = 0
-    copy_paths = []
-    for dir_path, file_paths in fs1.walk():
-        copy_paths.append((dir_path, file_paths))
-        file_count += len(file_paths)
-        do_callback(0, file_count)
 
-    step = 0
-    for i, (dir_path, file_paths) in enumerate(copy_paths):
-        try:
-            fs2.makedir(dir_path, allow_recreate=True)
-            for path in file_paths:
-                copy_path = pathjoin(dir_path, path)
-                with fs1.open(copy_path, 'rb') as src_file:
-                    fs2.setcontents(copy_path, src_file, chunk_size=chunk_size)
-                step += 1
-        except:
-            if ignore_errors:
+class SyncPlan(object):
+    """The changes :py:func:`syncdir` makes to bring a destination directory
+    up to date with a source directory.
+
+    Paths are relative to the source and destination directories, and start
+    with a slash. Changes are applied in the order of the attributes below
+    (and of iteration over the plan).
+
+    """
+
+    #: The plan's actions, in the order they are applied
+    actions = ('remove_dirs', 'remove', 'make_dirs', 'copy', 'update')
+
+    def __init__(self):
+        #: Directories to remove from the destination, with their contents
+        self.remove_dirs = []
+        #: Files to remove from the destination
+        self.remove = []
+        #: Directories to create in the destination
+        self.make_dirs = []
+        #: Files that aren't in the destination
+        self.copy = []
+        #: Files that have changed since they were copied to the destination
+        self.update = []
+        #: The number of files that haven't changed
+        self.unchanged = 0
+        #: Errors ignored while syncing, as a list of (path, exception)
+        self.errors = []
+
+    def __iter__(self):
+        """Yields a tuple of (action, path) for each change."""
+        for action in self.actions:
+            for path in getattr(self, action):
+                yield (action, path)
+
+    def __len__(self):
+        return sum(len(getattr(self, action)) for action in self.actions)
+
+    def __repr__(self):
+        return "<SyncPlan: %s, %d unchanged>" % (", ".join("%d %s" % (len(getattr(self, action)), action)
+                                                          for action in self.actions),
+                                                self.unchanged)
+
+    def _dump(self):
+        plan = dict((action, getattr(self, action)) for action in self.actions)
+        plan['unchanged'] = self.unchanged
+        return plan
+
+    @classmethod
+    def _load(cls, data):
+        plan = cls()
+        for action in cls.actions:
+            setattr(plan, action, list(data[action]))
+        plan.unchanged = data['unchanged']
+        return plan
+
+
+def _sync_walk(fs, path, workers):
+    """Walks a directory tree, and yields (path, dir entries, file entries)
+    for each directory, with paths relative to `path`."""
+    prefix_length = len(path.rstrip('/'))
+    walker = ParallelWalker(fs, workers=workers)
+    for current_path, dir_entries, file_entries in walker._walk(path, info=True):
+        yield (abspath(current_path)[prefix_length:] or '/', dir_entries, file_entries)
+
+
+def _sync_index(fs, path, workers):
+    """Maps each path in a directory tree, relative to `path`, on to a tuple
+    of (is_dir, size, modified_time)."""
+    index = {}
+    for rel_path, dir_entries, file_entries in _sync_walk(fs, path, workers):
+        for name, _info in dir_entries:
+            index[pathcombine(rel_path, name)] = (True, None, None)
+        for name, info in file_entries:
+            index[pathcombine(rel_path, name)] = (False, info.get('size'), info.get('modified_time'))
+    return index
+
+
+def _is_newer(src_time, dst_time):
+    if src_time is None or dst_time is None:
+        return False
+    try:
+        return src_time > dst_time
+    except TypeError:
+        #  Can't compare naive and aware datetimes
+        return False
+
+
+def _plan_sync(src_fs, src_path, dst_fs, dst_path, compare, delete, workers, chunk_size):
+    plan = SyncPlan()
+    if dst_fs.isdir(dst_path):
+        dst_index = _sync_index(dst_fs, dst_path, workers)
+    else:
+        dst_index = {}
+
+    same_size = []
+    for rel_path, dir_entries, file_entries in _sync_walk(src_fs, src_path, workers):
+        for name, _info in dir_entries:
+            path = pathcombine(rel_path, name)
+            dst_entry = dst_index.pop(path, None)
+            if dst_entry is None:
+                plan.make_dirs.append(path)
+            elif not dst_entry[0]:
+                plan.remove.append(path)
+                plan.make_dirs.append(path)
+        for name, info in file_entries:
+            path = pathcombine(rel_path, name)
+            dst_entry = dst_index.pop(path, None)
+            if dst_entry is None:
+                plan.copy.append(path)
+            elif dst_entry[0]:
+                plan.remove_dirs.append(path)
+                plan.copy.append(path)
+            elif info.get('size') != dst_entry[1]:
+                plan.update.append(path)
+            elif compare == 'hash':
+                same_size.append(path)
+            elif compare == 'size+mtime' and _is_newer(info.get('modified_time'), dst_entry[2]):
+                plan.update.append(path)
+            else:
+                plan.unchanged += 1
+
+    if same_size:
+        def differs(path):
+            return (src_fs.gethash(pathjoin(src_path, relpath(path)), 'md5', chunk_size) !=
+                    dst_fs.gethash(pathjoin(dst_path, relpath(path)), 'md5', chunk_size))
+        if not (src_fs.getmeta('thread_safe', False) and dst_fs.getmeta('thread_safe', False)):
+            workers = 1
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for path, changed in zip(same_size, executor.map(differs, same_size)):
+                if changed:
+                    plan.update.append(path)
+                else:
+                    plan.unchanged += 1
+
+    if delete:
+        #  Sorted, so that directories come before their contents
+        removed_dirs = set(plan.remove_dirs)
+        for path in sorted(dst_index):
+            if any(parent in removed_dirs for parent in recursepath(dirname(path))):
                 continue
-            raise
-        do_callback(step, file_count)
+            if dst_index[path][0]:
+                plan.remove_dirs.append(path)
+                removed_dirs.add(path)
+            else:
+                plan.remove.append(path)
+    return plan
+
+
+def _load_sync_checkpoint(checkpoint, header):
+    """Gets the plan and the files already copied from a checkpoint file, or
+    (None, None) if there is no checkpoint for this sync."""
+    try:
+        with open(checkpoint, 'r') as f:
+            if json.loads(f.readline()) != header:
+                return None, None
+            plan = SyncPlan._load(json.loads(f.readline()))
+            done = set()
+            for line in f:
+                try:
+                    done.add(json.loads(line))
+                except ValueError:
+                    #  Partially written before the sync was interrupted
+                    break
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return None, None
+    return plan, done
+
+
+def syncdir(fs1, fs2, compare='size+mtime', delete=False, dry_run=False, checkpoint=None,
+            create_destination=True, ignore_errors=False, chunk_size=64*1024,
+            workers=DEFAULT_WORKERS, max_bytes_in_flight=DEFAULT_MAX_BYTES_IN_FLIGHT):
+    """Updates a directory so that it contains the same files as another,
+    copying only the files that are new or have changed.
+
+    Both trees are walked once (see :py:class:`fs.walk.ParallelWalker`), and
+    files are compared with the info from the directory listings, so
+    unchanged files aren't opened unless `compare` is ``'hash'``. Changed
+    files are copied several at a time (see :py:class:`fs.transfer.Transfer`).
+
+    The `compare` argument selects how files that exist in both directories
+    are compared:
+
+     * ``'size'`` -- a file has changed if its size differs
+     * ``'size+mtime'`` -- a file has changed if its size differs, or if the
+       source file was modified after the destination file (which is the
+       case for files modified after they were last synced). Only sizes are
+       compared where either filesystem doesn't report modification times
+     * ``'hash'`` -- a file has changed if its size or the hash of its
+       contents differ
+
+    Where a file in one directory is a directory in the other, the destination
+    is replaced, even if `delete` is False.
+
+    If `checkpoint` is given, the plan and the files copied so far are
+    recorded in that (system) file, which is removed when the sync completes.
+    If the sync is interrupted, calling syncdir with the same arguments
+    resumes it from the checkpoint, rather than comparing the directories
+    again.
+
+    :param fs1: Source filesystem, or a tuple of (<filesystem>, <directory path>)
+    :param fs2: Destination filesystem, or a tuple of (<filesystem>, <directory path>)
+    :param compare: How to compare files: ``'size'``, ``'size+mtime'`` or ``'hash'``
+    :param delete: If True, files and directories in the destination that
+        aren't in the source are removed
+    :param dry_run: If True, return the plan without changing the destination
+    :param checkpoint: A system path of a file to record progress in
+    :param create_destination: If True, the destination will be created if it doesn't exist
+    :param ignore_errors: If True, errors from copying or removing files are
+        recorded in the plan's `errors` list, rather than raised
+    :param chunk_size: Size of chunks to copy if a simple copy is used
+    :param workers: The number of files to copy (or directories to list) at once
+    :param max_bytes_in_flight: The limit on the total size of the files being copied at once
+    :rtype: :py:class:`SyncPlan`
+
+    """
+    if compare not in ('size', 'size+mtime', 'hash'):
+        raise ValueError("compare must be 'size', 'size+mtime' or 'hash'")
+    src_fs, src_path, dst_fs, dst_path = _transfer_args(fs1, fs2, create_destination)
+    src_path = abspath(normpath(src_path))
+    dst_path = abspath(normpath(dst_path))
+    if not src_fs.isdir(src_path):
+        raise ResourceNotFoundError(src_path, msg="Source directory not found: %(path)s")
+
+    plan = done = None
+    if checkpoint is not None and not dry_run:
+        header = {'src': [str(src_fs), src_path],
+                  'dst': [str(dst_fs), dst_path],
+                  'compare': compare,
+                  'delete': delete}
+        plan, done = _load_sync_checkpoint(checkpoint, header)
+    if plan is None:
+        plan = _plan_sync(src_fs, src_path, dst_fs, dst_path, compare, delete, workers, chunk_size)
+        done = set()
+        if dry_run:
+            return plan
+        if checkpoint is not None:
+            with open(checkpoint, 'w') as f:
+                f.write(json.dumps(header) + '\n')
+                f.write(json.dumps(plan._dump()) + '\n')
+
+    def dst(path):
+        return pathjoin(dst_path, relpath(path))
+
+    def apply(func, path, *args, **kwargs):
+        try:
+            func(dst(path), *args, **kwargs)
+        except FSError as e:
+            if not ignore_errors:
+                raise
+            plan.errors.append((path, e))
+
+    #  Changes may have been made before the sync was interrupted
+    for path in plan.remove_dirs:
+        if dst_fs.isdir(dst(path)):
+            apply(dst_fs.removedir, path, force=True)
+    for path in plan.remove:
+        if dst_fs.isfile(dst(path)):
+            apply(dst_fs.remove, path)
+    dst_fs.makedir(dst_path, allow_recreate=True, recursive=True)
+    for path in plan.make_dirs:
+        apply(dst_fs.makedir, path, allow_recreate=True)
+
+    checkpoint_file = open(checkpoint, 'a') if checkpoint is not None else None
+    prefix_length = len(src_path.rstrip('/'))
+
+    def on_file(src_fs, file_path, dst_fs, dst_file_path, size):
+        if checkpoint_file is not None:
+            checkpoint_file.write(json.dumps(file_path[prefix_length:]) + '\n')
+            checkpoint_file.flush()
+
+    try:
+        with Transfer(workers=workers,
+                      max_bytes_in_flight=max_bytes_in_flight,
+                      ignore_errors=ignore_errors,
+                      chunk_size=chunk_size,
+                      on_file=on_file) as transfer:
+            for path in itertools.chain(plan.copy, plan.update):
+                if path not in done:
+                    transfer.add_file(src_fs, pathjoin(src_path, relpath(path)), dst_fs, dst(path))
+    finally:
+        if checkpoint_file is not None:
+            checkpoint_file.close()
+    plan.errors.extend((path[prefix_length:], e) for path, e in transfer.errors)
+    if checkpoint is not None:
+        os.remove(checkpoint)
+    return plan
 
 
 def remove_all(fs, path):
@@ -346,7 +623,12 @@ def countbytes(fs):
     :param fs: A filesystem object
 
     """
-    total = sum(fs.getsize(f) for f in fs.walkfiles())
+    total = 0
+    for path, info in fs.walkfilesinfo():
+        size = info.get('size')
+        if size is None:
+            size = fs.getsize(path)
+        total += size
     return total
 
 
@@ -389,20 +671,69 @@ def contains_files(fs, path='/'):
         return False
     return True
 
+def _duplicate_sizes(fs, compare_paths, batch_size=1000):
+    """Yields a tuple of (path, size) for each file to compare."""
+    if compare_paths is None:
+        # Sizes come with the directory listings, so there is no need to
+        # query each file individually
+        path_infos = fs.walkfilesinfo()
+    else:
+        def batch_infos():
+            paths = iter(compare_paths)
+            while True:
+                batch = list(itertools.islice(paths, batch_size))
+                if not batch:
+                    break
+                infos = fs.getinfo_many(batch)
+                for path in batch:
+                    if infos.get(path) is not None:
+                        yield path, infos[path]
+        path_infos = batch_infos()
+    for path, info in path_infos:
+        size = info.get('size')
+        if size is None:
+            size = fs.getsize(path)
+        yield path, size
+
+
 def find_duplicates(fs,
                     compare_paths=None,
                     quick=False,
                     signature_chunk_size=16*1024,
-                    signature_size=10*16*1024):
+                    signature_size=10*16*1024,
+                    algorithm='sha256',
+                    workers=DEFAULT_WORKERS,
+                    progress_callback=None):
     """A generator that yields the paths of duplicate files in an FS object.
     Files are considered identical if the contents are the same (dates or
     other attributes not take in to account).
 
+    Duplicates are found in stages, each of which only looks at the files
+    that could still have a duplicate after the stage before:
+
+     1. Files are grouped by size, from the directory listings
+     2. Files of the same size are grouped by a CRC-32 of their first
+        `signature_size` bytes (files no larger than that are hashed whole
+        with `algorithm` instead, and skip the last stage)
+     3. Files with the same partial hash are grouped by a hash of their
+        contents, with :py:meth:`~fs.base.FS.gethash`
+
+    Each file is read at most once per stage, by `workers` threads if the
+    filesystem is thread safe. Files of the same size are processed together,
+    a batch of sizes at a time, so memory use is bounded by the number of
+    files rather than their contents.
+
     :param fs: A filesystem object
     :param compare_paths: An iterable of paths within the FS object, or all files if omitted
     :param quick: If set to True, the quick method of finding duplicates will be used, which can potentially return false positives if the files have the same size and start with the same data. Do not use when deleting files!
-    :param signature_chunk_size: The number of bytes to read before generating a signature checksum value
-    :param signature_size: The total number of bytes read to generate a signature
+    :param signature_chunk_size: The size of chunks to read files in
+    :param signature_size: The number of bytes read from the start of each file for the partial hash
+    :param algorithm: The hash algorithm to compare contents with (see :py:meth:`~fs.base.FS.gethash`).
+        CRC-32 collides too easily to show that files are identical, so it may only be used if `quick` is True
+    :param workers: The number of files to read at once
+    :param progress_callback: If given, a callable called with (files_done, num_files) as
+        batches of files are compared, where num_files is the number of files
+        that have the same size as another file
 
     For example, the following will list all the duplicate .jpg files in "~/Pictures"::
 
@@ -413,90 +744,78 @@ def find_duplicates(fs,
         ...     print list(dups)
 
     """
+    # Validate the algorithm before walking the filesystem
+    _make_hasher(algorithm)
+    if algorithm == 'crc32' and not quick:
+        raise ValueError("crc32 can't show that files are identical; use a cryptographic hash, or quick=True")
+
+    file_sizes = {}
+    for path, size in _duplicate_sizes(fs, compare_paths):
+        file_sizes.setdefault(size, []).append(path)
+    size_groups = [(size, paths) for size, paths in file_sizes.items() if len(paths) > 1]
+    del file_sizes
+    num_files = sum(len(paths) for _size, paths in size_groups)
+
+    def partial_hash(path):
+        # A CRC is enough to rule files out, where the full hash follows
+        if quick or sizes[path] > signature_size:
+            hasher = _make_hasher('crc32')
+        else:
+            hasher = _make_hasher(algorithm)
+        hasher.update(fs.getrange(path, 0, signature_size))
+        return hasher.hexdigest()
+
+    def full_hash(path):
+        return fs.gethash(path, algorithm, signature_chunk_size)
+
+    def group_by(func, paths, executor):
+        groups = {}
+        for path, key in zip(paths, executor.map(func, paths)):
+            groups.setdefault(key, []).append(path)
+        return [group for group in groups.values() if len(group) > 1]
+
+    if not fs.getmeta('thread_safe', False):
+        workers = 1
+    # Enough files to keep every worker busy, when most sizes have few files
+    batch_size = max(1, workers) * 64
+    files_done = 0
+    if progress_callback is not None:
+        progress_callback(0, num_files)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while size_groups:
+            batch = []
+            batch_count = 0
+            while size_groups and batch_count < batch_size:
+                size, paths = size_groups.pop()
+                batch.append((size, paths))
+                batch_count += len(paths)
+
+            duplicates = []
+            partial_paths = []
+            for size, paths in batch:
+                if size == 0:
+                    duplicates.append(paths)
+                else:
+                    partial_paths.extend(paths)
+            sizes = dict((path, size) for size, paths in batch for path in paths)
+            # Paths are grouped by size as well as partial hash, as the batch
+            # holds files of several sizes
+            partial_groups = group_by(lambda path: (sizes[path], partial_hash(path)), partial_paths, executor)
+
+            full_paths = []
+            for paths in partial_groups:
+                if quick or sizes[paths[0]] <= signature_size:
+                    duplicates.append(paths)
+                else:
+                    full_paths.extend(paths)
+            duplicates.extend(group_by(lambda path: (sizes[path], full_hash(path)), full_paths, executor))
 
-    from collections import defaultdict
-    from zlib import crc32
-
-    if compare_paths is None:
-        compare_paths = fs.walkfiles()
-
-    # Create a dictionary that maps file sizes on to the paths of files with
-    # that filesize. So we can find files of the same size with a quick lookup
-    file_sizes = defaultdict(list)
-    for path in compare_paths:
-        file_sizes[fs.getsize(path)].append(path)
-
-    size_duplicates = [paths for paths in file_sizes.values() if len(paths) > 1]
-
-    signatures = defaultdict(list)
-
-    # A signature is a tuple of CRC32s for each 4x16K of the file
-    # This allows us to find potential duplicates with a dictionary lookup
-    for paths in size_duplicates:
-        for path in paths:
-            signature = []
-            fread = None
-            bytes_read = 0
-            try:
-                fread = fs.open(path, 'rb')
-                while signature_size is None or bytes_read < signature_size:
-                    data = fread.read(signature_chunk_size)
-                    if not data:
-                        break
-                    bytes_read += len(data)
-                    signature.append(crc32(data))
-            finally:
-                if fread is not None:
-                    fread.close()
-            signatures[tuple(signature)].append(path)
-
-    # If 'quick' is True then the signature comparison is adequate (although
-    # it may result in false positives)
-    if quick:
-        for paths in signatures.values():
-            if len(paths) > 1:
+            files_done += batch_count
+            if progress_callback is not None:
+                progress_callback(files_done, num_files)
+            for paths in duplicates:
                 yield paths
-        return
-
-    def identical(p1, p2):
-        """ Returns True if the contents of two files are identical. """
-        f1, f2 = None, None
-        try:
-            f1 = fs.open(p1, 'rb')
-            f2 = fs.open(p2, 'rb')
-            while True:
-                chunk1 = f1.read(16384)
-                if not chunk1:
-                    break
-                chunk2 = f2.read(16384)
-                if chunk1 != chunk2:
-                    return False
-            return True
-        finally:
-            if f1 is not None:
-                f1.close()
-            if f2 is not None:
-                f2.close()
-
-    # If we want to be accurate then we need to compare suspected duplicates
-    # byte by byte.
-    # All path groups in this loop have the same size and same signature, so are
-    # highly likely to be identical.
-    for paths in signatures.values():
-
-        while len(paths) > 1:
-
-            test_p = paths.pop()
-            dups = [test_p]
-
-            for path in paths:
-                if identical(test_p, path):
-                    dups.append(path)
-
-            if len(dups) > 1:
-                yield dups
-
-            paths = list(set(paths).difference(dups))
 
 
 def print_fs(fs,
@@ -0,0 +1,201 @@
+"""
+fs.walk
+=======
+
+Parallel directory walking.
+
+For network filesystems (S3FS, FTPFS, SFTPFS, DAVFS etc.) the time taken to
+walk a tree with :py:meth:`~fs.base.FS.walk` is dominated by the round trip
+for each directory listing. A :py:class:`ParallelWalker` lists sibling
+directories concurrently on a bounded pool of threads::
+
+    from fs.walk import ParallelWalker
+
+    walker = ParallelWalker(s3, workers=16)
+    for path in walker.walkfiles(wildcard="*.log"):
+        print(path)
+
+In ordered mode (the default) directories are yielded in the same order
+as ``walk(search="breadth")``, while listings for the directories that
+follow are fetched in the background. With ``ordered=False``, each
+directory is yielded as soon as its listing arrives.
+
+"""
+
+__all__ = ['ParallelWalker']
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from fs.path import normpath, pathcombine
+from fs.errors import ResourceNotFoundError
+from fs.glob import compile_wildcard
+
+
+class ParallelWalker(object):
+    """Walks a filesystem, listing several directories at once.
+
+    Filesystems that don't report the *thread_safe* meta value are walked
+    with a single worker thread. Filesystems that serialize access to a single
+    connection (with their lock) are still safe to walk, but will see less
+    of a speed up.
+
+    :param fs: the filesystem to walk
+    :param workers: the maximum number of directory listings in flight
+    :param ordered: if True, yield directories in the order of a breadth-first
+        :py:meth:`~fs.base.FS.walk`, otherwise yield them as they are listed
+
+    """
+
+    def __init__(self, fs, workers=8, ordered=True):
+        self.fs = fs
+        if not fs.getmeta('thread_safe', False):
+            workers = 1
+        self.workers = max(1, workers)
+        self.ordered = ordered
+
+    def walk(self, path="/", wildcard=None, dir_wildcard=None, ignore_errors=False):
+        """Walks a directory tree and yields the path of each directory and a
+        list of its files. See :py:meth:`~fs.base.FS.walk`.
+
+        :param path: root path to start walking
+        :param wildcard: if given, only return files that match this wildcard
+        :param dir_wildcard: if given, only walk directories that match the wildcard
+        :param ignore_errors: ignore any errors reading the directory
+
+        :rtype: iterator of (current_path, paths)
+
+        """
+        wildcard = compile_wildcard(wildcard)
+        for current_path, _dir_entries, file_entries in self._walk(path, dir_wildcard, ignore_errors):
+            yield (current_path, [name for name in file_entries if wildcard(name)])
+
+    def walkfiles(self, path="/", wildcard=None, dir_wildcard=None, ignore_errors=False):
+        """Like the 'walk' method, but just yields file paths.
+
+        :rtype: iterator of file paths
+
+        """
+        for current_path, files in self.walk(path, wildcard, dir_wildcard, ignore_errors):
+            for name in files:
+                yield pathcombine(current_path, name)
+
+    def walkdirs(self, path="/", wildcard=None, ignore_errors=False):
+        """Like the 'walk' method but yields directories.
+
+        :rtype: iterator of dir paths
+
+        """
+        for current_path, _dir_entries, _file_entries in self._walk(path, wildcard, ignore_errors):
+            yield current_path
+
+    def walkinfo(self, path="/", wildcard=None, dir_wildcard=None, ignore_errors=False):
+        """Like the 'walk' method, but yields a tuple of the path and info dict
+        of each directory and file. See :py:meth:`~fs.base.FS.walkinfo`.
+
+        :rtype: iterator of (path, info)
+
+        """
+        wildcard = compile_wildcard(wildcard)
+        for current_path, dir_entries, file_entries in self._walk(path, dir_wildcard, ignore_errors, info=True):
+            for name, info in dir_entries:
+                yield (pathcombine(current_path, name), info)
+            for name, info in file_entries:
+                if wildcard(name):
+                    yield (pathcombine(current_path, name), info)
+
+    def walkfilesinfo(self, path="/", wildcard=None, dir_wildcard=None, ignore_errors=False):
+        """Like the 'walkfiles' method, but yields a tuple of the file path and its info dict.
+
+        :rtype: iterator of (file path, info)
+
+        """
+        wildcard = compile_wildcard(wildcard)
+        for current_path, _dir_entries, file_entries in self._walk(path, dir_wildcard, ignore_errors, info=True):
+            for name, info in file_entries:
+                if wildcard(name):
+                    yield (pathcombine(current_path, name), info)
+
+    def _walk(self, path, dir_wildcard=None, ignore_errors=False, info=False):
+        """Yields a tuple of the path of each directory, the entries of the
+        sub-directories that will be walked and the entries of its files,
+        as :py:meth:`~fs.base.FS._walk` does for a breadth-first walk.
+
+        """
+        fs = self.fs
+        path = normpath(path)
+
+        if not fs.exists(path):
+            raise ResourceNotFoundError(path)
+
+        if info:
+            partition = fs._listdirinfo_partition
+            entry_name = lambda entry: entry[0]
+        else:
+            partition = fs._listdir_partition
+            entry_name = lambda entry: entry
+
+        def listdir_partition(path):
+            try:
+                return partition(path)
+            except ResourceNotFoundError:
+                # Could happen if another thread / process deletes something whilst we are walking
+                return [], []
+            except Exception:
+                if ignore_errors:
+                    return [], []
+                raise
+
+        dir_wildcard = compile_wildcard(dir_wildcard)
+
+        def expand(current_path, dir_entries):
+            walk_entries = []
+            walk_paths = []
+            for entry in dir_entries:
+                dir_path = pathcombine(current_path, entry_name(entry))
+                if dir_wildcard(dir_path):
+                    walk_entries.append(entry)
+                    walk_paths.append(dir_path)
+            return walk_entries, walk_paths
+
+        # At most max_pending listings are submitted ahead of the directories
+        # yielded, which keeps every worker busy without reading ahead through
+        # a wide tree. The paths waiting to be listed are queued in dirs.
+        max_pending = self.workers * 2
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        pending = {}
+        try:
+            if self.ordered:
+                dirs = [path]
+                while dirs:
+                    for dir_path in reversed(dirs[-max_pending:]):
+                        if len(pending) >= max_pending:
+                            break
+                        if dir_path not in pending:
+                            pending[dir_path] = executor.submit(listdir_partition, dir_path)
+                    current_path = dirs.pop()
+                    future = pending.pop(current_path, None)
+                    if future is None:
+                        # The listings in flight are all for later directories
+                        future = executor.submit(listdir_partition, current_path)
+                    dir_entries, file_entries = future.result()
+                    walk_entries, walk_paths = expand(current_path, dir_entries)
+                    dirs.extend(walk_paths)
+                    yield (current_path, walk_entries, file_entries)
+            else:
+                dirs = deque([path])
+                while dirs or pending:
+                    while dirs and len(pending) < max_pending:
+                        dir_path = dirs.popleft()
+                        pending[executor.submit(listdir_partition, dir_path)] = dir_path
+                    done, _not_done = wait(list(pending), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        current_path = pending.pop(future)
+                        dir_entries, file_entries = future.result()
+                        walk_entries, walk_paths = expand(current_path, dir_entries)
+                        dirs.extend(walk_paths)
+                        yield (current_path, walk_entries, file_entries)
+        finally:
+            for future in pending.values() if self.ordered else pending:
+                future.cancel()
+            executor.shutdown(wait=True)
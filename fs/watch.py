@@ -542,11 +542,12 @@ class PollingWatchableFS(WatchableFS):
         #  We assume that if the file's data changes, something in its
         #  metadata will also change; don't want to read through each file!
         #  Subdirectories will be handled by the outer polling loop.
-        for filenm in self.wrapped_fs.listdir(dirnm,files_only=True):
+        #  The info for all files is fetched with the listing, rather than
+        #  with a getinfo() call for each file.
+        for (filenm,new_info) in self.wrapped_fs.listdirinfo(dirnm,files_only=True):
             if self._poll_close_event.isSet():
                 return
             fpath = pathjoin(dirnm,filenm)
-            new_info = self.wrapped_fs.getinfo(fpath)
             try:
                 old_info = self._path_info[fpath]
             except KeyError:
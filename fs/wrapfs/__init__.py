@@ -155,6 +155,30 @@ class WrapFS(FS):
         f = self.wrapped_fs.open(self._encode(path), wmode, **kwargs)
         return self._file_wrap(f, mode)
 
+    def _wraps_file_contents(self):
+        """Check if the subclass alters file contents, in which case ranged
+        reads can't be passed through to the wrapped FS."""
+        return type(self).open is not WrapFS.open or \
+               getattr(self.__class__, '_file_wrap', None) is not getattr(WrapFS, '_file_wrap', None)
+
+    @rewrite_errors
+    def getrange(self, path, offset, length=None):
+        if self._wraps_file_contents():
+            return super(WrapFS, self).getrange(path, offset, length)
+        return self.wrapped_fs.getrange(self._encode(path), offset, length)
+
+    @rewrite_errors
+    def getranges(self, path, ranges):
+        if self._wraps_file_contents():
+            return super(WrapFS, self).getranges(path, ranges)
+        return self.wrapped_fs.getranges(self._encode(path), ranges)
+
+    @rewrite_errors
+    def gethash(self, path, algorithm='md5', chunk_size=64*1024):
+        if self._wraps_file_contents():
+            return super(WrapFS, self).gethash(path, algorithm, chunk_size)
+        return self.wrapped_fs.gethash(self._encode(path), algorithm, chunk_size)
+
     @rewrite_errors
     def setcontents(self, path, data, encoding=None, errors=None, chunk_size=64*1024):
         #  We can't pass setcontents() through to the wrapped FS if the
@@ -290,6 +314,31 @@ class WrapFS(FS):
                 nm = abspath(pathcombine(path,nm))
             yield (nm,info)
 
+    def _wraps_listings(self):
+        """Check if the subclass alters directory listings, in which case
+        they can't be partitioned by the wrapped FS."""
+        cls = type(self)
+        return any(getattr(cls, name) is not getattr(WrapFS, name)
+                   for name in ('listdir', 'ilistdir', 'listdirinfo', 'ilistdirinfo', 'isdir'))
+
+    @rewrite_errors
+    def _listdir_partition(self, path):
+        if self._wraps_listings():
+            return super(WrapFS, self)._listdir_partition(path)
+        enc_path = self._encode(path)
+        dirs, files = self.wrapped_fs._listdir_partition(enc_path)
+        return ([basename(self._decode(pathcombine(enc_path, nm))) for nm in dirs],
+                [basename(self._decode(pathcombine(enc_path, nm))) for nm in files])
+
+    @rewrite_errors
+    def _listdirinfo_partition(self, path):
+        if self._wraps_listings():
+            return super(WrapFS, self)._listdirinfo_partition(path)
+        enc_path = self._encode(path)
+        dirs, files = self.wrapped_fs._listdirinfo_partition(enc_path)
+        return ([(basename(self._decode(pathcombine(enc_path, nm))), info) for (nm, info) in dirs],
+                [(basename(self._decode(pathcombine(enc_path, nm))), info) for (nm, info) in files])
+
     @rewrite_errors
     def walk(self,path="/",wildcard=None,dir_wildcard=None,search="breadth",ignore_errors=False):
         if dir_wildcard is not None:
@@ -333,6 +382,36 @@ class WrapFS(FS):
                         continue
                 yield filepath
 
+    @rewrite_errors
+    def walkinfo(self,path="/",wildcard=None,dir_wildcard=None,search="breadth",ignore_errors=False):
+        if wildcard is not None or dir_wildcard is not None:
+            #  If there is a wildcard, fall back to the default impl
+            #  that uses listdirinfo(), since the wildcard only applies
+            #  to files and we can't tell them apart here.
+            for item in super(WrapFS,self).walkinfo(path,wildcard,dir_wildcard,search,ignore_errors):
+                yield item
+        else:
+            for (p,info) in self.wrapped_fs.walkinfo(self._encode(path),search=search,ignore_errors=ignore_errors):
+                yield (abspath(self._decode(p)),info)
+
+    @rewrite_errors
+    def walkfilesinfo(self,path="/",wildcard=None,dir_wildcard=None,search="breadth",ignore_errors=False):
+        if dir_wildcard is not None:
+            #  If there is a dir_wildcard, fall back to the default impl
+            #  that uses listdirinfo().
+            for item in super(WrapFS,self).walkfilesinfo(path,wildcard,dir_wildcard,search,ignore_errors):
+                yield item
+        else:
+            if wildcard is not None and not callable(wildcard):
+                wildcard_re = re.compile(fnmatch.translate(wildcard))
+                wildcard = lambda fn:bool (wildcard_re.match(fn))
+            for (filepath,info) in self.wrapped_fs.walkfilesinfo(self._encode(path),search=search,ignore_errors=ignore_errors):
+                filepath = abspath(self._decode(filepath))
+                if wildcard is not None:
+                    if not wildcard(basename(filepath)):
+                        continue
+                yield (filepath,info)
+
     @rewrite_errors
     def walkdirs(self,path="/",wildcard=None,search="breadth",ignore_errors=False):
         if wildcard is not None:
@@ -368,6 +447,23 @@ class WrapFS(FS):
     def getinfo(self, path):
         return self.wrapped_fs.getinfo(self._encode(path))
 
+    @rewrite_errors
+    def getinfo_many(self, paths):
+        #  If the subclass has customised getinfo, we can't bypass it.
+        if type(self).getinfo is not WrapFS.getinfo:
+            return dict((path, self._getinfo_or_none(path)) for path in paths)
+        results = {}
+        encoded = {}
+        for path in paths:
+            try:
+                encoded[path] = self._encode(path)
+            except ResourceNotFoundError:
+                results[path] = None
+        infos = self.wrapped_fs.getinfo_many(list(encoded.values()))
+        for path, enc_path in encoded.items():
+            results[path] = infos[enc_path]
+        return results
+
     @rewrite_errors
     def settimes(self, path, *args, **kwds):
         return self.wrapped_fs.settimes(self._encode(path), *args,**kwds)
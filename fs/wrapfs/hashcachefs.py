@@ -0,0 +1,99 @@
+"""
+fs.wrapfs.hashcachefs
+=====================
+
+An FS wrapper that caches the hashes of files.
+
+Checking the integrity of a large tree with :py:meth:`~fs.base.FS.gethash`
+reads every byte of every file, every time. A :py:class:`HashCacheFS` stores
+each hash along with the size and modification time of the file it was
+computed from, and returns the stored hash for as long as the file's size and
+modification time are unchanged::
+
+    from fs.osfs import OSFS
+    from fs.wrapfs.hashcachefs import HashCacheFS
+
+    archive = HashCacheFS(OSFS('/srv/archive'))
+    for path in archive.walkfiles():
+        print(path, archive.gethash(path, 'sha256'))
+
+By default hashes are stored in an extended attribute of each file, so they
+are kept between sessions. Filesystems without extended attribute support
+store them in hidden sidecar files (see :py:mod:`fs.xattrs`).
+
+"""
+
+from fs.errors import FSError
+from fs.wrapfs import WrapFS, rewrite_errors
+from fs.xattrs import ensure_xattrs
+
+
+class HashCacheFS(WrapFS):
+    """FS wrapper that caches the hashes returned by
+    :py:meth:`~fs.base.FS.gethash`.
+
+    A file's cached hash is used while the file's size and modification time
+    are unchanged. Files on filesystems that don't report a size and
+    modification time are hashed each time.
+
+    :param fs: the filesystem to wrap
+    :param persistent: if True, hashes are stored in an extended attribute of
+        each file, otherwise they're kept in memory for the lifetime of the
+        HashCacheFS
+
+    """
+
+    #: The prefix of the names of the extended attributes hashes are stored in
+    xattr_prefix = "user.pyfilesystem.hash."
+
+    def __init__(self, fs, persistent=True):
+        if persistent:
+            fs = ensure_xattrs(fs)
+        super(HashCacheFS, self).__init__(fs)
+        self.persistent = persistent
+        self._hashes = {}
+
+    def _file_key(self, path):
+        """Gets a string that changes when a file is modified, or None if the
+        filesystem doesn't give the size and modification time."""
+        info = self.wrapped_fs.getinfo(self._encode(path))
+        size = info.get('size')
+        modified_time = info.get('modified_time')
+        if size is None or modified_time is None:
+            return None
+        return "%d:%s" % (size, modified_time.isoformat())
+
+    def _get_cached(self, path, algorithm):
+        if not self.persistent:
+            return self._hashes.get((path, algorithm))
+        try:
+            value = self.wrapped_fs.getxattr(self._encode(path), self.xattr_prefix + algorithm)
+        except FSError:
+            return None
+        if isinstance(value, bytes):
+            value = value.decode('ascii', 'replace')
+        return value
+
+    def _set_cached(self, path, algorithm, value):
+        if not self.persistent:
+            self._hashes[(path, algorithm)] = value
+            return
+        try:
+            self.wrapped_fs.setxattr(self._encode(path), self.xattr_prefix + algorithm, value)
+        except FSError:
+            #  Read-only filesystems can still be hashed, but not cached
+            pass
+
+    @rewrite_errors
+    def gethash(self, path, algorithm='md5', chunk_size=64*1024):
+        key = self._file_key(path)
+        if key is not None:
+            cached = self._get_cached(path, algorithm)
+            if cached is not None:
+                cached_key, _sep, digest = cached.rpartition(":")
+                if cached_key == key:
+                    return digest
+        digest = self.wrapped_fs.gethash(self._encode(path), algorithm, chunk_size)
+        if key is not None:
+            self._set_cached(path, algorithm, "%s:%s" % (key, digest))
+        return digest
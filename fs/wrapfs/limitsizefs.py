@@ -49,7 +49,13 @@ class LimitSizeFS(WrapFS):
         self.cur_size = self._get_cur_size()
 
     def _get_cur_size(self,path="/"):
-        return sum(self.getsize(f) for f in self.walkfiles(path))
+        total = 0
+        for (f,info) in self.walkfilesinfo(path):
+            size = info.get("size")
+            if size is None:
+                size = self.getsize(f)
+            total += size
+        return total
 
     def getsyspath(self, path, allow_none=False):
         #  If people could grab syspaths, they could route around our
@@ -0,0 +1,452 @@
+"""
+fs.wrapfs.metricsfs
+===================
+
+An FS wrapper that records metrics for each operation.
+
+MetricsFS counts the calls made to each method, the time they take, the
+errors they raise (by exception class) and the bytes read and written, for
+each method and path prefix. The metrics may be read as a dict with
+:py:meth:`MetricsFS.snapshot`, or in the Prometheus text format with
+:py:meth:`MetricsFS.prometheus_text`::
+
+    from fs.s3fs import S3FS
+    from fs.wrapfs.metricsfs import MetricsFS
+
+    s3 = MetricsFS(S3FS('mybucket'), prefix_depth=1)
+    ...
+    print(s3.snapshot()['getinfo']['/photos']['p95'])
+    print(s3.prometheus_text())
+
+Only the outermost call in a thread is recorded, so a method implemented in
+terms of other methods (such as copydir) is counted once. Generators (walk,
+ilistdir...) aren't timed themselves, but the listings they make are: a walk
+lists each directory through MetricsFS, and the listing is recorded as a call
+to listdir (or listdirinfo, for walkinfo and walkfilesinfo).
+
+"""
+
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+from fs.base import FS
+from fs.errors import *
+from fs.path import *
+from fs.wrapfs import WrapFS, rewrite_errors
+from fs.local_functools import wraps
+
+import six
+
+
+#: Upper bounds (in seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class OperationStats(object):
+    """Metrics for calls to one method on one path prefix."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.errors = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+
+    def add(self, elapsed, error=None):
+        index = bisect_left(self.buckets, elapsed)
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.bucket_counts[index] += 1
+            if elapsed > self.max_time:
+                self.max_time = elapsed
+            if error is not None:
+                name = error.__class__.__name__
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def add_bytes(self, read=0, written=0):
+        with self._lock:
+            self.bytes_read += read
+            self.bytes_written += written
+
+    def quantile(self, q):
+        """Estimates the `q` quantile (0 to 1) of the latency, in seconds,
+        by interpolating within the histogram bucket it falls in."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if not bucket_count:
+                continue
+            if seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index < len(self.buckets):
+                    upper = min(self.buckets[index], self.max_time)
+                else:
+                    upper = self.max_time
+                lower = min(lower, upper)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max_time
+
+    def as_dict(self):
+        with self._lock:
+            return {'count': self.count,
+                    'total_time': self.total_time,
+                    'max_time': self.max_time,
+                    'p50': self.quantile(0.5),
+                    'p95': self.quantile(0.95),
+                    'p99': self.quantile(0.99),
+                    'errors': dict(self.errors),
+                    'error_count': sum(self.errors.values()),
+                    'bytes_read': self.bytes_read,
+                    'bytes_written': self.bytes_written,
+                    'buckets': list(zip(self.buckets + (float('inf'),), self.bucket_counts))}
+
+
+def _byte_count(data, encoding=None, errors=None):
+    """Gets the number of bytes in data read or written. Text is counted as
+    the bytes it's encoded to, with `encoding` (or UTF-8)."""
+    if isinstance(data, six.text_type):
+        return len(data.encode(encoding or 'utf-8', errors or 'strict'))
+    return memoryview(data).nbytes
+
+
+class _MetricsFile(object):
+    """Proxies a file opened through MetricsFS, counting the bytes read and
+    written. The totals are added to the stats when the file is closed."""
+
+    def __init__(self, f, stats):
+        self._f = f
+        self._stats = stats
+        self._read = 0
+        self._written = 0
+        #  Text is counted in the encoding of the file, not in characters
+        self._encoding = getattr(f, 'encoding', None)
+        self._errors = getattr(f, 'errors', None)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __iter__(self):
+        for line in self._f:
+            self._read += self._byte_count(line)
+            yield line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _byte_count(self, data):
+        return _byte_count(data, self._encoding, self._errors)
+
+    def _count_read(self, data):
+        self._read += self._byte_count(data)
+        return data
+
+    def read(self, *args):
+        return self._count_read(self._f.read(*args))
+
+    def read1(self, *args):
+        return self._count_read(self._f.read1(*args))
+
+    def readline(self, *args):
+        return self._count_read(self._f.readline(*args))
+
+    def readlines(self, *args):
+        lines = self._f.readlines(*args)
+        self._read += sum(self._byte_count(line) for line in lines)
+        return lines
+
+    def readinto(self, b):
+        count = self._f.readinto(b)
+        self._read += count or 0
+        return count
+
+    def write(self, data):
+        count = self._f.write(data)
+        if count is None or isinstance(data, six.text_type):
+            self._written += self._byte_count(data)
+        else:
+            self._written += count
+        return count
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def close(self):
+        try:
+            self._f.close()
+        finally:
+            if self._read or self._written:
+                self._stats.add_bytes(self._read, self._written)
+                self._read = self._written = 0
+
+
+class _CountingReader(object):
+    """Counts the bytes read from a file passed to setcontents."""
+
+    def __init__(self, f, encoding=None, errors=None):
+        self._f = f
+        self._encoding = encoding
+        self._errors = errors
+        self.count = 0
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def read(self, *args):
+        data = self._f.read(*args)
+        self.count += _byte_count(data, self._encoding, self._errors)
+        return data
+
+
+def _timed(method_name, func):
+    """Records the calls to a MetricsFS method."""
+    @wraps(func)
+    def timed(self, *args, **kwargs):
+        local = self._metrics_local
+        if local.active:
+            return func(self, *args, **kwargs)
+        if args:
+            path = args[0]
+        else:
+            path = kwargs.get('path', kwargs.get('src', '/'))
+        stats = self._get_stats(method_name, path)
+        local.active = True
+        local.stats = stats
+        start = perf_counter()
+        try:
+            result = func(self, *args, **kwargs)
+        except Exception as e:
+            stats.add(perf_counter() - start, e)
+            raise
+        else:
+            stats.add(perf_counter() - start)
+        finally:
+            local.active = False
+            local.stats = None
+        return result
+    return timed
+
+
+class _MetricsLocal(threading.local):
+    active = False
+    stats = None
+
+
+class MetricsFS(WrapFS):
+    """FS wrapper that records call counts, latency histograms, errors and
+    bytes transferred, for each method and path prefix.
+
+    :param fs: the filesystem to wrap
+    :param prefix_depth: the number of leading path components metrics are
+        grouped by; 0 groups all paths together
+    :param buckets: upper bounds, in seconds, of the latency histogram buckets
+
+    """
+
+    def __init__(self, fs, prefix_depth=1, buckets=DEFAULT_BUCKETS):
+        super(MetricsFS, self).__init__(fs)
+        self.prefix_depth = prefix_depth
+        self.buckets = tuple(sorted(buckets))
+        self._metrics_local = _MetricsLocal()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def __getstate__(self):
+        state = super(MetricsFS, self).__getstate__()
+        del state['_metrics_local']
+        del state['_stats_lock']
+        state['_stats'] = {}
+        return state
+
+    def __setstate__(self, state):
+        super(MetricsFS, self).__setstate__(state)
+        self._metrics_local = _MetricsLocal()
+        self._stats_lock = threading.Lock()
+
+    def __str__(self):
+        return "<MetricsFS: %s>" % (self.wrapped_fs,)
+
+    __repr__ = __str__
+
+    def _path_prefix(self, path):
+        if not isinstance(path, six.string_types) or not self.prefix_depth:
+            return "/"
+        components = path.strip('/').split('/', self.prefix_depth)[:self.prefix_depth]
+        if '' in components or '.' in components:
+            components = [c for c in path.split('/') if c and c != '.'][:self.prefix_depth]
+        return "/" + "/".join(components)
+
+    def _get_stats(self, method_name, path):
+        key = (method_name, self._path_prefix(path))
+        stats = self._stats.get(key)
+        if stats is None:
+            with self._stats_lock:
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = OperationStats(self.buckets)
+        return stats
+
+    def reset(self):
+        """Discards the metrics recorded so far."""
+        with self._stats_lock:
+            self._stats = {}
+
+    def snapshot(self):
+        """Gets the metrics recorded so far.
+
+        :returns: a dict that maps method names on to dicts that map path
+            prefixes on to a dict of metrics, with the keys *count*,
+            *total_time*, *max_time*, *p50*, *p95*, *p99* (latencies in seconds),
+            *errors* (counts by exception class name), *error_count*,
+            *bytes_read*, *bytes_written* and *buckets* (a list of
+            (upper bound, count) pairs)
+
+        """
+        with self._stats_lock:
+            items = list(self._stats.items())
+        snapshot = {}
+        for (method_name, prefix), stats in sorted(items):
+            snapshot.setdefault(method_name, {})[prefix] = stats.as_dict()
+        return snapshot
+
+    def prometheus_text(self, namespace="pyfilesystem"):
+        """Gets the metrics in the Prometheus text exposition format."""
+        def escape(value):
+            return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        def number(value):
+            if value == float('inf'):
+                return "+Inf"
+            return repr(float(value)) if isinstance(value, float) else str(value)
+
+        seconds = namespace + "_operation_seconds"
+        errors = namespace + "_operation_errors_total"
+        bytes_read = namespace + "_bytes_read_total"
+        bytes_written = namespace + "_bytes_written_total"
+        histogram_lines = []
+        error_lines = []
+        read_lines = []
+        written_lines = []
+        for method_name, prefixes in sorted(self.snapshot().items()):
+            for prefix, metrics in sorted(prefixes.items()):
+                labels = 'method="%s",prefix="%s"' % (escape(method_name), escape(prefix))
+                cumulative = 0
+                for upper, count in metrics['buckets']:
+                    cumulative += count
+                    histogram_lines.append('%s_bucket{%s,le="%s"} %d' % (seconds, labels, number(upper), cumulative))
+                histogram_lines.append('%s_sum{%s} %s' % (seconds, labels, number(metrics['total_time'])))
+                histogram_lines.append('%s_count{%s} %d' % (seconds, labels, metrics['count']))
+                for error_name, count in sorted(metrics['errors'].items()):
+                    error_lines.append('%s{%s,error="%s"} %d' % (errors, labels, escape(error_name), count))
+                if metrics['bytes_read']:
+                    read_lines.append('%s{%s} %d' % (bytes_read, labels, metrics['bytes_read']))
+                if metrics['bytes_written']:
+                    written_lines.append('%s{%s} %d' % (bytes_written, labels, metrics['bytes_written']))
+
+        lines = []
+        for name, kind, description, metric_lines in (
+                (seconds, "histogram", "Time taken by filesystem operations.", histogram_lines),
+                (errors, "counter", "Errors raised by filesystem operations.", error_lines),
+                (bytes_read, "counter", "Bytes read from files.", read_lines),
+                (bytes_written, "counter", "Bytes written to files.", written_lines)):
+            lines.append("# HELP %s %s" % (name, description))
+            lines.append("# TYPE %s %s" % (name, kind))
+            lines.extend(metric_lines)
+        return "\n".join(lines) + "\n"
+
+    #  Walk and iterate through the listing methods, so the listings are
+    #  recorded (with absolute paths, as WrapFS walks)
+    ilistdir = FS.ilistdir
+    ilistdirinfo = FS.ilistdirinfo
+
+    def walk(self, path="/", wildcard=None, dir_wildcard=None, search="breadth", ignore_errors=False):
+        return FS.walk(self, abspath(path), wildcard, dir_wildcard, search, ignore_errors)
+
+    def walkfiles(self, path="/", wildcard=None, dir_wildcard=None, search="breadth", ignore_errors=False):
+        return FS.walkfiles(self, abspath(path), wildcard, dir_wildcard, search, ignore_errors)
+
+    def walkdirs(self, path="/", wildcard=None, search="breadth", ignore_errors=False):
+        return FS.walkdirs(self, abspath(path), wildcard, search, ignore_errors)
+
+    def walkinfo(self, path="/", wildcard=None, dir_wildcard=None, search="breadth", ignore_errors=False):
+        return FS.walkinfo(self, abspath(path), wildcard, dir_wildcard, search, ignore_errors)
+
+    def walkfilesinfo(self, path="/", wildcard=None, dir_wildcard=None, search="breadth", ignore_errors=False):
+        return FS.walkfilesinfo(self, abspath(path), wildcard, dir_wildcard, search, ignore_errors)
+
+    @rewrite_errors
+    def _listdir_partition(self, path):
+        return self.wrapped_fs._listdir_partition(self._encode(path))
+
+    @rewrite_errors
+    def _listdirinfo_partition(self, path):
+        return self.wrapped_fs._listdirinfo_partition(self._encode(path))
+
+    def open(self, path, mode='r', **kwargs):
+        f = super(MetricsFS, self).open(path, mode, **kwargs)
+        return _MetricsFile(f, self._metrics_local.stats or self._get_stats('open', path))
+
+    @rewrite_errors
+    def getcontents(self, path, mode='rb', encoding=None, errors=None, newline=None):
+        contents = self.wrapped_fs.getcontents(self._encode(path), mode,
+                                               encoding=encoding, errors=errors, newline=newline)
+        self._metrics_local.stats.add_bytes(read=_byte_count(contents, encoding, errors))
+        return contents
+
+    @rewrite_errors
+    def getrange(self, path, offset, length=None):
+        data = self.wrapped_fs.getrange(self._encode(path), offset, length)
+        self._metrics_local.stats.add_bytes(read=len(data))
+        return data
+
+    @rewrite_errors
+    def getranges(self, path, ranges):
+        results = self.wrapped_fs.getranges(self._encode(path), ranges)
+        self._metrics_local.stats.add_bytes(read=sum(len(data) for data in results))
+        return results
+
+    @rewrite_errors
+    def setcontents(self, path, data=b'', encoding=None, errors=None, chunk_size=64*1024):
+        stats = self._metrics_local.stats
+        if hasattr(data, 'read'):
+            data = _CountingReader(data, encoding, errors)
+            try:
+                return self.wrapped_fs.setcontents(self._encode(path), data, encoding=encoding,
+                                                   errors=errors, chunk_size=chunk_size)
+            finally:
+                stats.add_bytes(written=data.count)
+        result = self.wrapped_fs.setcontents(self._encode(path), data, encoding=encoding,
+                                             errors=errors, chunk_size=chunk_size)
+        stats.add_bytes(written=_byte_count(data, encoding, errors))
+        return result
+
+
+#: The methods that MetricsFS records
+MetricsFS.method_names = ["open", "getcontents", "getrange", "getranges", "setcontents",
+                          "createfile", "exists", "isdir", "isfile", "listdir", "listdirinfo",
+                          "makedir", "remove", "removedir", "rename", "getinfo", "getinfo_many",
+                          "exists_many", "isdir_many", "getsize", "settimes", "desc", "copy",
+                          "move", "copydir", "movedir", "getxattr", "setxattr", "delxattr",
+                          "listxattrs"]
+
+for _method_name in MetricsFS.method_names:
+    setattr(MetricsFS, _method_name, _timed(_method_name, getattr(MetricsFS, _method_name)))
+del _method_name
+
+#  The listings made by walks are recorded as listdir and listdirinfo calls
+MetricsFS._listdir_partition = _timed("listdir", MetricsFS._listdir_partition)
+MetricsFS._listdirinfo_partition = _timed("listdirinfo", MetricsFS._listdirinfo_partition)
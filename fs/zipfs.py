@@ -8,19 +8,26 @@ A FS object that represents the contents of a Zip file
 
 import datetime
 import os.path
+import struct
+from operator import attrgetter, methodcaller
+from types import MemberDescriptorType
 
 from fs.base import *
 from fs.path import *
 from fs.errors import *
 from fs.filelike import StringIO
 from fs import iotools
+from fs.info import Info
 
-from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED, BadZipfile, LargeZipFile
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED, BadZipfile, LargeZipFile
 from .memoryfs import MemoryFS
 
 from . import tempfs
 
-from six import PY3
+from six import PY3, b
+
+_LOCAL_HEADER_SIGNATURE = b('PK\x03\x04')
+_LOCAL_HEADER_SIZE = 30
 
 
 class ZipOpenError(CreateFailedError):
@@ -78,6 +85,25 @@ class _ExceptionProxy(object):
         return False
 
 
+def _zip_datetime(zi):
+    return datetime.datetime(*zi.date_time)
+
+
+class ZipEntryInfo(Info):
+    """Info for a :py:class:`zipfile.ZipInfo`, with a key for each of its
+    public attributes."""
+
+    __slots__ = ()
+
+    _getters = dict((name, attrgetter(name)) for name in dir(ZipInfo)
+                    if isinstance(getattr(ZipInfo, name), MemberDescriptorType) and not name.startswith('_'))
+    if hasattr(ZipInfo, 'is_dir'):
+        _getters['is_dir'] = methodcaller('is_dir')
+    _getters['size'] = attrgetter('file_size')
+    _getters['created_time'] = _getters['modified_time'] = _zip_datetime
+    _cached = frozenset(['created_time', 'modified_time'])
+
+
 class ZipFS(FS):
     """A FileSystem that represents a zip file."""
 
@@ -90,6 +116,8 @@ class ZipFS(FS):
              'atomic.setcontents': False
              }
 
+    _lock_class = ReadWriteLock
+
     def __init__(self, zip_file, mode="r", compression="deflated", allow_zip_64=False, encoding="CP437", thread_synchronize=True):
         """Create a FS that maps on to a zip file.
 
@@ -193,26 +221,32 @@ class ZipFS(FS):
             self.zf.close()
             self.zf = _ExceptionProxy()
 
-    @synchronize
     @iotools.filelike_to_stream
     def open(self, path, mode='r', buffering=-1, encoding=None, errors=None, newline=None, line_buffering=False, **kwargs):
         path = normpath(relpath(path))
 
         if 'r' in mode:
-            if self.zip_mode not in 'ra':
-                raise OperationFailedError("open file",
-                                           path=path,
-                                           msg="1 Zip file must be opened for reading ('r') or appending ('a')")
-            try:
-                if hasattr(self.zf, 'open') and self._zip_file_string:
-                    #return self.zf.open(self._encode_path(path), "r")
-                    return self.zf.open(self._encode_path(path), 'rU' if 'U' in mode else 'r')
-                else:
-                    contents = self.zf.read(self._encode_path(path))
-            except KeyError:
-                raise ResourceNotFoundError(path)
-            return StringIO(contents)
+            return self._open_read(path, mode)
+        return self._open_write(path, mode)
+
+    @synchronize_read
+    def _open_read(self, path, mode):
+        if self.zip_mode not in 'ra':
+            raise OperationFailedError("open file",
+                                       path=path,
+                                       msg="1 Zip file must be opened for reading ('r') or appending ('a')")
+        try:
+            if hasattr(self.zf, 'open') and self._zip_file_string:
+                #return self.zf.open(self._encode_path(path), "r")
+                return self.zf.open(self._encode_path(path), 'rU' if 'U' in mode else 'r')
+            else:
+                contents = self.zf.read(self._encode_path(path))
+        except KeyError:
+            raise ResourceNotFoundError(path)
+        return StringIO(contents)
 
+    @synchronize
+    def _open_write(self, path, mode):
         if 'w' in mode:
             if self.zip_mode not in 'wa':
                 raise OperationFailedError("open file",
@@ -228,7 +262,7 @@ class ZipFS(FS):
 
         raise ValueError("Mode must contain be 'r' or 'w'")
 
-    @synchronize
+    @synchronize_read
     def getcontents(self, path, mode="rb", encoding=None, errors=None, newline=None):
         if not self.exists(path):
             raise ResourceNotFoundError(path)
@@ -243,6 +277,54 @@ class ZipFS(FS):
             return contents
         return iotools.decode_binary(contents, encoding=encoding, errors=errors, newline=newline)
 
+    @synchronize_read
+    def getrange(self, path, offset, length=None):
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        path = normpath(relpath(path))
+        if self.zip_mode not in 'ra':
+            raise OperationFailedError("read file", path=path, msg="3 Zip file must be opened with 'r' or 'a' to read")
+        try:
+            zinfo = self.zf.getinfo(self._encode_path(path))
+        except KeyError:
+            if self.isdir(path):
+                raise ResourceInvalidError(path)
+            raise ResourceNotFoundError(path)
+        end = zinfo.file_size
+        if length is not None:
+            end = min(end, offset + length)
+        if offset >= end:
+            return b('')
+        #  Stored (uncompressed, unencrypted) data can be sliced straight out of the
+        #  zip file, rather than read and discarded up to the offset.
+        if zinfo.compress_type == ZIP_STORED and not zinfo.flag_bits & 0x1 \
+                and self.zip_mode == 'r' and self._zip_file_string:
+            with open(self.zip_path, 'rb') as zip_file:
+                zip_file.seek(zinfo.header_offset)
+                header = zip_file.read(_LOCAL_HEADER_SIZE)
+                if header[:4] == _LOCAL_HEADER_SIGNATURE:
+                    name_length, extra_length = struct.unpack('<HH', header[26:30])
+                    zip_file.seek(zinfo.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length + offset)
+                    return zip_file.read(end - offset)
+        with self.zf.open(zinfo) as f:
+            f.seek(offset)
+            return f.read(end - offset)
+
+    def gethash(self, path, algorithm='md5', chunk_size=64*1024):
+        #  Zip files store a CRC-32 of each file's contents
+        if algorithm == 'crc32' and self.zip_mode in 'ra':
+            zinfo = self._zip_info_or_none(path)
+            if zinfo is not None:
+                return '%08x' % zinfo.CRC
+        return super(ZipFS, self).gethash(path, algorithm, chunk_size)
+
+    @synchronize_read
+    def _zip_info_or_none(self, path):
+        try:
+            return self.zf.getinfo(self._encode_path(normpath(relpath(path))))
+        except KeyError:
+            return None
+
     @synchronize
     def _on_write_close(self, filename):
         sys_path = self.temp_fs.getsyspath(filename)
@@ -272,23 +354,32 @@ class ZipFS(FS):
     def listdir(self, path="/", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
         return self._path_fs.listdir(path, wildcard, full, absolute, dirs_only, files_only)
 
-    @synchronize
+    def iglob(self, pattern):
+        #  Matched against the index of paths, rather than the zip file
+        return self._path_fs.iglob(pattern)
+
+    def _listdir_partition(self, path):
+        return self._path_fs._listdir_partition(path)
+
+    @synchronize_read
+    def _listdirinfo_partition(self, path):
+        dirnames, filenames = self._path_fs._listdir_partition(path)
+        _zip_info = self._zip_info
+        dirs = [(name, _zip_info(pathjoin(path, name))) for name in dirnames]
+        files = [(name, _zip_info(pathjoin(path, name))) for name in filenames]
+        return dirs, files
+
+    @synchronize_read
     def getinfo(self, path):
         if not self.exists(path):
             raise ResourceNotFoundError(path)
+        return self._zip_info(path)
+
+    def _zip_info(self, path):
+        """Build an info mapping from the central directory entry for a path."""
         path = normpath(path).lstrip('/')
         try:
-            zi = self.zf.getinfo(self._encode_path(path))
-            zinfo = dict((attrib, getattr(zi, attrib)) for attrib in dir(zi) if not attrib.startswith('_'))
-            for k, v in zinfo.items():
-                if callable(v):
-                    zinfo[k] = v()
+            return ZipEntryInfo(self.zf.getinfo(self._encode_path(path)))
         except KeyError:
-            zinfo = {'file_size': 0}
-        info = {'size': zinfo['file_size']}
-        if 'date_time' in zinfo:
-            info['modified_time'] = info['created_time'] = datetime.datetime(*zinfo['date_time'])
-        info.update(zinfo)
-        if 'FileHeader' in info:
-            del info['FileHeader']
-        return info
+            #  A directory without an entry of its own
+            return Info(values={'size': 0, 'file_size': 0})
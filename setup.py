@@ -63,8 +63,9 @@ setup(install_requires=['setuptools', 'six'],
                 'fs.contrib.bigfs',
                 'fs.contrib.davfs',
                 'fs.contrib.tahoelafs',
-                'fs.commands'],
-      package_data={'fs': ['tests/data/*.txt']},
+                'fs.commands',
+                'fs.benchmarks'],
+      package_data={'fs': ['tests/data/*.txt', 'benchmarks/baseline.json']},
       entry_points={"console_scripts": CONSOLE_SCRIPTS},
       classifiers=classifiers,
       **extra